@@ -15,8 +15,6 @@ import os
 import signal
 import sys
 
-from shared.ttypes import RequestFailed
-
 from libcodechecker import libhandlers
 from libcodechecker.logger import LoggerFactory
 
@@ -24,6 +22,16 @@ from libcodechecker.logger import LoggerFactory
 LOG = LoggerFactory.get_new_logger('MAIN')
 
 
+def is_request_failed(ex):
+    """
+    Check if the exception is a server error. The Thrift API is imported only
+    by the subcommands communicating with the server, and a server error can
+    be raised only if it was imported.
+    """
+    ttypes = sys.modules.get('shared.ttypes')
+    return ttypes is not None and isinstance(ex, ttypes.RequestFailed)
+
+
 def main(subcommands=None):
     """
     CodeChecker main command line.
@@ -105,16 +113,16 @@ output.
         LOG.info("Interrupted by user...")
         sys.exit(1)
 
-    except RequestFailed as thrift_ex:
-        LOG.info("Server error.")
-        LOG.info("Error code: " + str(thrift_ex.errorCode))
-        LOG.info("Error message: " + str(thrift_ex.message))
-        sys.exit(1)
-
     # Handle all exception, but print stacktrace. It is needed for atexit.
     # atexit does not work correctly when an unhandled exception occurred.
     # So in this case, the servers left running when the script exited.
-    except Exception:
+    except Exception as ex:
+        if is_request_failed(ex):
+            LOG.info("Server error.")
+            LOG.info("Error code: " + str(ex.errorCode))
+            LOG.info("Error message: " + str(ex.message))
+            sys.exit(1)
+
         import traceback
         traceback.print_exc(file=sys.stdout)
         sys.exit(1)
@@ -0,0 +1,229 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Record how long the analysis of the source files took and use it to
+schedule the build actions of the next analysis longest first.
+
+A few huge translation units dispatched at the end of the analysis keep
+the other workers idle. If the expensive actions are started first the
+cheap ones fill up the gaps, which makes the analysis finish earlier.
+"""
+
+import heapq
+import json
+import os
+
+from libcodechecker.analyze.result_cache import write_atomically
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('ANALYSIS HISTORY')
+
+HISTORY_FILE = 'analysis_history.json'
+
+# The peak memory usage of the analyses in kilobytes, with the same keys as
+# the durations.
+MEMORY_HISTORY_FILE = 'analysis_memory.json'
+
+# The peak memory usage of an analysis in kilobytes, if nothing was recorded
+# yet.
+DEFAULT_MEMORY_ESTIMATE = 512 * 1024
+
+
+def history_key(source, analyzer_type):
+    """
+    Key of a source file analyzed by the given analyzer in the history.
+    """
+    return str(analyzer_type) + '|' + source
+
+
+def load_history(output_path, file_name=HISTORY_FILE):
+    """
+    Load the analysis durations recorded in the output directory.
+    Return an empty history if there is no (valid) history file.
+    """
+    history_file = os.path.join(output_path, file_name)
+    if not os.path.exists(history_file):
+        return {}
+
+    try:
+        with open(history_file, 'r') as history:
+            return json.load(history)
+    except (IOError, ValueError) as ex:
+        LOG.debug("Failed to load the analysis history: " + str(ex))
+        return {}
+
+
+def save_history(output_path, history, file_name=HISTORY_FILE):
+    """
+    Write the analysis durations to the output directory.
+    """
+    try:
+        write_atomically(os.path.join(output_path, file_name),
+                         lambda out: json.dump(history, out))
+    except (IOError, OSError) as ex:
+        LOG.debug("Failed to save the analysis history: " + str(ex))
+
+
+def __source_size(source):
+    try:
+        return os.path.getsize(source)
+    except OSError:
+        return 0
+
+
+def estimate_costs(actions, history):
+    """
+    Estimate the analysis time of the build actions in seconds.
+
+    The recorded duration is used for the source files analyzed earlier. The
+    others are estimated from their size, with the analysis speed measured
+    on the known sources. Return the list of estimations, and whether these
+    are real durations. Without any history the estimations are the source
+    sizes, which are only good for ordering the actions.
+    """
+    return __estimate(actions,
+                      lambda source, action: history.get(
+                          history_key(source, action.analyzer_type)))
+
+
+def __estimate(actions, recorded_duration):
+    """
+    Estimate the analysis time of the build actions. recorded_duration
+    returns the duration recorded for a source file of a build action, or
+    None if it is unknown.
+    """
+    sizes = []
+    known = []
+    for action in actions:
+        size = 0
+        duration = None
+        for source in action.sources:
+            size += __source_size(source)
+            recorded = recorded_duration(source, action)
+            if recorded is not None:
+                duration = (duration or 0) + recorded
+        sizes.append(size)
+        known.append(duration)
+
+    measured = [(duration, size) for duration, size in zip(known, sizes)
+                if duration is not None and size]
+    if not measured:
+        return sizes, False
+
+    seconds_per_byte = sum(d for d, _ in measured) / \
+        float(sum(s for _, s in measured))
+
+    return [duration if duration is not None else size * seconds_per_byte
+            for duration, size in zip(known, sizes)], True
+
+
+def estimate_memory(actions, memory_history):
+    """
+    Estimate the peak memory usage of the analysis of the build actions in
+    kilobytes. The source files analyzed earlier are estimated by their
+    recorded peak, the others by the average of the recorded peaks.
+    """
+    if memory_history:
+        default = sum(memory_history.values()) / len(memory_history)
+    else:
+        default = DEFAULT_MEMORY_ESTIMATE
+
+    estimates = []
+    for action in actions:
+        recorded = [memory_history.get(history_key(source,
+                                                   action.analyzer_type))
+                    for source in action.sources]
+        recorded = [peak for peak in recorded if peak is not None]
+        estimates.append(max(recorded) if recorded else default)
+
+    return estimates
+
+
+def predict_makespan(costs, jobs):
+    """
+    Predict the wall clock time of executing the jobs in the given order on
+    the given number of parallel workers. Every job is started on the worker
+    which finishes first.
+    """
+    workers = [0.0] * max(jobs, 1)
+    for cost in costs:
+        heapq.heappush(workers, heapq.heappop(workers) + cost)
+
+    return max(workers)
+
+
+def schedule(actions, history, jobs):
+    """
+    Order the build actions longest first.
+    Return the ordered actions and the predicted makespan in seconds, which
+    is None if there is no history to predict from.
+    """
+    costs, is_duration = estimate_costs(actions, history)
+
+    # Stable sort keeps the compilation database order of equal costs.
+    order = sorted(range(len(actions)), key=lambda i: costs[i],
+                   reverse=True)
+    ordered_actions = [actions[i] for i in order]
+
+    predicted = None
+    if is_duration:
+        predicted = predict_makespan([costs[i] for i in order], jobs)
+
+    return ordered_actions, predicted
+
+
+def parse_shard(shard):
+    """
+    Parse a K/N shard specification to a (K, N) tuple. Shards are numbered
+    from 1.
+    """
+    try:
+        index, count = [int(part) for part in shard.split('/')]
+    except ValueError:
+        raise ValueError("Invalid shard '" + shard + "', K/N is expected.")
+
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError("Invalid shard '" + shard + "', K must be between "
+                         "1 and N.")
+
+    return index, count
+
+
+def shard_actions(actions, history, index, count):
+    """
+    Select the build actions of the index-th shard from count shards.
+
+    Every shard gets about the same estimated analysis time. The selection
+    depends only on the build actions, the source files and the history, so
+    the shards of the same compilation database are disjoint and cover every
+    build action on every machine. The build actions are not assigned to
+    analyzers yet, so the recorded durations of every analyzer are added.
+    """
+    source_durations = {}
+    for key, duration in sorted(history.items()):
+        _, _, source = key.partition('|')
+        source_durations[source] = \
+            source_durations.get(source, 0) + duration
+
+    costs, _ = __estimate(actions,
+                          lambda source, _: source_durations.get(source))
+
+    # The order of the compilation database may differ between the
+    # machines, so equal costs are ordered by the build action itself.
+    order = sorted(range(len(actions)),
+                   key=lambda i: (-costs[i], actions[i].cmp_key))
+
+    # Every build action goes to the shard with the least work so far, the
+    # lowest numbered one on ties.
+    shards = [(0.0, i) for i in range(count)]
+    selected = []
+    for i in order:
+        load, shard = heapq.heappop(shards)
+        heapq.heappush(shards, (load + costs[i], shard))
+        if shard == index - 1:
+            selected.append(actions[i])
+
+    return selected
@@ -8,88 +8,239 @@
 
 from collections import defaultdict
 import codecs
-import glob
+import heapq
+import json
 import multiprocessing
 import os
+import Queue
 import signal
 import sys
+import threading
+import time
 import traceback
 import zipfile
 
 from libcodechecker import util
+from libcodechecker.analyze import analysis_history
 from libcodechecker.analyze import analyzer_env
-from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import memory_admission
+from libcodechecker.analyze import report_index
+from libcodechecker.analyze.result_cache import write_atomically
 from libcodechecker.analyze.analyzers import analyzer_types
+from libcodechecker.logger import DEBUG_ANALYZER
 from libcodechecker.logger import LoggerFactory
+from libcodechecker.output_formatters import twodim_to_str
 
 LOG = LoggerFactory.get_new_logger('ANALYSIS MANAGER')
 
 
-def worker_result_handler(results, metadata, output_path):
+class ResultCollector(object):
     """
-    Print the analysis summary.
+    Consume the results of the analysis workers as they are finished and
+    merge them into the metadata one by one, so the results of every build
+    action never have to be kept in memory at the same time.
+
+    The metadata is written to the output directory periodically, so the
+    results of an interrupted analysis are still usable and a rerun with a
+    result cache can pick up where the previous run stopped. The reports of
+    the finished results are written to the report index of the output
+    directory, so they do not have to be parsed from the plists again.
     """
 
-    if metadata is None:
-        metadata = {}
-
-    successful_analysis = defaultdict(int)
-    failed_analysis = defaultdict(int)
-    skipped_num = 0
-    reanalyzed_num = 0
+    # Number of seconds between two metadata checkpoints.
+    CHECKPOINT_INTERVAL = 30
+
+    # Number of the most expensive analyses listed in the summary.
+    EXPENSIVE_ANALYSIS_NUM = 10
+
+    def __init__(self, metadata, output_path, action_num, history=None,
+                 predicted_makespan=None, memory_history=None,
+                 admission=None):
+        self.__metadata = metadata if metadata is not None else {}
+        self.__metadata.setdefault('result_source_files', {})
+        self.__metadata.setdefault('resource_usage', {})
+        self.__output_path = output_path
+        self.__metadata_file = os.path.join(output_path, 'metadata.json')
+        self.__action_num = action_num
+        self.__history = history if history is not None else {}
+        self.__predicted_makespan = predicted_makespan
+        self.__memory_history = memory_history \
+            if memory_history is not None else {}
+        self.__admission = admission
+        self.__report_index = report_index.ReportIndexWriter(output_path)
+
+        self.__successful = defaultdict(int)
+        self.__failed = defaultdict(int)
+        self.__skipped_num = 0
+        self.__reanalyzed_num = 0
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__result_num = 0
+
+        self.__start_time = time.time()
+        self.__last_checkpoint = self.__start_time
+
+    def add(self, result):
+        """
+        Merge the result of one check() call.
+        """
+        res, skipped, reanalyzed, analyzer_type, result_sources, cache_hit, \
+            durations, resource_usage, _, report_entries = result
 
-    for res, skipped, reanalyzed, analyzer_type, _ in results:
+        self.__result_num += 1
         if skipped:
-            skipped_num += 1
+            self.__skipped_num += 1
         else:
             if reanalyzed:
-                reanalyzed_num += 1
+                self.__reanalyzed_num += 1
+
+            if cache_hit:
+                self.__cache_hits += 1
+            elif cache_hit is not None:
+                self.__cache_misses += 1
 
             if res == 0:
-                successful_analysis[analyzer_type] += 1
+                self.__successful[analyzer_type] += 1
+            else:
+                self.__failed[analyzer_type] += 1
+
+        # check() maps the created result files to the analyzed source files.
+        # Failed analyses map to None, their earlier results were removed.
+        source_files = self.__metadata['result_source_files']
+        for result_file, source in result_sources.items():
+            if source is None:
+                source_files.pop(result_file, None)
             else:
-                failed_analysis[analyzer_type] += 1
-
-    LOG.info("----==== Summary ====----")
-    LOG.info("Total compilation commands: " + str(len(results)))
-    if successful_analysis:
-        LOG.info("Successfully analyzed")
-        for analyzer_type, res in successful_analysis.items():
-            LOG.info('  ' + analyzer_type + ': ' + str(res))
-
-    if failed_analysis:
-        LOG.info("Failed to analyze")
-        for analyzer_type, res in failed_analysis.items():
-            LOG.info('  ' + analyzer_type + ': ' + str(res))
-
-    if reanalyzed_num:
-        LOG.info("Reanalyzed compilation commands: " + str(reanalyzed_num))
-    if skipped_num:
-        LOG.info("Skipped compilation commands: " + str(skipped_num))
-    LOG.info("----=================----")
-
-    metadata['successful'] = successful_analysis
-    metadata['failed'] = failed_analysis
-    metadata['skipped'] = skipped_num
-
-    # check() created the result .plist files and additional, per-analysis
-    # meta information in forms of .plist.source files.
-    # We now soak these files into the metadata dict, as they are not needed
-    # as loose files on the disk... but synchronizing LARGE dicts between
-    # threads would be more error prone.
-    source_map = {}
-    for f in glob.glob(os.path.join(output_path, "*.source")):
-        with open(f, 'r') as sfile:
-            source_map[f[:-7]] = sfile.read().strip()
-        os.remove(f)
-
-    for f in glob.glob(os.path.join(output_path, 'failed', "*.error")):
-        err_file, _ = os.path.splitext(f)
-        plist_file = os.path.basename(err_file) + ".plist"
-        plist_file = os.path.join(output_path, plist_file)
-        metadata['result_source_files'].pop(plist_file, None)
-
-    metadata['result_source_files'].update(source_map)
+                source_files[result_file] = source
+                # The index lines are made by the workers.
+                if report_entries.get(result_file):
+                    self.__report_index.add(report_entries[result_file])
+
+        for source, duration in durations.items():
+            self.__history[analysis_history.history_key(
+                source, analyzer_type)] = duration
+
+        self.__metadata['resource_usage'].update(resource_usage)
+        for usage in resource_usage.values():
+            self.__memory_history[analysis_history.history_key(
+                usage['source'], analyzer_type)] = usage['max_rss']
+
+        now = time.time()
+        if now - self.__last_checkpoint >= self.CHECKPOINT_INTERVAL:
+            self.__last_checkpoint = now
+            running = ''
+            if self.__admission:
+                running = ", %d running" % self.__admission.running
+            LOG.info("Processed %d/%d build actions, %.2f actions/sec%s." %
+                     (self.__result_num, self.__action_num,
+                      self.__result_num / (now - self.__start_time),
+                      running))
+            self.checkpoint()
+
+    def __update_metadata(self):
+        self.__metadata['successful'] = self.__successful
+        self.__metadata['failed'] = self.__failed
+        self.__metadata['skipped'] = self.__skipped_num
+        if self.__cache_hits or self.__cache_misses:
+            self.__metadata['result_cache'] = {'hits': self.__cache_hits,
+                                               'misses': self.__cache_misses}
+
+    def checkpoint(self):
+        """
+        Write the metadata of the results collected so far to the output
+        directory.
+        """
+        self.__update_metadata()
+        try:
+            write_atomically(
+                self.__metadata_file,
+                lambda out: json.dump(self.__metadata, out))
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to write metadata checkpoint: " + str(ex))
+
+        self.__report_index.flush()
+        self.__save_history()
+
+    def __save_history(self):
+        analysis_history.save_history(self.__output_path, self.__history)
+        analysis_history.save_history(self.__output_path,
+                                      self.__memory_history,
+                                      analysis_history.MEMORY_HISTORY_FILE)
+
+    def __print_expensive_analyses(self):
+        """
+        Print the analyses which used the most CPU time.
+        """
+        usages = heapq.nlargest(
+            self.EXPENSIVE_ANALYSIS_NUM,
+            self.__metadata['resource_usage'].values(),
+            key=lambda usage: usage['user'] + usage['sys'])
+        if not usages:
+            return
+
+        rows = [(os.path.basename(usage['source']),
+                 usage['analyzer'],
+                 '%.2f' % (usage['user'] + usage['sys']),
+                 '%.2f' % usage['wall'],
+                 str(usage['max_rss'] / 1024))
+                for usage in usages]
+
+        LOG.info("Most expensive analyses:\n" +
+                 twodim_to_str('table',
+                               ['Source', 'Analyzer', 'CPU (sec)',
+                                'Wall (sec)', 'Max RSS (MB)'],
+                               rows))
+
+    def finish(self):
+        """
+        Print the analysis summary and store it in the metadata.
+        """
+        LOG.info("----==== Summary ====----")
+        LOG.info("Total compilation commands: " + str(self.__result_num))
+        if self.__successful:
+            LOG.info("Successfully analyzed")
+            for analyzer_type, res in self.__successful.items():
+                LOG.info('  ' + analyzer_type + ': ' + str(res))
+
+        if self.__failed:
+            LOG.info("Failed to analyze")
+            for analyzer_type, res in self.__failed.items():
+                LOG.info('  ' + analyzer_type + ': ' + str(res))
+
+        if self.__reanalyzed_num:
+            LOG.info("Reanalyzed compilation commands: " +
+                     str(self.__reanalyzed_num))
+        if self.__skipped_num:
+            LOG.info("Skipped compilation commands: " +
+                     str(self.__skipped_num))
+        if self.__cache_hits or self.__cache_misses:
+            LOG.info("Result cache hits: " + str(self.__cache_hits) +
+                     ", misses: " + str(self.__cache_misses))
+        if self.__admission:
+            LOG.info("Average concurrency: %.2f, at most %d analyses at "
+                     "the same time." %
+                     (self.__admission.average_running(),
+                      self.__admission.max_running))
+            if self.__admission.delayed:
+                LOG.info("Analyses delayed for memory: " +
+                         str(self.__admission.delayed))
+        self.__print_expensive_analyses()
+
+        duration = time.time() - self.__start_time
+        if duration > 0:
+            LOG.info("Throughput: %.2f actions/sec." %
+                     (self.__result_num / duration))
+        if self.__predicted_makespan is not None:
+            LOG.info("Predicted makespan: %.2f sec, actual: %.2f sec." %
+                     (self.__predicted_makespan, duration))
+        LOG.info("----=================----")
+
+        self.__update_metadata()
+        self.__metadata['makespan'] = {'predicted': self.__predicted_makespan,
+                                       'actual': duration}
+
+        self.__report_index.close()
+        self.__save_history()
 
 
 def create_dependencies(action):
@@ -168,31 +319,219 @@ def create_dependencies(action):
                          "command '" + ' '.join(command) + "'")
 
 
+# The content of the source files written into failure archives by this
+# process: (path, size, modification time) -> content. Failing translation
+# units usually include the same headers, which are read only once this way.
+source_contents = {}
+source_contents_size = 0
+
+# The size limit of the source contents kept in memory in bytes.
+SOURCE_CONTENTS_LIMIT = 256 * 1024 * 1024
+
+
+def __read_source(path):
+    """
+    Return the content of the file.
+    """
+    global source_contents_size
+
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    content = source_contents.get(key)
+    if content is not None:
+        return content
+
+    with open(path, 'rb') as source:
+        content = source.read()
+
+    if source_contents_size + len(content) <= SOURCE_CONTENTS_LIMIT:
+        source_contents[key] = content
+        source_contents_size += len(content)
+
+    return content
+
+
+def __write_source(archive, arcname, content):
+    """
+    Write the content into the archive deflated.
+    """
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.external_attr = 0o600 << 16
+    archive.writestr(zinfo, content)
+
+
+def init_failure_archiver():
+    # Collecting the sources of the failed analyses must not slow down the
+    # analysis running at the same time.
+    try:
+        os.nice(19)
+    except OSError:
+        pass
+
+
+def collect_failure_sources(task):
+    """
+    Write the dependent source files of a failed analysis into its failure
+    archive, created by check(). The task is a (path of the archive, build
+    action, files mentioned in the analyzer output) tuple.
+    """
+    zip_path, action, mentioned_files = task
+
+    try:
+        with zipfile.ZipFile(zip_path, 'a', allowZip64=True) as archive:
+            LOG.debug("Generating dependent headers via compiler...")
+            try:
+                dependencies = set(create_dependencies(action))
+            except Exception as ex:
+                LOG.debug("Couldn't create dependencies:")
+                LOG.debug(str(ex))
+                archive.writestr("no-sources", str(ex))
+                dependencies = set()
+
+            dependencies.update(mentioned_files)
+
+            LOG.debug("Writing dependent files to archive.")
+            for dependent_source in sorted(dependencies):
+                dependent_source = os.path.join(action.directory,
+                                                dependent_source)
+                if not os.path.isabs(dependent_source):
+                    dependent_source = os.path.abspath(dependent_source)
+                LOG.debug("[ZIP] Writing '" + dependent_source + "' to the "
+                          "archive.")
+                archive_path = dependent_source.lstrip('/')
+
+                try:
+                    __write_source(archive,
+                                   os.path.join("sources-root", archive_path),
+                                   __read_source(dependent_source))
+                except Exception as ex:
+                    # In certain cases, the output could contain invalid
+                    # tokens (such as error messages that were printed even
+                    # though the dependency generation returned 0).
+                    LOG.debug("[ZIP] Couldn't write, because " + str(ex))
+                    archive.writestr(
+                        os.path.join("failed-sources-root", archive_path),
+                        "Couldn't write this file, because:\n" + str(ex))
+    except Exception as ex:
+        LOG.debug("Failed to collect the sources into '" + zip_path + "': " +
+                  str(ex))
+
+    return zip_path
+
+
+class FailureArchiver(object):
+    """
+    Collect the dependent source files of the failed analyses into their
+    failure archives in a separate process pool with low priority.
+
+    Generating the dependencies needs another compiler run. If it was done
+    by the analysis workers, a broken toolchain failing every analysis would
+    make the analysis much slower.
+    """
+
+    def __init__(self, jobs, limit=None):
+        """
+        At most limit archives are filled with the source files, if given.
+        """
+        self.__jobs = jobs
+        self.__limit = limit
+        self.__pool = None
+        self.__collected = 0
+        self.__omitted = 0
+
+    def add(self, task):
+        """
+        Start collecting the sources of a failed analysis, see
+        collect_failure_sources().
+        """
+        if self.__limit is not None and self.__collected >= self.__limit:
+            self.__omitted += 1
+            try:
+                with zipfile.ZipFile(task[0], 'a') as archive:
+                    archive.writestr("no-sources",
+                                     "The source files were not collected, "
+                                     "because %d failure archives were "
+                                     "already filled." % self.__limit)
+            except Exception as ex:
+                LOG.debug("Failed to update '" + task[0] + "': " + str(ex))
+            return
+
+        if self.__pool is None:
+            self.__pool = multiprocessing.Pool(
+                self.__jobs, initializer=init_failure_archiver)
+
+        self.__collected += 1
+        self.__pool.apply_async(collect_failure_sources, (task,))
+
+    def finish(self):
+        """
+        Wait for the collection of the sources.
+        """
+        if self.__pool is not None:
+            LOG.info("Collecting the source files of %d failed analyses..." %
+                     self.__collected)
+            self.__pool.close()
+            self.__pool.join()
+
+        if self.__omitted:
+            LOG.info("The source files of %d failed analyses were not "
+                     "collected because of the failure archive limit." %
+                     self.__omitted)
+
+    def terminate(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+
+
 # Progress reporting.
 progress_checked_num = None
 progress_actions = None
 
+# The state shared by every analysis in a worker process. It is given to the
+# worker once when the process is started instead of with every build action.
+shared_analysis_data = None
+check_environment = None
 
-def init_worker(checked_num, action_num):
-    global progress_checked_num, progress_actions
+
+def init_worker(checked_num, action_num, analysis_data):
+    global progress_checked_num, progress_actions, shared_analysis_data, \
+        check_environment
     progress_checked_num = checked_num
     progress_actions = action_num
 
+    shared_analysis_data = analysis_data
+
+    # The analyzer environment is the same for every analysis.
+    context = analysis_data[0]
+    check_environment = analyzer_env.get_check_env(
+        context.path_env_extra,
+        context.ld_lib_path_extra)
 
-def check(check_data):
+
+def check(action):
     """
     Invoke clang with an action which called by processes.
     Different analyzer object belongs to for each build action.
 
     skiplist handler is None if no skip file was configured.
+    result_cache is None if no result cache directory was configured.
     """
 
-    action, context, analyzer_config_map, \
+    context, analyzer_config_map, \
         output_dir, skip_handler, quiet_output_on_stdout, \
-        capture_analysis_output = check_data
+        capture_analysis_output, result_cache = shared_analysis_data
 
     skipped = False
     reanalyzed = False
+    cache_hit = None
+    result_sources = {}
+    durations = {}
+    resource_usage = {}
+    failure_archives = []
+    report_entries = {}
+    rh = None
     try:
         # If one analysis fails the check fails.
         return_codes = 0
@@ -205,6 +544,8 @@ def check(check_data):
             # in the command line.
             # C++ file skipping is handled here.
             source_file_name = os.path.basename(source)
+            analysis_start = time.time()
+            history_source = source
 
             if skip_handler and skip_handler.should_skip(source):
                 LOG.debug_analyzer(source_file_name + ' is skipped')
@@ -225,11 +566,6 @@ def check(check_data):
                         source = source[:idx] + '\ ' + source[idx + 1:]
                         rolling_offset += 1
 
-            # Construct analyzer env.
-            analyzer_environment = analyzer_env.get_check_env(
-                context.path_env_extra,
-                context.ld_lib_path_extra)
-
             # Create a source analyzer.
             source_analyzer = \
                 analyzer_types.construct_analyzer(action,
@@ -250,9 +586,6 @@ def check(check_data):
             if os.path.exists(rh.analyzer_result_file):
                 reanalyzed = True
 
-            # Fills up the result handler with the analyzer information.
-            source_analyzer.analyze(rh, analyzer_environment)
-
             # If source file contains escaped spaces ("\ " tokens), then
             # clangSA writes the plist file with removing this escape
             # sequence, whereas clang-tidy does not. We rewrite the file
@@ -261,6 +594,25 @@ def check(check_data):
             result_base = os.path.basename(result_file)
             failed_dir = os.path.join(output_dir, "failed")
 
+            if result_cache:
+                cache_hit = result_cache.restore(action, source, result_file)
+
+            if cache_hit:
+                # The cached plist is already postprocessed, there is no
+                # need to run the analyzer at all.
+                LOG.debug_analyzer("Restored cached result of '" + source +
+                                   "'")
+                rh.analyzer_returncode = 0
+            else:
+                # Fills up the result handler with the analyzer information.
+                source_analyzer.analyze(rh, check_environment)
+
+                if rh.analyzer_resource_usage:
+                    usage = dict(rh.analyzer_resource_usage)
+                    usage['source'] = history_source
+                    usage['analyzer'] = action.analyzer_type
+                    resource_usage[result_file] = usage
+
             if rh.analyzer_returncode == 0:
                 # Analysis was successful processing results.
                 if capture_analysis_output:
@@ -268,14 +620,17 @@ def check(check_data):
                     if not os.path.exists(success_dir):
                         os.makedirs(success_dir)
 
-                if len(rh.analyzer_stdout) > 0:
-                    if not quiet_output_on_stdout:
+                if rh.analyzer_stdout_size > 0:
+                    # The stdout written to a file is not read into memory
+                    # unless it is logged.
+                    if not quiet_output_on_stdout and \
+                            LOG.isEnabledFor(DEBUG_ANALYZER):
                         LOG.debug_analyzer('\n' + rh.analyzer_stdout)
 
                     if capture_analysis_output:
-                        with open(os.path.join(success_dir, result_base) +
-                                  ".stdout.txt", 'w') as outf:
-                            outf.write(rh.analyzer_stdout)
+                        rh.write_analyzer_stdout(
+                            os.path.join(success_dir, result_base) +
+                            ".stdout.txt")
 
                 if len(rh.analyzer_stderr) > 0:
                     if not quiet_output_on_stdout:
@@ -286,22 +641,44 @@ def check(check_data):
                                   ".stderr.txt", 'w') as outf:
                             outf.write(rh.analyzer_stderr)
 
-                rh.postprocess_result()
+                if not cache_hit:
+                    rh.postprocess_result()
                 # Generated reports will be handled separately at store.
 
-                # Save some extra information next to the plist, .source
-                # acting as an extra metadata file.
-                with open(result_file + ".source", 'w') as orig:
-                    orig.write(
-                        rh.analyzed_source_file.replace(r'\ ', ' ') + "\n")
+                # The parent process merges the analyzed source file of the
+                # result into the metadata.
+                result_sources[result_file] = \
+                    rh.analyzed_source_file.replace(r'\ ', ' ')
+
+                # Restoring a cached result says nothing about the cost of
+                # the analysis.
+                if not cache_hit:
+                    durations[history_source] = time.time() - analysis_start
 
                 if os.path.exists(rh.analyzer_result_file) and \
                         not os.path.exists(result_file):
                     os.rename(rh.analyzer_result_file, result_file)
 
-                LOG.info("[%d/%d] %s analyzed %s successfully." %
+                # The reports of the result are indexed here, in parallel,
+                # and not by the process collecting the results.
+                report_entries[result_file] = report_index.index_entry(
+                    result_file, rh.result_plist)
+
+                if result_cache and not cache_hit:
+                    # The skipped reports are already removed by the
+                    # postprocessing, the skip file is part of the cache key.
+                    try:
+                        dependencies = create_dependencies(rh.buildaction)
+                        result_cache.store(action, source, result_file,
+                                           dependencies)
+                    except Exception as ex:
+                        LOG.debug_analyzer("Couldn't cache the result of '" +
+                                           source + "': " + str(ex))
+
+                LOG.info("[%d/%d] %s analyzed %s successfully%s." %
                          (progress_checked_num.value, progress_actions.value,
-                          action.analyzer_type, source_file_name))
+                          action.analyzer_type, source_file_name,
+                          " (cached)" if cache_hit else ""))
 
                 # Remove the previously generated error file.
                 if os.path.exists(failed_dir):
@@ -309,12 +686,6 @@ def check(check_data):
                     if os.path.exists(err_file):
                         os.remove(err_file)
 
-                if skip_handler:
-                    # We need to check the plist content because skipping
-                    # reports in headers can be done only this way.
-                    plist_parser.skip_report_from_plist(result_file,
-                                                        skip_handler)
-
             else:
                 # If the analysis has failed, we help debugging.
                 if not os.path.exists(failed_dir):
@@ -338,15 +709,6 @@ def check(check_data):
                         if not quiet_output_on_stdout:
                             LOG.debug_analyzer('\n' + rh.analyzer_stderr)
 
-                    LOG.debug("Generating dependent headers via compiler...")
-                    try:
-                        dependencies = set(create_dependencies(rh.buildaction))
-                    except Exception as ex:
-                        LOG.debug("Couldn't create dependencies:")
-                        LOG.debug(str(ex))
-                        archive.writestr("no-sources", str(ex))
-                        dependencies = set()
-
                     LOG.debug("Fetching other dependent files from analyzer "
                               "output...")
                     try:
@@ -366,37 +728,11 @@ def check(check_data):
                         LOG.debug(str(ex))
                         other_files = set()
 
-                    dependencies.update(other_files)
-
-                    LOG.debug("Writing dependent files to archive.")
-                    for dependent_source in dependencies:
-                        dependent_source = os.path.join(action.directory,
-                                                        dependent_source)
-                        if not os.path.isabs(dependent_source):
-                            dependent_source = \
-                                os.path.abspath(dependent_source)
-                        LOG.debug("[ZIP] Writing '" + dependent_source + "' "
-                                  "to the archive.")
-                        archive_path = dependent_source.lstrip('/')
-
-                        try:
-                            archive.write(
-                                dependent_source,
-                                os.path.join("sources-root",
-                                             archive_path),
-                                zipfile.ZIP_DEFLATED)
-                        except Exception as ex:
-                            # In certain cases, the output could contain
-                            # invalid tokens (such as error messages that were
-                            # printed even though the dependency generation
-                            # returned 0).
-                            LOG.debug("[ZIP] Couldn't write, because " +
-                                      str(ex))
-                            archive.writestr(
-                                os.path.join("failed-sources-root",
-                                             archive_path),
-                                "Couldn't write this file, because:\n" +
-                                str(ex))
+                    # The dependent source files are collected into the
+                    # archive by a FailureArchiver, outside of the workers.
+                    failure_archives.append(
+                        (os.path.join(failed_dir, zip_file), rh.buildaction,
+                         sorted(other_files)))
 
                     LOG.debug("[ZIP] Writing extra information...")
 
@@ -421,30 +757,82 @@ def check(check_data):
                 plist_file = result_base + ".plist"
                 if os.path.exists(plist_file):
                     os.remove(plist_file)
+                result_sources[result_file] = None
+
+            rh.remove_analyzer_stdout_file()
 
         progress_checked_num.value += 1
 
         return return_codes, skipped, reanalyzed, action.analyzer_type, \
-            result_file
+            result_sources, cache_hit, durations, resource_usage, \
+            failure_archives, report_entries
 
     except Exception as e:
         LOG.debug_analyzer(str(e))
         traceback.print_exc(file=sys.stdout)
-        return 1, skipped, reanalyzed, action.analyzer_type, None
+        if rh is not None:
+            rh.remove_analyzer_stdout_file()
+        return 1, skipped, reanalyzed, action.analyzer_type, \
+            result_sources, cache_hit, durations, resource_usage, \
+            failure_archives, report_entries
+
+
+def check_admitted(task):
+    """
+    Analyze a build action given by MemoryAdmission.tasks(). Return the
+    index of the build action along with the result, so its memory can be
+    released.
+    """
+    index, action = task
+    return index, check(action)
 
 
 def start_workers(actions, context, analyzer_config_map,
                   jobs, output_path, skip_handler, metadata,
-                  quiet_analyze, capture_analysis_output):
+                  quiet_analyze, capture_analysis_output,
+                  result_cache=None, memory_budget=None,
+                  failure_sources_limit=None):
     """
     Start the workers in the process pool.
     For every build action there is worker which makes the analysis.
+    The actions which took the longest in the previous analysis are started
+    first.
+
+    A build action is started only if its estimated memory usage fits into
+    memory_budget (in kilobytes) together with the running ones. By default
+    the budget is the memory available at the start.
+
+    The source files of at most failure_sources_limit failed analyses are
+    collected into their failure archives, if given.
     """
 
+    history = analysis_history.load_history(output_path)
+    actions, predicted_makespan = \
+        analysis_history.schedule(actions, history, jobs)
+
+    memory_history = analysis_history.load_history(
+        output_path, analysis_history.MEMORY_HISTORY_FILE)
+    if memory_budget is None:
+        memory_budget = memory_admission.available_memory()
+    admission = memory_admission.MemoryAdmission(
+        actions,
+        analysis_history.estimate_memory(actions, memory_history),
+        jobs,
+        memory_budget)
+
+    collector = ResultCollector(metadata, output_path, len(actions),
+                                history, predicted_makespan,
+                                memory_history, admission)
+    archiver = FailureArchiver(jobs, failure_sources_limit)
+
     # Handle SIGINT to stop this script running.
     def signal_handler(*arg, **kwarg):
         try:
+            admission.stop()
             pool.terminate()
+            archiver.terminate()
+            # Keep the results which were finished before the interrupt.
+            collector.checkpoint()
         finally:
             sys.exit(1)
 
@@ -456,34 +844,54 @@ def start_workers(actions, context, analyzer_config_map,
     pool = multiprocessing.Pool(jobs,
                                 initializer=init_worker,
                                 initargs=(checked_var,
-                                          actions_num))
+                                          actions_num,
+                                          (context,
+                                           analyzer_config_map,
+                                           output_path,
+                                           skip_handler,
+                                           quiet_analyze,
+                                           capture_analysis_output,
+                                           result_cache)))
+
+    finished = Queue.Queue()
+
+    def analysis_finished(indexed_result):
+        # Called on the result handler thread of the pool, so the memory is
+        # released and the next build action is started without waiting for
+        # the main thread.
+        index, result = indexed_result
+        admission.release(index)
+        finished.put(result)
+
+    def dispatch():
+        for task in admission.tasks():
+            pool.apply_async(check_admitted, (task,),
+                             callback=analysis_finished)
+
+    dispatcher = threading.Thread(target=dispatch)
+    dispatcher.daemon = True
 
     try:
-        # Workaround, equivalent of map.
-        # The main script does not get signal
-        # while map or map_async function is running.
-        # It is a python bug, this does not happen if a timeout is specified;
-        # then receive the interrupt immediately.
-
-        analyzed_actions = [(build_action,
-                             context,
-                             analyzer_config_map,
-                             output_path,
-                             skip_handler,
-                             quiet_analyze,
-                             capture_analysis_output)
-                            for build_action in actions]
-
-        pool.map_async(check,
-                       analyzed_actions,
-                       1,
-                       callback=lambda results: worker_result_handler(
-                           results, metadata, output_path)
-                       ).get(float('inf'))
-
+        dispatcher.start()
+        for _ in range(len(actions)):
+            # The main script does not get signal while waiting for a result
+            # without timeout. It is a python bug, this does not happen if a
+            # timeout is specified; then receive the interrupt immediately.
+            result = finished.get(True, float('inf'))
+            collector.add(result)
+            for failure_archive in result[8]:
+                archiver.add(failure_archive)
+
+        dispatcher.join()
         pool.close()
     except Exception:
+        admission.stop()
         pool.terminate()
+        archiver.terminate()
         raise
     finally:
         pool.join()
+
+    archiver.finish()
+
+    collector.finish()
@@ -8,15 +8,17 @@ Prepare and start different analysis types
 """
 import copy
 import os
-import shlex
 import shutil
-import subprocess
 import time
 
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.analyze import analysis_manager
 from libcodechecker.analyze import analyzer_env
+from libcodechecker.analyze import ctu_ast_store
 from libcodechecker.analyze import ctu_manager
+from libcodechecker.analyze import distributed
+from libcodechecker.analyze import host_check
+from libcodechecker.analyze import result_cache
 from libcodechecker.analyze import skiplist_handler
 from libcodechecker.analyze.analyzers import analyzer_types
 
@@ -50,18 +52,26 @@ def __get_analyzer_version(context, analyzer_config_map):
     versions = {}
     for _, analyzer_cfg in analyzer_config_map.items():
         analyzer_bin = analyzer_cfg.analyzer_binary
-        version = [analyzer_bin, u' --version']
-        try:
-            output = subprocess.check_output(shlex.split(' '.join(version)),
-                                             env=check_env)
+        output = host_check.get_version(analyzer_bin, check_env)
+        if output is not None:
             versions[analyzer_bin] = output
-        except (subprocess.CalledProcessError, OSError) as oerr:
-            LOG.warning("Failed to get analyzer version: " + ' '.join(version))
-            LOG.warning(oerr.strerror)
+        else:
+            LOG.warning("Failed to get analyzer version: " + analyzer_bin +
+                        " --version")
 
     return versions
 
 
+def __log_startup_phase(phase, start):
+    """
+    Log the duration of a phase before the analysis and return the end of
+    the phase.
+    """
+    end = time.time()
+    LOG.debug("Startup phase, " + phase + ": %.3f sec." % (end - start))
+    return end
+
+
 def __get_skip_handler(args):
     try:
         if args.skipfile:
@@ -71,6 +81,72 @@ def __get_skip_handler(args):
         LOG.debug_analyzer('Skip file was not set in the command line')
 
 
+def __get_result_cache(args, config_map, versions):
+    """
+    Create the result cache if a cache directory was given in the command
+    line. CTU analysis results depend on other translation units too, so
+    these are never cached.
+    """
+    if 'result_cache_dir' not in args:
+        return None
+
+    if 'ctu_phases' in args:
+        LOG.warning("The result cache can not be used in CTU mode, every "
+                    "source file will be analyzed.")
+        return None
+
+    cache_dir = os.path.abspath(args.result_cache_dir)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    LOG.debug_analyzer("Using result cache in '" + cache_dir + "'")
+
+    skip_file_hash = result_cache.hash_file(args.skipfile) \
+        if 'skipfile' in args else None
+
+    config_digests = {}
+    for analyzer, config in config_map.items():
+        version = versions.get(config.analyzer_binary)
+        config_digests[analyzer] = result_cache.config_digest(config, version,
+                                                              skip_file_hash)
+
+    return result_cache.ResultCache(cache_dir, config_digests)
+
+
+def __get_ctu_ast_store_args(args, context, config_map, versions):
+    """
+    Create the CTU AST store if a store directory was given in the command
+    line. Return the store and its size and age limits.
+    """
+    if 'ctu_ast_store_dir' not in args:
+        return None
+
+    if 'ctu_in_memory' in args:
+        LOG.warning("The CTU AST store is not used, as no ASTs are created "
+                    "in on-the-fly CTU mode.")
+        return None
+
+    store_dir = os.path.abspath(args.ctu_ast_store_dir)
+    if not os.path.isdir(store_dir):
+        os.makedirs(store_dir)
+
+    LOG.debug_analyzer("Using CTU AST store in '" + store_dir + "'")
+
+    config = config_map[analyzer_types.CLANG_SA]
+    store = ctu_ast_store.CTUASTStore(store_dir,
+                                      versions.get(config.analyzer_binary),
+                                      context.ctu_func_map_cmd)
+
+    max_size_mb = args.ctu_ast_store_size \
+        if 'ctu_ast_store_size' in args \
+        else ctu_ast_store.DEFAULT_MAX_SIZE_MB
+    max_age_days = args.ctu_ast_store_age \
+        if 'ctu_ast_store_age' in args \
+        else ctu_ast_store.DEFAULT_MAX_AGE_DAYS
+
+    return store, max_size_mb, max_age_days
+
+
 def perform_analysis(args, context, actions, metadata):
     """
     Perform static analysis via the given (or if not, all) analyzers,
@@ -78,11 +154,15 @@ def perform_analysis(args, context, actions, metadata):
     Additionally, insert statistical information into the metadata dict.
     """
 
+    phase_start = time.time()
+
     analyzers = args.analyzers if 'analyzers' in args \
         else analyzer_types.supported_analyzers
     analyzers, _ = analyzer_types.check_supported_analyzers(
         analyzers, context)
 
+    phase_start = __log_startup_phase("checking the analyzers", phase_start)
+
     ctu_collect = False
     ctu_analyze = False
     ctu_dir = ''
@@ -94,14 +174,31 @@ def perform_analysis(args, context, actions, metadata):
         if analyzer_types.CLANG_SA not in analyzers:
             LOG.error("CTU can only be used with the clang static analyzer.")
             return
+        if 'coordinator_address' in args:
+            LOG.error("CTU analysis can not be distributed to analysis "
+                      "workers.")
+            return
+
+    auth_key = None
+    if 'coordinator_address' in args:
+        auth_key = distributed.get_auth_key()
+        if not auth_key:
+            LOG.error("The " + distributed.AUTH_KEY_ENV_VAR + " environment "
+                      "variable must be set to distribute the analysis.")
+            return
 
     actions = prepare_actions(actions, analyzers)
     config_map = analyzer_types.build_config_handlers(args, context, analyzers)
 
+    phase_start = __log_startup_phase("building the analyzer configuration",
+                                      phase_start)
+
     # Save some metadata information.
     versions = __get_analyzer_version(context, config_map)
     metadata['versions'].update(versions)
 
+    __log_startup_phase("getting the analyzer versions", phase_start)
+
     metadata['checkers'] = {}
     for analyzer in analyzers:
         metadata['checkers'][analyzer] = []
@@ -124,15 +221,39 @@ def perform_analysis(args, context, actions, metadata):
 
     if ctu_collect:
         ctu_manager.do_ctu_collect(actions, context, config_map, args.jobs,
-                                   __get_skip_handler(args), ctu_dir)
+                                   __get_skip_handler(args), ctu_dir,
+                                   __get_ctu_ast_store_args(args, context,
+                                                            config_map,
+                                                            versions))
 
-    if ctu_analyze or (not ctu_analyze and not ctu_collect):
+    if 'coordinator_address' in args:
+        distributed.start_coordinator(actions, config_map, args.jobs,
+                                      args.output_path,
+                                      __get_skip_handler(args),
+                                      metadata,
+                                      'quiet' in args,
+                                      'capture_analysis_output' in args,
+                                      __get_result_cache(args, config_map,
+                                                         versions),
+                                      args.coordinator_address,
+                                      auth_key,
+                                      args.failure_sources_limit
+                                      if 'failure_sources_limit' in args
+                                      else None)
+    elif ctu_analyze or (not ctu_analyze and not ctu_collect):
         analysis_manager.start_workers(actions, context, config_map,
                                        args.jobs, args.output_path,
                                        __get_skip_handler(args),
                                        metadata,
                                        'quiet' in args,
-                                       'capture_analysis_output' in args)
+                                       'capture_analysis_output' in args,
+                                       __get_result_cache(args, config_map,
+                                                          versions),
+                                       args.memory_budget * 1024
+                                       if 'memory_budget' in args else None,
+                                       args.failure_sources_limit
+                                       if 'failure_sources_limit' in args
+                                       else None)
 
     end_time = time.time()
     LOG.info("Analysis length: " + str(end_time - start_time) + " sec.")
@@ -5,11 +5,15 @@
 # -------------------------------------------------------------------------
 
 from abc import ABCMeta, abstractmethod
+import errno
 import os
 import shlex
 import signal
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 
 from libcodechecker.logger import LoggerFactory
 
@@ -22,6 +26,11 @@ class SourceAnalyzer(object):
     """
     __metaclass__ = ABCMeta
 
+    # The analyzers which report their results on the standard output write
+    # it to a temporary file, which is processed by the result handler
+    # without reading the whole output into memory.
+    stdout_to_file = False
+
     def __init__(self, config_handler, buildaction):
         self.__config_handler = config_handler
         self.__build_action = buildaction
@@ -97,13 +106,24 @@ class SourceAnalyzer(object):
 
         res_handler.analyzer_cmd = analyzer_cmd
         analyzer_cmd = ' '.join(analyzer_cmd)
+        stdout_file = None
         try:
-            ret_code, stdout, stderr \
-                = SourceAnalyzer.run_proc(analyzer_cmd,
-                                          env,
-                                          res_handler.buildaction.directory)
+            if self.stdout_to_file:
+                fd, stdout_path = tempfile.mkstemp(prefix='stdout-',
+                                                   suffix='.txt')
+                stdout_file = os.fdopen(fd, 'wb')
+                res_handler.analyzer_stdout_file = stdout_path
+
+            ret_code, stdout, stderr, usage \
+                = SourceAnalyzer.run_proc_with_usage(
+                    analyzer_cmd,
+                    env,
+                    res_handler.buildaction.directory,
+                    stdout_file)
             res_handler.analyzer_returncode = ret_code
-            res_handler.analyzer_stdout = stdout
+            res_handler.analyzer_resource_usage = usage
+            if stdout_file is None:
+                res_handler.analyzer_stdout = stdout
             res_handler.analyzer_stderr = stderr
             return res_handler
 
@@ -112,6 +132,10 @@ class SourceAnalyzer(object):
             res_handler.analyzer_returncode = 1
             return res_handler
 
+        finally:
+            if stdout_file is not None:
+                stdout_file.close()
+
     @abstractmethod
     def get_analyzer_checkers(self, config_handler, env):
         """
@@ -125,6 +149,25 @@ class SourceAnalyzer(object):
         Just run the given command and return the return code
         and the stdout and stderr outputs of the process.
         """
+        ret_code, stdout, stderr, _ = \
+            SourceAnalyzer.run_proc_with_usage(command, env, cwd)
+        return ret_code, stdout, stderr
+
+    @staticmethod
+    def run_proc_with_usage(command, env=None, cwd=None, stdout_file=None):
+        """
+        Run the given command and return the return code, the stdout and
+        stderr outputs, and the resources used by the process.
+
+        If a stdout_file is given the stdout of the process is written to
+        this file object instead of being read into memory, and None is
+        returned as the stdout output.
+
+        The resource usage is a dictionary with the wall clock time, the user
+        and system CPU time in seconds, and the maximum resident set size in
+        kilobytes. The usage of the child processes waited for by the
+        process is included.
+        """
 
         def signal_handler(*args, **kwargs):
             # Clang does not kill its child processes, so I have to.
@@ -137,13 +180,55 @@ class SourceAnalyzer(object):
         signal.signal(signal.SIGINT, signal_handler)
         cmd = shlex.split(command)
 
+        start_time = time.time()
         proc = subprocess.Popen(cmd,
                                 bufsize=-1,
                                 env=env,
                                 preexec_fn=os.setsid,
                                 cwd=cwd,
-                                stdout=subprocess.PIPE,
+                                stdout=stdout_file or subprocess.PIPE,
                                 stderr=subprocess.PIPE)
 
-        (stdout, stderr) = proc.communicate()
-        return proc.returncode, stdout, stderr
+        # Popen.communicate() reaps the process without its resource usage,
+        # so the outputs are read on separate threads and the process is
+        # waited for here.
+        outputs = {'stdout': None}
+
+        def read_output(name, pipe):
+            outputs[name] = pipe.read()
+            pipe.close()
+
+        readers = [threading.Thread(target=read_output, args=(name, pipe))
+                   for name, pipe in [('stdout', proc.stdout),
+                                      ('stderr', proc.stderr)]
+                   if pipe is not None]
+        for reader in readers:
+            reader.start()
+
+        while True:
+            try:
+                _, status, rusage = os.wait4(proc.pid, 0)
+                break
+            except OSError as ex:
+                if ex.errno != errno.EINTR:
+                    raise
+
+        for reader in readers:
+            reader.join()
+
+        if os.WIFSIGNALED(status):
+            proc.returncode = -os.WTERMSIG(status)
+        else:
+            proc.returncode = os.WEXITSTATUS(status)
+
+        max_rss = rusage.ru_maxrss
+        if sys.platform == 'darwin':
+            # Reported in bytes instead of kilobytes.
+            max_rss /= 1024
+
+        usage = {'wall': time.time() - start_time,
+                 'user': rusage.ru_utime,
+                 'sys': rusage.ru_stime,
+                 'max_rss': max_rss}
+
+        return proc.returncode, outputs['stdout'], outputs['stderr'], usage
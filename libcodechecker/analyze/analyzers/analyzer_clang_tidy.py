@@ -11,6 +11,7 @@ import re
 import shlex
 import subprocess
 
+from libcodechecker.analyze import probe_cache
 from libcodechecker.analyze.analyzers import analyzer_base
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.util import get_binary_in_path
@@ -25,6 +26,9 @@ class ClangTidy(analyzer_base.SourceAnalyzer):
     Constructs the clang tidy analyzer commands.
     """
 
+    # The reports are printed on the standard output.
+    stdout_to_file = True
+
     def __parse_checkers(self, tidy_output):
         """
         Parse clang tidy checkers list.
@@ -51,16 +55,40 @@ class ClangTidy(analyzer_base.SourceAnalyzer):
 
             command = [analyzer_binary, "-list-checks", "-checks='*'", "-",
                        "--"]
+            command = shlex.split(' '.join(command))
+
+            def probe():
+                try:
+                    return subprocess.check_output(command, env=env)
+                except (subprocess.CalledProcessError, OSError):
+                    return None
 
-            try:
-                command = shlex.split(' '.join(command))
-                result = subprocess.check_output(command, env=env)
-                self.__parse_checkers(result)
-            except (subprocess.CalledProcessError, OSError):
+            result = probe_cache.cached_probe('checkers', command, probe, env)
+            if result is None:
                 return {}
+            self.__parse_checkers(result)
 
         return self.checkers
 
+    def __build_checks_arg(self):
+        """
+        Build the argument enabling and disabling the checkers.
+        """
+        # Disable all checkers by default.
+        # The latest clang-tidy (3.9) release enables clang static analyzer
+        # checkers by default. They must be disabled explicitly.
+        checkers_cmdline = '-*,-clang-analyzer-*'
+
+        # Config handler stores which checkers are enabled or disabled.
+        for checker_name, value in self.config_handler.checks().items():
+            enabled, _ = value
+            if enabled:
+                checkers_cmdline += ',' + checker_name
+            else:
+                checkers_cmdline += ',-' + checker_name
+
+        return "-checks='" + checkers_cmdline.lstrip(',') + "'"
+
     def construct_analyzer_cmd(self, res_handler):
         """
         """
@@ -69,21 +97,8 @@ class ClangTidy(analyzer_base.SourceAnalyzer):
 
             analyzer_cmd = [config.analyzer_binary]
 
-            # Disable all checkers by default.
-            # The latest clang-tidy (3.9) release enables clang static analyzer
-            # checkers by default. They must be disabled explicitly.
-            checkers_cmdline = '-*,-clang-analyzer-*'
-
-            # Config handler stores which checkers are enabled or disabled.
-            for checker_name, value in config.checks().items():
-                enabled, _ = value
-                if enabled:
-                    checkers_cmdline += ',' + checker_name
-                else:
-                    checkers_cmdline += ',-' + checker_name
-
-            analyzer_cmd.append("-checks='" + checkers_cmdline.lstrip(',') +
-                                "'")
+            analyzer_cmd.append(config.get_cached_arguments(
+                'clang_tidy_checks', self.__build_checks_arg))
 
             LOG.debug(config.analyzer_extra_arguments)
             analyzer_cmd.append(config.analyzer_extra_arguments)
@@ -12,6 +12,7 @@ import subprocess
 from libcodechecker.analyze.analyzers import analyzer_base
 from libcodechecker.analyze.analyzers import ctu_triple_arch
 from libcodechecker.analyze import analyzer_env
+from libcodechecker.analyze import probe_cache
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.util import get_binary_in_path
 from libcodechecker.analyze.analyzer_env import\
@@ -64,17 +65,73 @@ class ClangSA(analyzer_base.SourceAnalyzer):
             for plugin in config_handler.analyzer_plugins:
                 command.extend(["-load", plugin])
             command.append("-analyzer-checker-help")
-
-            try:
-                command = shlex.split(' '.join(command))
-                result = subprocess.check_output(command,
-                                                 env=env)
-                self.__parse_checkers(result)
-            except (subprocess.CalledProcessError, OSError):
+            command = shlex.split(' '.join(command))
+
+            def probe():
+                try:
+                    return subprocess.check_output(command, env=env)
+                except (subprocess.CalledProcessError, OSError):
+                    return None
+
+            result = probe_cache.cached_probe(
+                'checkers', command, probe, env,
+                config_handler.analyzer_plugins)
+            if result is None:
                 return {}
+            self.__parse_checkers(result)
 
         return self.checkers
 
+    def __build_cmd_prefix(self):
+        """
+        Build the beginning of the analyzer command which is the same for
+        every analyzed source file.
+        """
+        config = self.config_handler
+
+        analyzer_cmd = [config.analyzer_binary]
+
+        # Do not warn about the unused gcc/g++ arguments.
+        analyzer_cmd.append('-Qunused-arguments')
+
+        analyzer_cmd.append('--analyze')
+
+        # Turn off clang hardcoded checkers list.
+        analyzer_cmd.append('--analyzer-no-default-checks')
+
+        for plugin in config.analyzer_plugins:
+            analyzer_cmd.extend(["-Xclang", "-plugin",
+                                 "-Xclang", "checkercfg",
+                                 "-Xclang", "-load",
+                                 "-Xclang", plugin])
+
+        analyzer_mode = 'plist-multi-file'
+        analyzer_cmd.extend(['-Xclang',
+                             '-analyzer-opt-analyze-headers',
+                             '-Xclang',
+                             '-analyzer-output=' + analyzer_mode])
+
+        return analyzer_cmd
+
+    def __build_checker_args(self):
+        """
+        Build the arguments enabling and disabling the checkers.
+        """
+        checker_args = []
+
+        # Config handler stores which checkers are enabled or disabled.
+        for checker_name, value in self.config_handler.checks().items():
+            enabled, _ = value
+            if enabled:
+                checker_args.extend(['-Xclang',
+                                     '-analyzer-checker=' + checker_name])
+            else:
+                checker_args.extend(['-Xclang',
+                                     '-analyzer-disable-checker',
+                                     '-Xclang', checker_name])
+
+        return checker_args
+
     def construct_analyzer_cmd(self, result_handler):
         """
         Called by the analyzer method.
@@ -88,40 +145,13 @@ class ClangSA(analyzer_base.SourceAnalyzer):
             # Checker order matters.
             config = self.config_handler
 
-            analyzer_cmd = [config.analyzer_binary]
-
-            # Do not warn about the unused gcc/g++ arguments.
-            analyzer_cmd.append('-Qunused-arguments')
-
-            analyzer_cmd.append('--analyze')
-
-            # Turn off clang hardcoded checkers list.
-            analyzer_cmd.append('--analyzer-no-default-checks')
-
-            for plugin in config.analyzer_plugins:
-                analyzer_cmd.extend(["-Xclang", "-plugin",
-                                     "-Xclang", "checkercfg",
-                                     "-Xclang", "-load",
-                                     "-Xclang", plugin])
-
-            analyzer_mode = 'plist-multi-file'
-            analyzer_cmd.extend(['-Xclang',
-                                 '-analyzer-opt-analyze-headers',
-                                 '-Xclang',
-                                 '-analyzer-output=' + analyzer_mode])
+            analyzer_cmd = list(config.get_cached_arguments(
+                'clangsa_prefix', self.__build_cmd_prefix))
 
             analyzer_cmd.extend(['-o', analyzer_output_file])
 
-            # Config handler stores which checkers are enabled or disabled.
-            for checker_name, value in config.checks().items():
-                enabled, _ = value
-                if enabled:
-                    analyzer_cmd.extend(['-Xclang',
-                                         '-analyzer-checker=' + checker_name])
-                else:
-                    analyzer_cmd.extend(['-Xclang',
-                                         '-analyzer-disable-checker',
-                                         '-Xclang', checker_name])
+            analyzer_cmd.extend(config.get_cached_arguments(
+                'clangsa_checkers', self.__build_checker_args))
 
             if config.ctu_dir:
                 analyzer_cmd.extend(['-Xclang', '-analyzer-config',
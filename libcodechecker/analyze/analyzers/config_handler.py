@@ -32,6 +32,20 @@ class AnalyzerConfigHandler(object):
         # (False/True, 'checker_description')
         self.__available_checkers = collections.OrderedDict()
 
+        # Analyzer command parts built from the configuration.
+        # See get_cached_arguments().
+        self.__cached_arguments = {}
+
+    def get_cached_arguments(self, key, build_func):
+        """
+        Return the analyzer command part which is built by build_func from
+        this configuration. The parts are built only once for every key, as
+        the configuration is the same for every analyzed source file.
+        """
+        if key not in self.__cached_arguments:
+            self.__cached_arguments[key] = build_func()
+        return self.__cached_arguments[key]
+
     @property
     def analyzer_plugins_dir(self):
         """
@@ -45,6 +59,7 @@ class AnalyzerConfigHandler(object):
         Set the directory where shared objects with checkers can be found.
         """
         self.__analyzer_plugins_dir = value
+        self.__cached_arguments.clear()
 
     @property
     def analyzer_plugins(self):
@@ -64,6 +79,7 @@ class AnalyzerConfigHandler(object):
     @analyzer_binary.setter
     def analyzer_binary(self, value):
         self.__analyzer_binary = value
+        self.__cached_arguments.clear()
 
     @abstractmethod
     def get_checker_configs(self):
@@ -78,6 +94,7 @@ class AnalyzerConfigHandler(object):
         Tuple of (checker_name, True\False).
         """
         self.__available_checkers[checker_name] = (enabled, description)
+        self.__cached_arguments.clear()
 
     def enable_checker(self, checker_name, description=None):
         """
@@ -87,6 +104,7 @@ class AnalyzerConfigHandler(object):
             if ch_name.startswith(checker_name):
                 _, description = values
                 self.__available_checkers[ch_name] = (True, description)
+        self.__cached_arguments.clear()
 
     def disable_checker(self, checker_name, description=None):
         """
@@ -96,6 +114,7 @@ class AnalyzerConfigHandler(object):
             if ch_name.startswith(checker_name):
                 _, description = values
                 self.__available_checkers[ch_name] = (False, description)
+        self.__cached_arguments.clear()
 
     def checks(self):
         """
@@ -130,3 +149,4 @@ class AnalyzerConfigHandler(object):
         Extra arguments forwarded to the analyzer without modification.
         """
         self.__analyzer_extra_arguments = value
+        self.__cached_arguments.clear()
@@ -7,11 +7,30 @@
 Helpers for determining triple arch of a compile action
 """
 
+import hashlib
+import os
 import shlex
 
 from libcodechecker.analyze.analyzers import analyzer_base
 from libcodechecker.analyze.analyzer_env import\
     extend_analyzer_cmd_with_resource_dir
+from libcodechecker.analyze.result_cache import write_atomically
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('CTU TRIPLE ARCH')
+
+# The name of the directory in the CTU directory which contains the probed
+# triple arches. It is hidden, so it is not mistaken for a triple arch.
+TRIPLE_CACHE_DIR = '.triple_cache'
+
+# Options whose value is in the next argument and select the target.
+TARGET_OPTIONS_WITH_VALUE = ('-target', '-arch')
+
+# Triple arches already known in this process, see get_triple_arch().
+triple_cache = {}
+
+# Number of compiler invocations made in this process to probe the triple.
+probe_count = 0
 
 
 def get_compile_command(action, config, source='', output=''):
@@ -33,9 +52,89 @@ def get_compile_command(action, config, source='', output=''):
     return cmd
 
 
+def get_target_options(options):
+    """ Returns the options of a compile command which can change the target
+    triple. """
+
+    target_options = []
+    i = 0
+    while i < len(options):
+        option = options[i]
+        if option in TARGET_OPTIONS_WITH_VALUE:
+            target_options.extend(options[i:i + 2])
+            i += 2
+            continue
+
+        if option.startswith('-m') or option.startswith('--target=') or \
+                option.startswith('-target='):
+            target_options.append(option)
+        i += 1
+
+    return target_options
+
+
+def triple_cache_key(action, config):
+    """ The triple arch depends only on the compiler and the target options
+    of the compile command, not on the compiled source file. """
+
+    key_content = [str(config.analyzer_binary),
+                   str(config.compiler_resource_dir),
+                   str(config.analyzer_extra_arguments),
+                   str(action.target)] + \
+        get_target_options(action.analyzer_options)
+
+    return hashlib.sha1('|'.join(key_content)).hexdigest()
+
+
 def get_triple_arch(action, source, config, env):
     """Returns the architecture part of the target triple for the given
-    compilation command. """
+    compilation command.
+
+    The compiler is invoked only once for every distinct target
+    configuration. The results are shared between the worker processes
+    through the CTU directory."""
+
+    key = triple_cache_key(action, config)
+    if key in triple_cache:
+        return triple_cache[key]
+
+    cache_file = None
+    if config.ctu_dir:
+        cache_file = os.path.join(config.ctu_dir, TRIPLE_CACHE_DIR, key)
+        try:
+            with open(cache_file, 'r') as cached:
+                triple_cache[key] = cached.read().strip()
+                return triple_cache[key]
+        except IOError:
+            pass
+
+    arch = probe_triple_arch(action, source, config, env)
+    if not arch:
+        return arch
+
+    triple_cache[key] = arch
+    if cache_file:
+        try:
+            cache_dir = os.path.dirname(cache_file)
+            if not os.path.isdir(cache_dir):
+                try:
+                    os.makedirs(cache_dir)
+                except OSError:
+                    # Another worker might have created it.
+                    pass
+            write_atomically(cache_file, lambda out: out.write(arch))
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to save the triple arch: " + str(ex))
+
+    return arch
+
+
+def probe_triple_arch(action, source, config, env):
+    """Invokes the compiler to get the architecture part of the target triple
+    for the given compilation command. """
+
+    global probe_count
+    probe_count += 1
 
     cmd = get_compile_command(action, config, source)
     cmd.insert(1, '-###')
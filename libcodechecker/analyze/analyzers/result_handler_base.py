@@ -7,7 +7,9 @@
 from abc import ABCMeta
 import hashlib
 import os
+import shutil
 
+from libcodechecker.analyze import plist_parser
 from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('RESULT HANDLER (BASE)')
@@ -46,15 +48,21 @@ class ResultHandler(object):
 
         self.__analyzer_cmd = []
         self.__analyzer_stdout = ''
+        self.__analyzer_stdout_file = None
         self.__analyzer_stderr = ''
         self.__severity_map = {}
         self.__skiplist_handler = None
         self.__analyzed_source_file = None
         self.__analyzer_returncode = 1
+        self.__analyzer_resource_usage = None
         self.__buildaction = action
 
         self.__result_file = None
 
+        # The content of the result plist if it was read by the
+        # postprocessing, so it does not have to be read again.
+        self.result_plist = None
+
     @property
     def buildaction(self):
         """
@@ -126,8 +134,12 @@ class ResultHandler(object):
     @property
     def analyzer_stdout(self):
         """
-        Get the stdout from the analyzer.
+        Get the stdout from the analyzer. If the stdout was written to a
+        file it is read only when it is first asked for.
         """
+        if self.__analyzer_stdout is None:
+            with open(self.__analyzer_stdout_file, 'rb') as stdout:
+                self.__analyzer_stdout = stdout.read()
         return self.__analyzer_stdout
 
     @analyzer_stdout.setter
@@ -137,6 +149,73 @@ class ResultHandler(object):
         """
         self.__analyzer_stdout = stdout
 
+    @property
+    def analyzer_stdout_file(self):
+        """
+        The temporary file the stdout of the analyzer was written to, None
+        if the stdout was read into memory.
+        """
+        return self.__analyzer_stdout_file
+
+    @analyzer_stdout_file.setter
+    def analyzer_stdout_file(self, path):
+        """
+        Set the file the stdout of the analyzer is written to.
+        """
+        self.__analyzer_stdout_file = path
+        self.__analyzer_stdout = None
+
+    @property
+    def analyzer_stdout_size(self):
+        """
+        Size of the stdout of the analyzer without reading it from the file.
+        """
+        if self.__analyzer_stdout is None:
+            try:
+                return os.path.getsize(self.__analyzer_stdout_file)
+            except OSError:
+                return 0
+        return len(self.__analyzer_stdout)
+
+    def analyzer_stdout_lines(self):
+        """
+        Iterate over the lines of the stdout of the analyzer. The stdout
+        file is read line by line.
+        """
+        if self.__analyzer_stdout is None:
+            # Universal newlines, like str.splitlines().
+            with open(self.__analyzer_stdout_file, 'rU') as stdout:
+                for line in stdout:
+                    yield line
+        else:
+            for line in self.__analyzer_stdout.splitlines():
+                yield line
+
+    def write_analyzer_stdout(self, path):
+        """
+        Write the stdout of the analyzer to the given file.
+        """
+        if self.__analyzer_stdout is None:
+            shutil.copyfile(self.__analyzer_stdout_file, path)
+        else:
+            with open(path, 'w') as outf:
+                outf.write(self.__analyzer_stdout)
+
+    def remove_analyzer_stdout_file(self):
+        """
+        Remove the temporary stdout file of the analyzer, if there is one.
+        """
+        if self.__analyzer_stdout_file is None:
+            return
+
+        if self.__analyzer_stdout is None:
+            self.__analyzer_stdout = ''
+        try:
+            os.remove(self.__analyzer_stdout_file)
+        except OSError:
+            pass
+        self.__analyzer_stdout_file = None
+
     @property
     def analyzer_stderr(self):
         """
@@ -151,6 +230,22 @@ class ResultHandler(object):
         """
         self.__analyzer_stderr = stderr
 
+    @property
+    def analyzer_resource_usage(self):
+        """
+        Get the resources used by the analyzer process, see
+        SourceAnalyzer.run_proc_with_usage(). None if the analyzer was not
+        run.
+        """
+        return self.__analyzer_resource_usage
+
+    @analyzer_resource_usage.setter
+    def analyzer_resource_usage(self, usage):
+        """
+        Set the resources used by the analyzer process.
+        """
+        self.__analyzer_resource_usage = usage
+
     @property
     def analyzed_source_file(self):
         """
@@ -207,8 +302,21 @@ class ResultHandler(object):
         """
         Postprocess result if needed.
         Should be called after the analyses finished.
+
+        The reports in the files which should be skipped are removed from the
+        result plist written by the analyzer.
         """
-        pass
+        if not self.skiplist_handler:
+            return
+
+        # The analyzer might have removed the escaping of the spaces from
+        # the name of the result file.
+        for result_file in [self.analyzer_result_file,
+                            self.analyzer_result_file.replace(r'\ ', ' ')]:
+            if os.path.exists(result_file):
+                self.result_plist = plist_parser.skip_report_from_plist(
+                    result_file, self.skiplist_handler)
+                break
 
     def handle_results(self, client):
         """
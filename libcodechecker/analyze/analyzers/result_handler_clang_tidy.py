@@ -14,18 +14,25 @@ from libcodechecker.logger import LoggerFactory
 LOG = LoggerFactory.get_new_logger('CLANG-TIDY RESULT HANDLER')
 
 
-def generate_plist_from_tidy_result(output_file, tidy_stdout):
+def generate_plist_from_tidy_result(output_file, tidy_stdout,
+                                    skiplist_handler=None):
     """
-    Generate a plist file from the clang tidy analyzer results.
+    Generate a plist file from the clang tidy analyzer results. The lines of
+    the output are converted as they are read, the diagnostics are written
+    one by one. The messages in the files which should be skipped are left
+    out.
     """
     parser = tidy_output_converter.OutputParser()
 
-    messages = parser.parse_messages(tidy_stdout)
+    messages = parser.iter_messages(tidy_stdout)
+    if skiplist_handler:
+        messages = (message for message in messages
+                    if not skiplist_handler.should_skip(message.path))
 
-    plist_converter = tidy_output_converter.PListConverter()
-    plist_converter.add_messages(messages)
-
-    plist_converter.write_to_file(output_file)
+    files = []
+    diagnostics = tidy_output_converter.iter_diagnostics(messages, files)
+    with open(output_file, 'wb') as plist:
+        tidy_output_converter.write_plist(diagnostics, files, plist)
 
 
 class ClangTidyPlistToFile(ResultHandler):
@@ -39,9 +46,9 @@ class ClangTidyPlistToFile(ResultHandler):
         results which can be stored into the database.
         """
         output_file = self.analyzer_result_file
-        LOG.debug_analyzer(self.analyzer_stdout)
-        tidy_stdout = self.analyzer_stdout.splitlines()
-        generate_plist_from_tidy_result(output_file, tidy_stdout)
+        generate_plist_from_tidy_result(output_file,
+                                        self.analyzer_stdout_lines(),
+                                        self.skiplist_handler)
 
 
 class ClangTidyPlistToStdout(PlistToStdout):
@@ -56,5 +63,6 @@ class ClangTidyPlistToStdout(PlistToStdout):
         """
 
         output_file = self.analyzer_result_file
-        tidy_stdout = self.analyzer_stdout.splitlines()
-        generate_plist_from_tidy_result(output_file, tidy_stdout)
+        generate_plist_from_tidy_result(output_file,
+                                        self.analyzer_stdout_lines(),
+                                        self.skiplist_handler)
@@ -6,15 +6,16 @@
 
 from abc import ABCMeta
 from collections import defaultdict
-import linecache
 import math
 import os
 import sys
 
+from libcodechecker import source_cache
 from libcodechecker import suppress_handler
-from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_index
 from libcodechecker.analyze.analyzers.result_handler_base import ResultHandler
 from libcodechecker.logger import LoggerFactory
+from libcodechecker.report import report_key
 
 LOG = LoggerFactory.get_new_logger('PLIST TO STDOUT')
 
@@ -33,6 +34,8 @@ class PlistToStdout(ResultHandler):
         self.__output = sys.stdout
         self.__lock = lock
         self.suppress_handler = None
+        # Leaves out the reports which are the same as an earlier one.
+        self.deduplicator = None
 
     @property
     def print_steps(self):
@@ -48,12 +51,26 @@ class PlistToStdout(ResultHandler):
         """
         self.__print_steps = value
 
+    @property
+    def output(self):
+        """
+        The file object the results are printed to, the standard output by
+        default.
+        """
+        return self.__output
+
+    @output.setter
+    def output(self, output):
+        self.__output = output
+
     @staticmethod
     def __format_location(event, source_file):
         loc = event['location']
-        line = linecache.getline(source_file, loc['line'])
+        line = source_cache.get_line(source_file, loc['line'])
         if line == '':
             return line
+        if not line.endswith('\n'):
+            line += '\n'
 
         marker_line = line[0:(loc['col'] - 1)]
         marker_line = ' ' * (len(marker_line) + marker_line.count('\t'))
@@ -77,18 +94,18 @@ class PlistToStdout(ResultHandler):
                                      loc['col'],
                                      event['message'])
 
-    def __print_bugs(self, reports, files, report_stats):
-
-        severity_stats = defaultdict(int)
-        file_stats = defaultdict(int)
-        report_count = defaultdict(int)
+    def __format_bugs(self, reports, files):
+        """
+        Format the reports which are not skipped or suppressed. Return a
+        list of (report key, file path, severity, text) tuples.
+        """
 
         report_num = len(reports)
         if report_num > 0:
             index_format = '    %%%dd, ' % \
                            int(math.floor(math.log10(report_num)) + 1)
 
-        non_suppressed = 0
+        bugs = []
         for report in reports:
             events = [i for i in report.bug_path if i.get('kind') == 'event']
             f_path = files[events[-1]['location']['file']]
@@ -128,32 +145,51 @@ class PlistToStdout(ResultHandler):
 
                 continue
 
-            file_stats[f_path] += 1
             severity = self.severity_map.get(checker_name,
                                              'UNSPECIFIED')
-            severity_stats[severity] += 1
-            report_count["report_count"] += 1
 
-            self.__output.write(self.__format_bug_event(checker_name,
-                                                        severity,
-                                                        last_report_event,
-                                                        source_file))
-            self.__output.write('\n')
-            self.__output.write(self.__format_location(last_report_event,
-                                                       source_file))
-            self.__output.write('\n')
+            text = [self.__format_bug_event(checker_name,
+                                            severity,
+                                            last_report_event,
+                                            source_file),
+                    '\n',
+                    self.__format_location(last_report_event, source_file),
+                    '\n']
             if self.__print_steps:
-                self.__output.write('  Report hash: ' + report_hash + '\n')
-                self.__output.write('  Steps:\n')
+                text.append('  Report hash: ' + report_hash + '\n')
+                text.append('  Steps:\n')
                 for index, event in enumerate(events):
-                    self.__output.write(index_format % (index + 1))
+                    text.append(index_format % (index + 1))
                     source_file = files[event['location']['file']]
-                    self.__output.write(self.__format_bug_event(None,
-                                                                None,
-                                                                event,
-                                                                source_file))
-                    self.__output.write('\n')
-            self.__output.write('\n')
+                    text.append(self.__format_bug_event(None,
+                                                        None,
+                                                        event,
+                                                        source_file))
+                    text.append('\n')
+            text.append('\n')
+
+            bugs.append((report_key(report, files), f_path, severity,
+                         ''.join(text)))
+
+        return bugs
+
+    def __write_bugs(self, bugs, report_stats):
+
+        severity_stats = defaultdict(int)
+        file_stats = defaultdict(int)
+        report_count = defaultdict(int)
+
+        non_suppressed = 0
+        for key, f_path, severity, text in bugs:
+            if self.deduplicator and self.deduplicator.is_duplicate(key):
+                LOG.debug("Skipping a duplicate report in " + f_path)
+                continue
+
+            file_stats[f_path] += 1
+            severity_stats[severity] += 1
+            report_count["report_count"] += 1
+
+            self.__output.write(text)
 
             non_suppressed += 1
 
@@ -174,35 +210,56 @@ class PlistToStdout(ResultHandler):
         report_stats["files"] = file_stats
         report_stats["reports"] = report_count
 
-    def handle_results(self, client=None):
+    def format_results(self):
+        """
+        Parse the plist of the handler and format its reports. Return the
+        formatted reports, which can be written by write_results(), or None
+        if the plist is not valid.
+        """
         plist = self.analyzer_result_file
 
-        report_stats = {}
-
         try:
-            files, reports = plist_parser.parse_plist(plist)
+            files, reports = report_index.parse_plist(plist)
         except Exception as ex:
             LOG.error('The generated plist is not valid!')
             LOG.error(ex)
-            return 1
-
-        err_code = self.analyzer_returncode
-
-        if err_code == 0:
-            try:
-                # No lock when consuming plist.
-                if self.__lock:
-                    self.__lock.acquire()
-                self.__print_bugs(reports, files, report_stats)
-            finally:
-                if self.__lock:
-                    self.__lock.release()
+            return None
+
+        if self.analyzer_returncode != 0:
+            return []
+
+        return self.__format_bugs(reports, files)
+
+    def write_results(self, bugs):
+        """
+        Write the reports formatted by format_results() to the output and
+        return the report statistics. The reports which are the same as an
+        earlier one are left out if the handler has a deduplicator.
+        """
+        report_stats = {}
+        if self.analyzer_returncode == 0:
+            self.__write_bugs(bugs, report_stats)
         else:
             self.__output.write('Analyzing %s with %s failed.\n' %
                                 (os.path.basename(self.analyzed_source_file),
                                  self.buildaction.analyzer_type))
         return report_stats
 
+    def handle_results(self, client=None):
+        try:
+            # No lock when consuming plist.
+            if self.__lock:
+                self.__lock.acquire()
+
+            bugs = self.format_results()
+            if bugs is None:
+                return 1
+
+            return self.write_results(bugs)
+        finally:
+            if self.__lock:
+                self.__lock.release()
+
     def postprocess_result(self):
         """
         No postprocessing required for plists.
@@ -0,0 +1,207 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Persistent store of the ASTs and function maps created by the collect phase
+of the CTU analysis.
+
+The entries are keyed by the compile command of the translation unit and
+the analyzer configuration. Every entry has a manifest with the content hash
+of the files the translation unit depends on, the same way as the analysis
+result cache does. Unchanged translation units get their AST from the store
+instead of compiling it again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from libcodechecker.analyze.result_cache import hash_file
+from libcodechecker.analyze.result_cache import write_atomically
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('CTU AST STORE')
+
+# Default limits of the store used if no limit is given in the command line.
+DEFAULT_MAX_SIZE_MB = 10240
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+class CTUASTStore(object):
+    """
+    Store and restore the AST dumps and the function maps of translation
+    units in a directory shared between CTU analysis runs.
+
+    The object is passed to the collect workers so it should stay picklable.
+    """
+
+    def __init__(self, store_dir, analyzer_version, func_map_cmd):
+        self.__store_dir = os.path.abspath(store_dir)
+        self.__analyzer_version = str(analyzer_version)
+        self.__func_map_cmd = str(func_map_cmd)
+
+    @property
+    def store_dir(self):
+        return self.__store_dir
+
+    def key(self, compile_command, directory, triple_arch):
+        """
+        Key of the AST created by the given compile command.
+        """
+        key_content = [self.__analyzer_version,
+                       self.__func_map_cmd,
+                       triple_arch,
+                       directory,
+                       ' '.join(compile_command)]
+
+        return hashlib.sha1('|'.join(key_content)).hexdigest()
+
+    def __entry_path(self, key):
+        return os.path.join(self.__store_dir, key[:2], key)
+
+    def restore(self, key, ast_path):
+        """
+        Link (or copy) the stored AST of the key to ast_path if every
+        dependency of the translation unit is unchanged.
+        Return the stored function map lines, or None if the AST is not
+        available.
+        """
+        entry = self.__entry_path(key)
+        try:
+            with open(entry + '.json', 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, ValueError):
+            return None
+
+        for dependency, content_hash in manifest['dependencies'].items():
+            if hash_file(dependency) != content_hash:
+                LOG.debug_analyzer("Stored AST '" + key + "' is outdated, '" +
+                                   dependency + "' changed.")
+                return None
+
+        try:
+            ast_dir = os.path.dirname(ast_path)
+            if not os.path.isdir(ast_dir):
+                try:
+                    os.makedirs(ast_dir)
+                except OSError:
+                    # Another worker might have created it.
+                    pass
+
+            if os.path.exists(ast_path):
+                os.remove(ast_path)
+
+            try:
+                # Hard links keep the AST of the analysis even if the entry
+                # is evicted from the store in the meantime.
+                os.link(entry + '.ast', ast_path)
+            except OSError:
+                shutil.copyfile(entry + '.ast', ast_path)
+
+            # The modification time of the manifest is the last use of the
+            # entry.
+            os.utime(entry + '.json', None)
+        except (IOError, OSError) as ex:
+            LOG.debug_analyzer("Failed to restore stored AST: " + str(ex))
+            return None
+
+        return manifest['func_map']
+
+    def store(self, key, ast_path, func_map, directory, dependencies):
+        """
+        Save the AST and the function map lines of a translation unit along
+        with the content hash of its dependencies.
+        Return True if the AST was stored.
+        """
+        dep_hashes = {}
+        for dependency in dependencies:
+            dependency = os.path.normpath(os.path.join(directory, dependency))
+            content_hash = hash_file(dependency)
+            if content_hash is None:
+                return False
+            dep_hashes[dependency] = content_hash
+
+        entry = self.__entry_path(key)
+        try:
+            entry_dir = os.path.dirname(entry)
+            if not os.path.isdir(entry_dir):
+                try:
+                    os.makedirs(entry_dir)
+                except OSError:
+                    # Another worker might have created it.
+                    pass
+
+            # Write the AST first, so a manifest always refers to a complete
+            # AST file.
+            with open(ast_path, 'rb') as ast_file:
+                write_atomically(entry + '.ast',
+                                 lambda out: shutil.copyfileobj(ast_file,
+                                                                out))
+
+            write_atomically(entry + '.json',
+                             lambda out: json.dump({'dependencies':
+                                                    dep_hashes,
+                                                    'func_map': func_map},
+                                                   out))
+        except (IOError, OSError) as ex:
+            LOG.debug_analyzer("Failed to store AST: " + str(ex))
+            return False
+
+        return True
+
+    def evict(self, max_size_mb, max_age_days):
+        """
+        Remove the entries which were not used for max_age_days days, then
+        the least recently used ones until the store is smaller than
+        max_size_mb megabytes.
+        """
+        entries = []
+        for root, _, files in os.walk(self.__store_dir):
+            for manifest in files:
+                if not manifest.endswith('.json'):
+                    continue
+
+                entry = os.path.join(root, manifest[:-len('.json')])
+                try:
+                    last_use = os.path.getmtime(entry + '.json')
+                    size = os.path.getsize(entry + '.json')
+                    if os.path.exists(entry + '.ast'):
+                        size += os.path.getsize(entry + '.ast')
+                except OSError:
+                    continue
+                entries.append((last_use, size, entry))
+
+        # The least recently used entries first.
+        entries.sort()
+
+        total_size = sum(size for _, size, _ in entries)
+        max_size = max_size_mb * 1024 * 1024
+        oldest = time.time() - max_age_days * 24 * 60 * 60
+
+        evicted = 0
+        evicted_size = 0
+        for last_use, size, entry in entries:
+            if last_use >= oldest and total_size <= max_size:
+                break
+
+            try:
+                # Remove the manifest first, so the entry is never used
+                # without its AST.
+                os.remove(entry + '.json')
+                if os.path.exists(entry + '.ast'):
+                    os.remove(entry + '.ast')
+            except OSError as ex:
+                LOG.debug("Failed to evict '" + entry + "': " + str(ex))
+                continue
+
+            evicted += 1
+            evicted_size += size
+            total_size -= size
+
+        if evicted:
+            LOG.info("Evicted %d ASTs (%d MB) from the CTU AST store." %
+                     (evicted, evicted_size / (1024 * 1024)))
@@ -8,6 +8,8 @@ Arranges the 1st phase of 2 phase executions for CTU
 """
 
 import glob
+import heapq
+import itertools
 import multiprocessing
 import os
 import shutil
@@ -19,45 +21,79 @@ import traceback
 from libcodechecker.analyze.analyzers import analyzer_base
 from libcodechecker.analyze.analyzers import analyzer_types
 from libcodechecker.analyze.analyzers import ctu_triple_arch
+from libcodechecker.analyze import analysis_manager
 from libcodechecker.analyze import analyzer_env
 from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('CTU MANAGER')
 
 
-def generate_func_map_lines(fnmap_dir):
-    """ Iterate over all lines of input files in random order. """
+# The maximal number of sorted function map files merged at once. It bounds
+# the number of files open at the same time during the merge.
+MERGE_FAN_IN = 256
+
+
+def generate_func_map_lines(fnmap_files):
+    """ Iterate over all lines of the sorted input files in sorted order. """
+
+    in_files = []
+    try:
+        for filename in fnmap_files:
+            in_files.append(open(filename, 'r'))
+
+        for line in heapq.merge(*in_files):
+            yield line
+    finally:
+        for in_file in in_files:
+            in_file.close()
+
+
+def merge_sorted_func_maps(fnmap_dir, fan_in=MERGE_FAN_IN):
+    """ Merge the sorted function map files of the directory into bigger
+    sorted files until at most fan_in files remain. Returns the list of the
+    remaining files. """
 
     files = glob.glob(os.path.join(fnmap_dir, '*'))
-    for filename in files:
-        with open(filename, 'r') as in_file:
-            for line in in_file:
-                yield line
+    while len(files) > fan_in:
+        merged_files = []
+        for i in range(0, len(files), fan_in):
+            group = files[i:i + fan_in]
+            if len(group) == 1:
+                merged_files.append(group[0])
+                continue
+
+            with tempfile.NamedTemporaryFile(mode='w',
+                                             dir=fnmap_dir,
+                                             delete=False) as out_file:
+                out_file.writelines(generate_func_map_lines(group))
+            merged_files.append(out_file.name)
+
+            for filename in group:
+                os.remove(filename)
+
+        files = merged_files
+
+    return files
 
 
 def create_global_ctu_function_map(func_map_lines):
-    """ Takes iterator of individual function maps and creates a global map
-    keeping only unique names. We leave conflicting names out of CTU.
+    """ Takes a sorted iterator of individual function maps and creates a
+    global map keeping only unique names. We leave conflicting names out of
+    CTU.
     A function map contains the id of a function (mangled name) and the
-    originating source (the corresponding AST file) name."""
+    originating source (the corresponding AST file) name.
 
-    mangled_to_asts = {}
+    Mangled names contain no space, so the lines of the same function are
+    next to each other in the sorted input and only one function has to be
+    kept in memory at a time."""
 
-    for line in func_map_lines:
-        mangled_name, ast_file = line.strip().split(' ', 1)
-        # We collect all occurences of a function name into a list
-        if mangled_name not in mangled_to_asts:
-            mangled_to_asts[mangled_name] = {ast_file}
-        else:
-            mangled_to_asts[mangled_name].add(ast_file)
-
-    mangled_ast_pairs = []
+    def mangled_name(line):
+        return line.split(' ', 1)[0]
 
-    for mangled_name, ast_files in mangled_to_asts.items():
+    for name, lines in itertools.groupby(func_map_lines, mangled_name):
+        ast_files = set(line.strip().split(' ', 1)[1] for line in lines)
         if len(ast_files) == 1:
-            mangled_ast_pairs.append((mangled_name, ast_files.pop()))
-
-    return mangled_ast_pairs
+            yield name, ast_files.pop()
 
 
 def write_global_map(ctu_dir, arch, ctu_func_map_file, mangled_ast_pairs):
@@ -69,7 +105,30 @@ def write_global_map(ctu_dir, arch, ctu_func_map_file, mangled_ast_pairs):
             out_file.write('%s %s\n' % (mangled_name, ast_file))
 
 
-def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder):
+def merge_triple_arch_func_maps(params):
+    """ Merge the function maps of one triple arch into a global one. """
+
+    ctu_dir, triple_arch, ctu_func_map_file, ctu_temp_fnmap_folder = params
+
+    try:
+        fnmap_dir = os.path.join(ctu_dir, triple_arch, ctu_temp_fnmap_folder)
+
+        func_map_lines = generate_func_map_lines(
+            merge_sorted_func_maps(fnmap_dir))
+        mangled_ast_pairs = create_global_ctu_function_map(func_map_lines)
+        write_global_map(ctu_dir, triple_arch, ctu_func_map_file,
+                         mangled_ast_pairs)
+
+        # Remove all temporary files
+        shutil.rmtree(fnmap_dir, ignore_errors=True)
+    except Exception as ex:
+        LOG.debug_analyzer(str(ex))
+        traceback.print_exc(file=sys.stdout)
+        raise
+
+
+def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder,
+                        jobs=1):
     """ Merge individual function maps into a global one.
 
     As the collect phase runs parallel on multiple threads, all compilation
@@ -77,30 +136,46 @@ def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder):
     These function maps contain the mangled names of functions and the source
     (AST generated from the source) which had them.
     These files should be merged at the end into a global map file:
-    ctu_func_map_file."""
+    ctu_func_map_file.
+
+    Every function map file is sorted, so they are merged with a bounded
+    amount of memory. The maps of the triple arches are merged parallel."""
 
-    triple_arches = glob.glob(os.path.join(ctu_dir, '*'))
-    for triple_path in triple_arches:
-        if os.path.isdir(triple_path):
-            triple_arch = os.path.basename(triple_path)
-            fnmap_dir = os.path.join(ctu_dir, triple_arch,
-                                     ctu_temp_fnmap_folder)
+    merge_params = [(ctu_dir, os.path.basename(triple_path),
+                     ctu_func_map_file, ctu_temp_fnmap_folder)
+                    for triple_path in glob.glob(os.path.join(ctu_dir, '*'))
+                    if os.path.isdir(triple_path)]
 
-            func_map_lines = generate_func_map_lines(fnmap_dir)
-            mangled_ast_pairs = create_global_ctu_function_map(func_map_lines)
-            write_global_map(ctu_dir, triple_arch, ctu_func_map_file,
-                             mangled_ast_pairs)
+    if jobs < 2 or len(merge_params) < 2:
+        for params in merge_params:
+            merge_triple_arch_func_maps(params)
+        return
 
-            # Remove all temporary files
-            shutil.rmtree(fnmap_dir, ignore_errors=True)
+    pool = multiprocessing.Pool(min(jobs, len(merge_params)))
+    try:
+        pool.map_async(merge_triple_arch_func_maps,
+                       merge_params).get(float('inf'))
+        pool.close()
+    except Exception:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
 
 
-def generate_ast(triple_arch, action, source, config, env):
-    """ Generates ASTs for the current compilation command. """
+def get_ast_path(triple_arch, source, config):
+    """ Returns the path of the AST dump of the source file. """
 
     ast_joined_path = os.path.join(config.ctu_dir, triple_arch, 'ast',
                                    os.path.realpath(source)[1:] + '.ast')
-    ast_path = os.path.abspath(ast_joined_path)
+    return os.path.abspath(ast_joined_path)
+
+
+def generate_ast(triple_arch, action, source, config, env):
+    """ Generates ASTs for the current compilation command.
+    Returns True if the AST was generated successfully. """
+
+    ast_path = get_ast_path(triple_arch, source, config)
     ast_dir = os.path.dirname(ast_path)
     if not os.path.isdir(ast_dir):
         try:
@@ -119,6 +194,9 @@ def generate_ast(triple_arch, action, source, config, env):
     if ret_code != 0:
         LOG.error("Error generating AST.\n\ncommand:\n\n%s\n\nstderr:\n\n%s",
                   cmdstr, err)
+        return False
+
+    return True
 
 
 def func_map_list_src_to_ast(func_src_list, ctu_in_memory):
@@ -144,7 +222,8 @@ def func_map_list_src_to_ast(func_src_list, ctu_in_memory):
 
 def map_functions(triple_arch, action, source, config, env,
                   func_map_cmd, temp_fnmap_folder):
-    """ Generate function map file for the current source. """
+    """ Generate function map file for the current source.
+    Returns the function map lines, or None if the mapping failed. """
 
     cmd = ctu_triple_arch.get_compile_command(action, config)
     cmd[0] = func_map_cmd
@@ -160,11 +239,20 @@ def map_functions(triple_arch, action, source, config, env,
     if ret_code != 0:
         LOG.error("Error generating function map."
                   "\n\ncommand:\n\n%s\n\nstderr:\n\n%s", cmdstr, err)
-        return
+        return None
 
     func_src_list = stdout.splitlines()
     func_ast_list = func_map_list_src_to_ast(func_src_list,
                                              config.ctu_in_memory)
+    write_func_map(triple_arch, config, temp_fnmap_folder, func_ast_list)
+
+    return func_ast_list
+
+
+def write_func_map(triple_arch, config, temp_fnmap_folder, func_ast_list):
+    """ Write the function map of a source file into the temporary folder
+    of the triple arch. """
+
     extern_fns_map_folder = os.path.join(config.ctu_dir, triple_arch,
                                          temp_fnmap_folder)
     if not os.path.isdir(extern_fns_map_folder):
@@ -174,17 +262,78 @@ def map_functions(triple_arch, action, source, config, env,
             pass
 
     if func_ast_list:
+        # The function maps are merged by merge_ctu_func_maps() which expects
+        # sorted files.
         with tempfile.NamedTemporaryFile(mode='w',
                                          dir=extern_fns_map_folder,
                                          delete=False) as out_file:
-            out_file.write("\n".join(func_ast_list) + "\n")
+            out_file.write("\n".join(sorted(func_ast_list)) + "\n")
+
+
+# The state shared by every collection in a worker process.
+shared_collect_data = None
+check_environment = None
+ast_store = None
+
 
+def init_collect_worker(collect_data, store=None):
+    """ Store the state shared by every build action in the worker. """
 
-def collect_build_action(params):
-    """ Preprocess sources by generating all data needed by CTU analysis. """
+    global shared_collect_data, check_environment, ast_store
+    shared_collect_data = collect_data
+    ast_store = store
 
-    action, context, analyzer_config_map, skip_handler, \
-        ctu_temp_fnmap_folder = params
+    context = collect_data[0]
+    check_environment = analyzer_env.get_check_env(
+        context.path_env_extra,
+        context.ld_lib_path_extra)
+
+
+def collect_from_ast_store(triple_arch, action, source, config, env,
+                           func_map_cmd, temp_fnmap_folder):
+    """ Reuse the AST and the function map of the source from the AST store,
+    or generate them and save them into the store.
+    Returns True if the AST was reused. """
+
+    compile_command = ctu_triple_arch.get_compile_command(action, config,
+                                                          source)
+    key = ast_store.key(compile_command, action.directory, triple_arch)
+    ast_path = get_ast_path(triple_arch, source, config)
+
+    func_ast_list = ast_store.restore(key, ast_path)
+    if func_ast_list is not None:
+        LOG.debug_analyzer("Reusing stored AST of '%s'" % source)
+        write_func_map(triple_arch, config, temp_fnmap_folder,
+                       func_ast_list)
+        return True
+
+    ast_generated = generate_ast(triple_arch, action, source, config, env)
+    func_ast_list = map_functions(triple_arch, action, source, config, env,
+                                  func_map_cmd, temp_fnmap_folder)
+    if ast_generated and func_ast_list is not None:
+        try:
+            dependencies = analysis_manager.create_dependencies(action)
+            ast_store.store(key, ast_path, func_ast_list, action.directory,
+                            dependencies)
+        except Exception as ex:
+            LOG.debug_analyzer("Couldn't store the AST of '" + source +
+                               "': " + str(ex))
+
+    return False
+
+
+def collect_build_action(action):
+    """ Preprocess sources by generating all data needed by CTU analysis.
+    Returns the number of compiler invocations made to probe the triple arch
+    of the action, and the number of ASTs reused from and generated for the
+    AST store. """
+
+    context, analyzer_config_map, skip_handler, \
+        ctu_temp_fnmap_folder = shared_collect_data
+    analyzer_environment = check_environment
+    probes_before = ctu_triple_arch.probe_count
+    reused_asts = 0
+    generated_asts = 0
 
     try:
         for source in action.sources:
@@ -193,12 +342,19 @@ def collect_build_action(params):
             if action.analyzer_type != analyzer_types.CLANG_SA:
                 continue
             config = analyzer_config_map.get(analyzer_types.CLANG_SA)
-            analyzer_environment = analyzer_env.get_check_env(
-                context.path_env_extra,
-                context.ld_lib_path_extra)
             triple_arch = ctu_triple_arch.get_triple_arch(action, source,
                                                           config,
                                                           analyzer_environment)
+            if ast_store and not config.ctu_in_memory:
+                if collect_from_ast_store(triple_arch, action, source, config,
+                                          analyzer_environment,
+                                          context.ctu_func_map_cmd,
+                                          ctu_temp_fnmap_folder):
+                    reused_asts += 1
+                else:
+                    generated_asts += 1
+                continue
+
             if not config.ctu_in_memory:
                 generate_ast(triple_arch, action, source, config,
                              analyzer_environment)
@@ -210,11 +366,17 @@ def collect_build_action(params):
         traceback.print_exc(file=sys.stdout)
         raise
 
+    return ctu_triple_arch.probe_count - probes_before, reused_asts, \
+        generated_asts
+
 
 def do_ctu_collect(actions, context, analyzer_config_map,
-                   jobs, skip_handler, ctu_dir):
+                   jobs, skip_handler, ctu_dir, ast_store_args=None):
     """
     Start the workers for CTU collect phase.
+
+    ast_store_args is a (store, max size in MB, max age in days) tuple if
+    the ASTs are reused from an AST store.
     """
 
     def signal_handler(*arg, **kwarg):
@@ -227,15 +389,17 @@ def do_ctu_collect(actions, context, analyzer_config_map,
     ctu_func_map_file = 'externalFnMap.txt'
 
     signal.signal(signal.SIGINT, signal_handler)
-    pool = multiprocessing.Pool(jobs)
+    pool = multiprocessing.Pool(jobs,
+                                initializer=init_collect_worker,
+                                initargs=((context,
+                                           analyzer_config_map,
+                                           skip_handler,
+                                           ctu_temp_fnmap_folder),
+                                          ast_store_args[0]
+                                          if ast_store_args else None))
     try:
-        collect_actions = [(build_action,
-                            context,
-                            analyzer_config_map,
-                            skip_handler,
-                            ctu_temp_fnmap_folder)
-                           for build_action in actions]
-        pool.map_async(collect_build_action, collect_actions).get(float('inf'))
+        results = pool.map_async(collect_build_action,
+                                 actions).get(float('inf'))
         pool.close()
     except Exception:
         pool.terminate()
@@ -243,6 +407,19 @@ def do_ctu_collect(actions, context, analyzer_config_map,
     finally:
         pool.join()
 
+    probes, reused_asts, generated_asts = \
+        [sum(counts) for counts in zip(*results)] if results else (0, 0, 0)
+
+    LOG.info("Probed the target triple of %d build actions with %d "
+             "compiler invocations." % (len(actions), probes))
+
+    if ast_store_args:
+        store, max_size_mb, max_age_days = ast_store_args
+        LOG.info("Reused %d ASTs from the CTU AST store, generated %d." %
+                 (reused_asts, generated_asts))
+        store.evict(max_size_mb, max_age_days)
+
     merge_ctu_func_maps(ctu_dir,
                         ctu_func_map_file,
-                        ctu_temp_fnmap_folder)
+                        ctu_temp_fnmap_folder,
+                        jobs)
@@ -0,0 +1,470 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Distribute the analysis of the build actions to workers on multiple hosts.
+
+The coordinator ('CodeChecker analyze --coordinator') serves the build
+actions of the analysis. The workers ('CodeChecker analyze-worker') lease the
+build actions one by one, analyze them with the same check() function as a
+local analysis, and send the created files back. The coordinator writes these
+files into the output directory and collects the results.
+
+A worker has to renew its lease regularly while the analysis is running. The
+build actions of the workers which were lost are given to other workers.
+"""
+
+import collections
+import os
+import Queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from multiprocessing import cpu_count
+from multiprocessing import Process
+from multiprocessing import Value
+from multiprocessing.managers import BaseManager
+
+from libcodechecker.analyze import analysis_history
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('DISTRIBUTED ANALYSIS')
+
+# The environment variable holding the shared secret of the coordinator and
+# the workers. The messages are pickled, so the coordinator must not accept
+# connections from anyone else.
+AUTH_KEY_ENV_VAR = 'CC_ANALYZE_AUTH_KEY'
+
+# A lease expires if it was not renewed for this many seconds.
+LEASE_TIMEOUT = 60
+
+# The workers wait this many seconds before asking for a build action again
+# if every remaining build action is leased by another worker.
+POLL_INTERVAL = 2
+
+# The workers try to connect to the coordinator for this many seconds.
+CONNECT_TIMEOUT = 60
+
+# Returned by AnalysisQueue.lease() if there is no build action to give but
+# the analysis is not finished yet.
+WAIT = 'wait'
+
+
+def get_auth_key():
+    """
+    Return the shared secret of the coordinator and the workers, or None if
+    it is not set.
+    """
+    return os.environ.get(AUTH_KEY_ENV_VAR)
+
+
+def parse_address(address):
+    """
+    Split a HOST:PORT address to a (host, port) tuple.
+    """
+    host, _, port = address.rpartition(':')
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError("Invalid address '" + address + "', HOST:PORT is "
+                         "expected.")
+
+
+class AnalysisQueue(object):
+    """
+    The build actions of the analysis served by the coordinator.
+    The methods are called by the workers through the network.
+    """
+
+    def __init__(self, actions, analysis_data, lease_timeout=LEASE_TIMEOUT):
+        self.__lock = threading.Lock()
+        self.__analysis_data = analysis_data
+        self.__action_num = len(actions)
+        self.__lease_timeout = lease_timeout
+
+        # (action index, build action) tuples waiting to be analyzed. The
+        # actions analyzed in the meantime by a lost worker are skipped.
+        self.__pending = collections.deque(enumerate(actions))
+
+        # Lease id -> [action index, build action, expiration time].
+        self.__leases = {}
+        # Lease id -> action index of the leases of the unfinished actions,
+        # including the expired ones.
+        self.__lease_actions = {}
+        # Action index -> lease ids of the unfinished action.
+        self.__action_leases = collections.defaultdict(list)
+        self.__next_lease_id = 0
+
+        self.__done = set()
+        self.__results = Queue.Queue()
+
+    def get_analysis_data(self):
+        """
+        Return the state shared by every analysis, see
+        analysis_manager.init_worker(), and the number of build actions.
+        """
+        return self.__analysis_data, self.__action_num
+
+    def lease(self):
+        """
+        Give a build action to a worker.
+        Return a (lease id, build action) tuple, WAIT if every remaining
+        build action is leased by a worker or None if the analysis is
+        finished.
+        """
+        with self.__lock:
+            self.__requeue_expired()
+
+            while self.__pending:
+                index, action = self.__pending.popleft()
+                if index in self.__done:
+                    continue
+
+                lease_id = self.__next_lease_id
+                self.__next_lease_id += 1
+
+                self.__leases[lease_id] = \
+                    [index, action, time.time() + self.__lease_timeout]
+                self.__lease_actions[lease_id] = index
+                self.__action_leases[index].append(lease_id)
+                return lease_id, action
+
+            return WAIT if self.__leases else None
+
+    def heartbeat(self, lease_id):
+        """
+        Renew the lease of a build action.
+        Return False if the lease expired, so the build action may be
+        analyzed by another worker.
+        """
+        with self.__lock:
+            lease = self.__leases.get(lease_id)
+            if lease is None:
+                return False
+
+            lease[2] = time.time() + self.__lease_timeout
+            return True
+
+    def complete(self, lease_id, result, files):
+        """
+        Receive the result of check() and the files created by the analysis
+        of a leased build action.
+        Return False if the build action was already analyzed by another
+        worker and the result was dropped.
+        """
+        with self.__lock:
+            index = self.__lease_actions.get(lease_id)
+            if index is None:
+                return False
+
+            # The lease might have expired and the build action might have
+            # been given to another worker. The first result is used, the
+            # other leases of the action are dropped.
+            self.__done.add(index)
+            for other_id in self.__action_leases.pop(index):
+                del self.__lease_actions[other_id]
+                self.__leases.pop(other_id, None)
+
+        self.__results.put((result, files))
+        return True
+
+    def requeue_expired(self):
+        with self.__lock:
+            self.__requeue_expired()
+
+    def __requeue_expired(self):
+        now = time.time()
+        for lease_id, lease in self.__leases.items():
+            index, action, expiration = lease
+            if expiration < now:
+                LOG.warning("A worker was lost while analyzing '" +
+                            ', '.join(action.sources) +
+                            "', giving it to another worker.")
+                del self.__leases[lease_id]
+                # Lost actions are started first, they might be long ones.
+                self.__pending.appendleft((index, action))
+
+    def next_result(self, timeout):
+        """
+        Return the next (result, files) tuple sent by the workers.
+        Raise Queue.Empty if there was no result in timeout seconds.
+        """
+        return self.__results.get(True, timeout)
+
+    def finished(self):
+        with self.__lock:
+            return len(self.__done) == self.__action_num
+
+
+class CoordinatorManager(BaseManager):
+    """
+    Serves the analysis queue of the coordinator to the workers.
+    """
+    pass
+
+
+def store_worker_output(output_path, result, files):
+    """
+    Write the files created by a worker into the output directory and
+    return the result of check() as if the analysis was done locally.
+    """
+    return_codes, skipped, _, analyzer_type, result_sources, cache_hit, \
+        durations, resource_usage, failure_archives, report_entries = result
+
+    reanalyzed = False
+    for rel_path, content in files.items():
+        rel_path = os.path.normpath(rel_path)
+        if os.path.isabs(rel_path) or rel_path.startswith(os.pardir):
+            LOG.warning("Ignoring file '" + rel_path + "' outside of the "
+                        "output directory sent by a worker.")
+            continue
+
+        path = os.path.join(output_path, rel_path)
+        if path.endswith('.plist') and os.path.exists(path):
+            reanalyzed = True
+
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        with open(path, 'wb') as out_file:
+            out_file.write(content)
+
+    output_sources = {}
+    for rel_path, source in result_sources.items():
+        result_file = os.path.join(output_path, rel_path)
+        output_sources[result_file] = source
+
+        if source is not None:
+            # Remove the error file of an earlier, failed analysis.
+            err_file = os.path.join(output_path, 'failed',
+                                    os.path.basename(result_file) + '.zip')
+            if os.path.exists(err_file):
+                os.remove(err_file)
+
+    output_usage = dict((os.path.join(output_path, rel_path), usage)
+                        for rel_path, usage in resource_usage.items())
+
+    output_archives = [(os.path.join(output_path, rel_path), action,
+                        mentioned_files)
+                       for rel_path, action, mentioned_files
+                       in failure_archives]
+
+    output_entries = dict((os.path.join(output_path, rel_path), line)
+                          for rel_path, line in report_entries.items())
+
+    return return_codes, skipped, reanalyzed, analyzer_type, \
+        output_sources, cache_hit, durations, output_usage, output_archives, \
+        output_entries
+
+
+def start_coordinator(actions, analyzer_config_map, jobs, output_path,
+                      skip_handler, metadata, quiet_analyze,
+                      capture_analysis_output, result_cache, address,
+                      auth_key, failure_sources_limit=None):
+    """
+    Serve the build actions to the analysis workers and collect the results
+    into the output directory.
+    jobs is the expected number of parallel workers, it is used to predict
+    the length of the analysis.
+    The source files of the failed analyses are collected on this host, into
+    at most failure_sources_limit failure archives if given.
+    """
+    history = analysis_history.load_history(output_path)
+    actions, predicted_makespan = \
+        analysis_history.schedule(actions, history, jobs)
+
+    memory_history = analysis_history.load_history(
+        output_path, analysis_history.MEMORY_HISTORY_FILE)
+    collector = analysis_manager.ResultCollector(metadata, output_path,
+                                                 len(actions), history,
+                                                 predicted_makespan,
+                                                 memory_history)
+    archiver = analysis_manager.FailureArchiver(
+        min(jobs, cpu_count()), failure_sources_limit)
+
+    def add_result(result, files):
+        result = store_worker_output(output_path, result, files)
+        collector.add(result)
+        for failure_archive in result[8]:
+            archiver.add(failure_archive)
+
+    queue = AnalysisQueue(actions, (analyzer_config_map,
+                                    skip_handler,
+                                    quiet_analyze,
+                                    capture_analysis_output,
+                                    result_cache))
+
+    CoordinatorManager.register('get_queue', callable=lambda: queue)
+    manager = CoordinatorManager(address=parse_address(address),
+                                 authkey=auth_key)
+    server = manager.get_server()
+
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+
+    LOG.info("Serving %d build actions to the analysis workers on %s:%d." %
+             (len(actions), server.address[0], server.address[1]))
+
+    try:
+        while not queue.finished():
+            try:
+                result, files = queue.next_result(POLL_INTERVAL)
+            except Queue.Empty:
+                queue.requeue_expired()
+                continue
+
+            add_result(result, files)
+
+        # Results which arrived after the last build action was finished.
+        while True:
+            try:
+                result, files = queue.next_result(0)
+            except Queue.Empty:
+                break
+            add_result(result, files)
+    except KeyboardInterrupt:
+        archiver.terminate()
+        # Keep the results which were finished before the interrupt.
+        collector.checkpoint()
+        raise
+
+    archiver.finish()
+    collector.finish()
+
+
+def collect_worker_output(output_dir, result):
+    """
+    Read and remove the files created by check() in the temporary output
+    directory of the worker. Return the result of check() with paths
+    relative to the output directory and the files.
+    """
+    files = {}
+    for root, _, file_names in os.walk(output_dir):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            with open(path, 'rb') as out_file:
+                files[os.path.relpath(path, output_dir)] = out_file.read()
+            os.remove(path)
+
+    return_codes, skipped, reanalyzed, analyzer_type, result_sources, \
+        cache_hit, durations, resource_usage, failure_archives, \
+        report_entries = result
+    result_sources = dict((os.path.relpath(path, output_dir), source)
+                          for path, source in result_sources.items())
+    resource_usage = dict((os.path.relpath(path, output_dir), usage)
+                          for path, usage in resource_usage.items())
+    failure_archives = [(os.path.relpath(path, output_dir), action,
+                         mentioned_files)
+                        for path, action, mentioned_files in failure_archives]
+    report_entries = dict((os.path.relpath(path, output_dir), line)
+                          for path, line in report_entries.items())
+
+    return (return_codes, skipped, reanalyzed, analyzer_type,
+            result_sources, cache_hit, durations, resource_usage,
+            failure_archives, report_entries), files
+
+
+def connect(address, auth_key):
+    """
+    Connect to the coordinator. Retry until the coordinator is started.
+    """
+    CoordinatorManager.register('get_queue')
+    deadline = time.time() + CONNECT_TIMEOUT
+    while True:
+        manager = CoordinatorManager(address=parse_address(address),
+                                     authkey=auth_key)
+        try:
+            manager.connect()
+            return manager.get_queue()
+        except socket.error:
+            if time.time() > deadline:
+                raise
+            time.sleep(POLL_INTERVAL)
+
+
+def __heartbeat(queue, lease_id, stop_event):
+    """
+    Renew the lease until the analysis of the build action is finished.
+    """
+    try:
+        while not stop_event.wait(LEASE_TIMEOUT / 4.0):
+            queue.heartbeat(lease_id)
+    except (EOFError, IOError, socket.error):
+        pass
+
+
+def worker_loop(address, auth_key, context):
+    """
+    Analyze the build actions leased from the coordinator until every build
+    action is analyzed.
+    """
+    queue = connect(address, auth_key)
+    analysis_data, action_num = queue.get_analysis_data()
+    analyzer_config_map, skip_handler, quiet_analyze, \
+        capture_analysis_output, result_cache = analysis_data
+
+    output_dir = tempfile.mkdtemp(prefix='codechecker-worker-')
+    analysis_manager.init_worker(Value('i', 1),
+                                 Value('i', action_num),
+                                 (context,
+                                  analyzer_config_map,
+                                  output_dir,
+                                  skip_handler,
+                                  quiet_analyze,
+                                  capture_analysis_output,
+                                  result_cache))
+    try:
+        while True:
+            lease = queue.lease()
+            if lease is None:
+                break
+            if lease == WAIT:
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            lease_id, action = lease
+
+            stop_event = threading.Event()
+            heartbeat = threading.Thread(target=__heartbeat,
+                                         args=(queue, lease_id, stop_event))
+            heartbeat.daemon = True
+            heartbeat.start()
+            try:
+                result = analysis_manager.check(action)
+            finally:
+                stop_event.set()
+                heartbeat.join()
+
+            result, files = collect_worker_output(output_dir, result)
+            queue.complete(lease_id, result, files)
+    except (EOFError, IOError, socket.error) as ex:
+        # The coordinator exits when the last result arrives.
+        LOG.debug("Connection to the coordinator closed: " + str(ex))
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def start_workers(address, auth_key, context, jobs):
+    """
+    Start the given number of worker processes analyzing the build actions
+    of the coordinator.
+    """
+    LOG.info("Starting %d analysis workers for the coordinator at %s." %
+             (jobs, address))
+
+    workers = [Process(target=worker_loop,
+                       args=(address, auth_key, context))
+               for _ in range(jobs)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    LOG.info("Analysis workers finished.")
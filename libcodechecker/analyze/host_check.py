@@ -8,6 +8,7 @@ import errno
 import subprocess
 import tempfile
 
+from libcodechecker.analyze import probe_cache
 from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('HOST CHECK')
@@ -17,6 +18,13 @@ def check_clang(compiler_bin, env):
     """
     Simple check if clang is available.
     """
+    # Only the successful checks are cached.
+    return probe_cache.cached_probe(
+        'check_clang', [compiler_bin, '--version'],
+        lambda: __check_clang(compiler_bin, env) or None, env) is not None
+
+
+def __check_clang(compiler_bin, env):
     clang_version_cmd = [compiler_bin, '--version']
     LOG.debug_analyzer(' '.join(clang_version_cmd))
     try:
@@ -38,7 +46,31 @@ def check_clang(compiler_bin, env):
             return False
 
 
+def get_version(analyzer_bin, env=None):
+    """
+    Returns the output of the analyzer's --version switch, or None if the
+    analyzer can not be run.
+    """
+    def probe():
+        cmd = [analyzer_bin, '--version']
+        LOG.debug('run: "' + ' '.join(cmd) + '"')
+        try:
+            return subprocess.check_output(cmd, env=env)
+        except (subprocess.CalledProcessError, OSError) as oerr:
+            LOG.debug(oerr)
+            return None
+
+    return probe_cache.cached_probe('version', [analyzer_bin, '--version'],
+                                    probe, env)
+
+
 def has_analyzer_feature(clang_bin, feature):
+    return probe_cache.cached_probe(
+        'analyzer_feature', [clang_bin, '--analyze', '-Xclang', feature],
+        lambda: __has_analyzer_feature(clang_bin, feature))
+
+
+def __has_analyzer_feature(clang_bin, feature):
     with tempfile.NamedTemporaryFile() as inputFile:
         inputFile.write("void foo(){}")
         inputFile.flush()
@@ -66,6 +98,12 @@ def get_resource_dir(clang_bin):
     Returns the resource_dir of Clang or None if the switch is not supported by
     Clang.
     """
+    return probe_cache.cached_probe(
+        'resource_dir', [clang_bin, "-print-resource-dir"],
+        lambda: __get_resource_dir(clang_bin))
+
+
+def __get_resource_dir(clang_bin):
     cmd = [clang_bin, "-print-resource-dir"]
     LOG.debug('run: "' + ' '.join(cmd) + '"')
     try:
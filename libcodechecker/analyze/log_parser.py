@@ -4,7 +4,11 @@
 #   License. See LICENSE.TXT for details.
 # -------------------------------------------------------------------------
 
+import binascii
+import collections
 import json
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import os
 import re
 import shlex
@@ -12,6 +16,7 @@ import subprocess
 import sys
 import traceback
 
+from libcodechecker.analyze import probe_cache
 # TODO: This is a cross-subpackage import!
 from libcodechecker.log import build_action
 from libcodechecker.log import option_parser
@@ -21,15 +26,23 @@ LOG = LoggerFactory.get_new_logger('LOG PARSER')
 
 
 # If these options are present in the original build command, they must
-# be forwarded to get_compiler_includes and get_compiler_defines so the
-# resulting includes point to the target that was used in the build.
+# be forwarded to the compiler invocation printing the default includes so
+# the resulting includes point to the target that was used in the build.
 COMPILE_OPTS_FWD_TO_DEFAULTS_GETTER = frozenset(
     ['^-m(32|64)',
      '^-std=.*'])
 
+COMPILE_OPTS_FWD_TO_DEFAULTS_GETTER_REGEX = \
+    [re.compile(regex) for regex in COMPILE_OPTS_FWD_TO_DEFAULTS_GETTER]
+
 compiler_includes_dump_file = "compiler_includes.json"
 compiler_target_dump_file = "compiler_target.json"
 
+# Number of characters read from the JSON compilation database at once.
+JSON_READ_SIZE = 1024 * 1024
+
+JSON_WHITESPACE = ' \t\n\r'
+
 
 def get_compiler_err(cmd):
     """
@@ -116,10 +129,11 @@ def load_compiler_info(filename, compiler):
     return value
 
 
-def get_compiler_includes(parseLogOptions, compiler, lang, compile_opts,
-                          extra_opts=None):
+def get_compiler_includes_command(compiler, lang, compile_opts,
+                                  extra_opts=None):
     """
-    Returns a list of default includes of the given compiler.
+    Returns the compiler invocation which prints the default includes of the
+    given compiler.
     """
     if extra_opts is None:
         extra_opts = []
@@ -130,43 +144,165 @@ def get_compiler_includes(parseLogOptions, compiler, lang, compile_opts,
     sysroot = next(
         (item for item in compile_opts if item.startswith("--sysroot=")), "")
 
-    cmd = compiler + " " + ' '.join(extra_opts) + " -E -x " + lang + \
+    return compiler + " " + ' '.join(extra_opts) + " -E -x " + lang + \
         " " + sysroot + " - -v "
 
-    err = ""
-    if parseLogOptions.compiler_includes_file is None:
-        LOG.debug("Retrieving default includes via '" + cmd + "'")
-        err = get_compiler_err(cmd)
-    else:
-        err = load_compiler_info(parseLogOptions.compiler_includes_file,
-                                 compiler)
-
-    if parseLogOptions.output_path is not None:
-        LOG.debug("Dumping default includes " + compiler)
-        dump_compiler_info(parseLogOptions.output_path,
-                           compiler_includes_dump_file,
-                           {compiler: err})
-    return parse_compiler_includes(err)
 
+class CompilerProbe(object):
+    """
+    Built-in information of a compiler, parsed from the output of a compiler
+    invocation which may still be running.
+    """
 
-def get_compiler_target(parseLogOptions, compiler):
+    def __init__(self, compiler, dump_file, parse_func, output=None,
+                 async_result=None, cache_entry=None):
+        """
+        cache_entry is the (key, binary fingerprint) tuple under which the
+        output should be stored in the probe cache.
+        """
+        self.compiler = compiler
+        self.dump_file = dump_file
+        self.cache_entry = cache_entry
+        self.__parse_func = parse_func
+        self.__output = output
+        self.__async_result = async_result
+        self.__value = None
+        self.__parsed = False
+
+    def ready(self):
+        return self.__async_result is None or self.__async_result.ready()
+
+    @property
+    def output(self):
+        if self.__async_result is not None:
+            self.__output = self.__async_result.get()
+            self.__async_result = None
+        return self.__output
+
+    @property
+    def value(self):
+        if not self.__parsed:
+            self.__value = self.__parse_func(self.output)
+            self.__parsed = True
+        return self.__value
+
+
+class CompilerInfoProber(object):
     """
-    Returns the target triple of the given compiler as a string.
+    Retrieve the default include paths and the target of the compilers.
+
+    The distinct compiler invocations run in parallel in a thread pool. Their
+    output is cached on disk, keyed by the compiler and the options which
+    affect the output, and reused until the compiler binary changes.
     """
-    err = ""
-    if parseLogOptions.compiler_target_file is None:
-        cmd = compiler + ' -v'
-        LOG.debug("Retrieving target platform information via '" + cmd + "'")
-        err = get_compiler_err(cmd)
-    else:
-        err = load_compiler_info(parseLogOptions.compiler_target_file,
-                                 compiler)
 
-    if parseLogOptions.output_path is not None:
-        dump_compiler_info(parseLogOptions.output_path,
-                           compiler_target_dump_file,
-                           {compiler: err})
-    return parse_compiler_target(err)
+    def __init__(self, parseLogOptions):
+        self.__options = parseLogOptions
+        cache_dir = getattr(parseLogOptions, 'probe_cache_dir', None)
+        self.__caches = {
+            compiler_includes_dump_file:
+                probe_cache.ProbeCache(cache_dir, 'compiler_includes'),
+            compiler_target_dump_file:
+                probe_cache.ProbeCache(cache_dir, 'compiler_target')}
+        self.__pool = None
+        self.__probes = {}
+        self.__dumped = set()
+
+    def __probe(self, compiler, dump_file, info_file, cmd, key_parts,
+                parse_func):
+        if info_file is not None:
+            # The file given by the user contains one output per compiler.
+            key = (dump_file, compiler)
+            probe = self.__probes.get(key)
+            if probe is None:
+                probe = CompilerProbe(compiler, dump_file, parse_func,
+                                      load_compiler_info(info_file, compiler))
+                self.__probes[key] = probe
+            return probe
+
+        # The output may depend on the name the compiler is invoked by, e.g.
+        # clang and clang++ or the ccache links are symlinks to one binary,
+        # so the binary only invalidates the cached output.
+        fingerprint = probe_cache.binary_fingerprint(compiler)
+        cache_key = json.dumps([compiler] + key_parts)
+        probe = self.__probes.get((dump_file, cache_key))
+        if probe is not None:
+            return probe
+
+        output = self.__caches[dump_file].get(cache_key, fingerprint)
+        if output is not None:
+            LOG.debug("Using the cached output of '" + cmd + "'")
+            probe = CompilerProbe(compiler, dump_file, parse_func, output)
+        else:
+            if self.__pool is None:
+                self.__pool = ThreadPool(multiprocessing.cpu_count())
+
+            LOG.debug("Retrieving compiler information via '" + cmd + "'")
+            probe = CompilerProbe(compiler, dump_file, parse_func,
+                                  async_result=self.__pool.apply_async(
+                                      get_compiler_err, (cmd,)),
+                                  cache_entry=(cache_key, fingerprint))
+
+        self.__probes[(dump_file, cache_key)] = probe
+        return probe
+
+    def includes(self, compiler, lang, compile_opts, extra_opts):
+        """
+        Return the probe of the default includes of the given compiler.
+        """
+        sysroot = next(
+            (item for item in compile_opts if item.startswith("--sysroot=")),
+            "")
+        return self.__probe(compiler, compiler_includes_dump_file,
+                            self.__options.compiler_includes_file,
+                            get_compiler_includes_command(compiler, lang,
+                                                          compile_opts,
+                                                          extra_opts),
+                            [lang, extra_opts, sysroot],
+                            parse_compiler_includes)
+
+    def target(self, compiler):
+        """
+        Return the probe of the target triple of the given compiler.
+        """
+        return self.__probe(compiler, compiler_target_dump_file,
+                            self.__options.compiler_target_file,
+                            compiler + ' -v', [],
+                            parse_compiler_target)
+
+    def dump(self, probe):
+        """
+        Dump the compiler output into the output directory. The first output
+        of every compiler is kept, the dump can be used as
+        --compiler-includes-file and --compiler-target-file.
+        """
+        if self.__options.output_path is None or \
+                (probe.dump_file, probe.compiler) in self.__dumped:
+            return
+
+        self.__dumped.add((probe.dump_file, probe.compiler))
+        LOG.debug("Dumping " + probe.dump_file + " of " + probe.compiler)
+        dump_compiler_info(self.__options.output_path, probe.dump_file,
+                           {probe.compiler: probe.output})
+
+    def close(self):
+        """
+        Store the new outputs in the probe cache and stop the thread pool.
+        """
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+        for probe in self.__probes.values():
+            if probe.cache_entry is not None and probe.ready() and \
+                    probe.output is not None:
+                key, fingerprint = probe.cache_entry
+                self.__caches[probe.dump_file].put(key, fingerprint,
+                                                   probe.output)
+
+        for cache in self.__caches.values():
+            cache.save()
 
 
 def remove_file_if_exists(filename):
@@ -174,11 +310,189 @@ def remove_file_if_exists(filename):
         os.remove(filename)
 
 
-def parse_compile_commands_json(logfile, parseLogOptions):
+def iter_json_array(json_file, read_size=JSON_READ_SIZE):
+    """
+    Generate the elements of the JSON array in the given file one by one,
+    without loading the whole file into the memory.
+    """
+    decoder = json.JSONDecoder()
+
+    buf = ''
+    pos = 0
+    eof = False
+
+    # The next token expected: the opening bracket, the first element or the
+    # closing bracket of an empty array, an element after a comma, or a comma
+    # or the closing bracket after an element.
+    expected = 'begin'
+
+    while True:
+        while pos < len(buf) and buf[pos] in JSON_WHITESPACE:
+            pos += 1
+
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of the JSON array.")
+            buf, pos = json_file.read(read_size), 0
+            eof = not buf
+            continue
+
+        char = buf[pos]
+        if expected == 'begin':
+            if char != '[':
+                raise ValueError("The JSON document is not an array.")
+            pos += 1
+            expected = 'first'
+            continue
+
+        if char == ']' and expected in ('first', 'separator'):
+            return
+
+        if expected == 'separator':
+            if char != ',':
+                raise ValueError("Expected ',' or ']' at character %d of "
+                                 "the JSON array." % pos)
+            pos += 1
+            expected = 'element'
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A number at the end of the buffer may continue in the next
+            # chunk.
+            complete = end < len(buf) or eof
+        except ValueError:
+            if eof:
+                raise
+            complete = False
+
+        if not complete:
+            chunk = json_file.read(read_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        pos = end
+        expected = 'separator'
+        yield value
+
+
+def __build_action(entry, counter, prober):
+    """
+    Return the build action of the compilation database entry and the
+    probes of its compiler's information, or None if the entry does not
+    compile a source file.
+    """
     # The add-compiler-defaults is a deprecated argument
     # and we always perform target and include auto-detection.
     add_compiler_defaults = True
-    LOG.debug('parse_compile_commands_json: ' + str(add_compiler_defaults))
+
+    sourcefile = entry['file']
+
+    if not os.path.isabs(sourcefile):
+        # Newest versions of intercept-build can create the 'file' in the
+        # JSON Compilation Database as a relative path.
+        sourcefile = os.path.join(os.path.abspath(entry['directory']),
+                                  sourcefile)
+
+    lang = option_parser.get_language(sourcefile[sourcefile.rfind('.'):])
+
+    if not lang:
+        return None
+
+    action = build_action.BuildAction(counter)
+    if 'command' in entry:
+        command = entry['command']
+
+        # Old versions of intercept-build (confirmed to those shipping
+        # with upstream clang-5.0) do escapes in another way:
+        # -DVARIABLE="a b" becomes -DVARIABLE=\"a b\" in the output.
+        # This would be messed up later on by options_parser, so need a
+        # fix here. (Should be removed once we are sure noone uses this
+        # intercept-build anymore!)
+        if r'\"' in command:
+            command = command.replace(r'\"', '"')
+    elif 'arguments' in entry:
+        # Newest versions of intercept-build create an argument vector
+        # instead of a command string.
+        command = ' '.join(entry['arguments'])
+    else:
+        raise KeyError("No valid 'command' or 'arguments' entry found!")
+    results = option_parser.parse_options(command)
+
+    action.original_command = command
+    action.analyzer_options = results.compile_opts
+
+    action.lang = results.lang
+    action.target = results.arch
+
+    # Store the compiler built in include paths and defines.
+    probes = None
+    if add_compiler_defaults and results.compiler:
+        # Fetch defaults from the compiler,
+        # make sure we use the correct architecture.
+        extra_opts = []
+        for pattern in COMPILE_OPTS_FWD_TO_DEFAULTS_GETTER_REGEX:
+            for comp_opt in action.analyzer_options:
+                if pattern.match(comp_opt):
+                    extra_opts.append(comp_opt)
+
+        probes = (prober.includes(results.compiler, results.lang,
+                                  results.compile_opts, extra_opts),
+                  prober.target(results.compiler))
+
+    if results.action == option_parser.ActionType.COMPILE or \
+       results.action == option_parser.ActionType.LINK:
+        action.skip = False
+
+    # TODO: Check arch.
+    action.directory = entry['directory']
+    action.sources = sourcefile
+
+    return action, probes
+
+
+def __release_actions(waiting, prober, unique_keys, wait):
+    """
+    Generate the waiting build actions, in their order, whose compiler
+    information is available. If wait is True, wait for the information of
+    every build action.
+
+    A compilation command which was already generated is dropped. The
+    target of the compiler is needed to recognize these.
+    """
+    while waiting:
+        action, probes = waiting[0]
+        if probes is not None:
+            if not wait and not all(probe.ready() for probe in probes):
+                return
+
+            includes, target = probes
+            prober.dump(includes)
+            prober.dump(target)
+            action.compiler_includes = includes.value
+            action.target = target.value
+
+        waiting.popleft()
+
+        # Filter out duplicate compilation commands.
+        unique_key = binascii.unhexlify(action.cmp_key)
+        if unique_key not in unique_keys:
+            unique_keys.add(unique_key)
+            yield action
+
+
+def iter_compile_commands_json(logfile, parseLogOptions):
+    """
+    Generate the build actions of the JSON compilation database while it is
+    being read. A compilation command which is in the database multiple
+    times is generated only once.
+
+    The information of the compilers is retrieved in parallel, the build
+    actions are generated in the order of the database when the information
+    of their compiler is available.
+    """
+    LOG.debug('parse_compile_commands_json')
 
     output_path = parseLogOptions.output_path
     if output_path is not None:
@@ -187,99 +501,39 @@ def parse_compile_commands_json(logfile, parseLogOptions):
         remove_file_if_exists(os.path.join(output_path,
                                            compiler_target_dump_file))
 
-    actions = []
-    filtered_build_actions = {}
-
-    logfile.seek(0)
-    data = json.load(logfile)
-
-    compiler_includes = {}
-    compiler_target = {}
+    # The digests of the build actions generated so far.
+    unique_keys = set()
 
-    counter = 0
-    for entry in data:
-        sourcefile = entry['file']
+    # The build actions waiting for the information of their compiler.
+    waiting = collections.deque()
 
-        if not os.path.isabs(sourcefile):
-            # Newest versions of intercept-build can create the 'file' in the
-            # JSON Compilation Database as a relative path.
-            sourcefile = os.path.join(os.path.abspath(entry['directory']),
-                                      sourcefile)
-
-        lang = option_parser.get_language(sourcefile[sourcefile.rfind('.'):])
+    logfile.seek(0)
 
-        if not lang:
-            continue
+    prober = CompilerInfoProber(parseLogOptions)
+    try:
+        counter = 0
+        for entry in iter_json_array(logfile):
+            built = __build_action(entry, counter, prober)
+            if built is None:
+                continue
 
-        action = build_action.BuildAction(counter)
-        if 'command' in entry:
-            command = entry['command']
-
-            # Old versions of intercept-build (confirmed to those shipping
-            # with upstream clang-5.0) do escapes in another way:
-            # -DVARIABLE="a b" becomes -DVARIABLE=\"a b\" in the output.
-            # This would be messed up later on by options_parser, so need a
-            # fix here. (Should be removed once we are sure noone uses this
-            # intercept-build anymore!)
-            if r'\"' in command:
-                command = command.replace(r'\"', '"')
-        elif 'arguments' in entry:
-            # Newest versions of intercept-build create an argument vector
-            # instead of a command string.
-            command = ' '.join(entry['arguments'])
-        else:
-            raise KeyError("No valid 'command' or 'arguments' entry found!")
-        results = option_parser.parse_options(command)
-
-        action.original_command = command
-        action.analyzer_options = results.compile_opts
-
-        action.lang = results.lang
-        action.target = results.arch
-
-        # Store the compiler built in include paths and defines.
-        if add_compiler_defaults and results.compiler:
-            if not (results.compiler in compiler_includes):
-                # Fetch defaults from the compiler,
-                # make sure we use the correct architecture.
-                extra_opts = []
-                for regex in COMPILE_OPTS_FWD_TO_DEFAULTS_GETTER:
-                    pattern = re.compile(regex)
-                    for comp_opt in action.analyzer_options:
-                        if re.match(pattern, comp_opt):
-                            extra_opts.append(comp_opt)
-
-                compiler_includes[results.compiler] = \
-                    get_compiler_includes(parseLogOptions, results.compiler,
-                                          results.lang, results.compile_opts,
-                                          extra_opts)
-
-            if not (results.compiler in compiler_target):
-                compiler_target[results.compiler] = \
-                    get_compiler_target(parseLogOptions, results.compiler)
-
-            action.compiler_includes = compiler_includes[results.compiler]
-            action.target = compiler_target[results.compiler]
-
-        if results.action == option_parser.ActionType.COMPILE or \
-           results.action == option_parser.ActionType.LINK:
-            action.skip = False
-
-        # TODO: Check arch.
-        action.directory = entry['directory']
-        action.sources = sourcefile
-        # Filter out duplicate compilation commands.
-        unique_key = action.cmp_key
-        if filtered_build_actions.get(unique_key) is None:
-            filtered_build_actions[unique_key] = action
+            counter += 1
+            waiting.append(built)
+            for action in __release_actions(waiting, prober, unique_keys,
+                                            False):
+                yield action
 
-        del action
-        counter += 1
+        for action in __release_actions(waiting, prober, unique_keys, True):
+            yield action
+    finally:
+        prober.close()
 
-    for _, ba in filtered_build_actions.items():
-        actions.append(ba)
 
-    return actions
+def parse_compile_commands_json(logfile, parseLogOptions):
+    """
+    Return the unique build actions of the JSON compilation database.
+    """
+    return list(iter_compile_commands_json(logfile, parseLogOptions))
 
 
 def parse_log(logfilepath, parseLogOptions):
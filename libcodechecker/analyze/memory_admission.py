@@ -0,0 +1,199 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Admit the build actions to the analysis workers only if there is enough
+memory for their analyzer processes.
+
+A free worker alone does not mean that one more analyzer process fits into
+the memory, a few huge translation units analyzed at the same time can push
+the machine into swapping. Every build action reserves its estimated peak
+memory usage from a budget until its analysis is finished, and the build
+actions which do not fit wait for the running ones.
+"""
+
+import collections
+import itertools
+import threading
+import time
+
+import psutil
+
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('MEMORY ADMISSION')
+
+
+def available_memory():
+    """
+    Return the memory available for new processes in kilobytes.
+    """
+    return psutil.virtual_memory().available / 1024
+
+
+class MemoryAdmission(object):
+    """
+    Hand out the build actions to the process pool as long as their
+    estimated memory usage fits into the budget.
+
+    tasks() is consumed by the task handler thread of the pool, release() is
+    called by the thread collecting the results.
+    """
+
+    # Number of seconds between two checks of the available memory while a
+    # build action is waiting.
+    POLL_INTERVAL = 1
+
+    # Number of waiting build actions, in schedule order, which are looked at
+    # for one that fits into the memory. Further ones are never started
+    # before these.
+    LOOKAHEAD = 64
+
+    def __init__(self, actions, estimates, jobs, budget,
+                 available_func=available_memory):
+        """
+        estimates are the peak memory usages of the build actions in
+        kilobytes. budget is the memory the analyzer processes may use
+        together in kilobytes.
+        """
+        self.__pending = collections.deque(
+            zip(range(len(actions)), actions, estimates))
+        self.__jobs = jobs
+        self.__budget = budget
+        self.__available_func = available_func
+
+        self.__condition = threading.Condition()
+        self.__running = {}
+        self.__reserved = 0
+        self.__stopped = False
+
+        self.__delayed = 0
+        self.__max_running = 0
+        self.__start_time = time.time()
+        self.__last_change = self.__start_time
+        self.__running_time = 0.0
+
+    def __fits(self, estimate, available):
+        if not self.__running:
+            # Always analyze something, even if it does not fit alone.
+            return True
+
+        return self.__reserved + estimate <= self.__budget and \
+            estimate <= available
+
+    def __account_running(self):
+        """
+        Add the time elapsed since the last start or finish of an analysis
+        to the running time, before the number of running analyses changes.
+        """
+        now = time.time()
+        self.__running_time += len(self.__running) * (now - self.__last_change)
+        self.__last_change = now
+
+    def __admit(self):
+        """
+        Return the position of the first waiting build action which can be
+        started, or None.
+        """
+        if len(self.__running) >= self.__jobs:
+            return None
+
+        available = self.__available_func() if self.__running else 0
+        for position, (_, _, estimate) in enumerate(
+                itertools.islice(self.__pending, self.LOOKAHEAD)):
+            if self.__fits(estimate, available):
+                return position
+
+        return None
+
+    def tasks(self):
+        """
+        Generate the (index, build action) tuples of the build actions in
+        the order they can be started. Blocks while no build action fits.
+        """
+        while True:
+            with self.__condition:
+                waited_for_memory = False
+                while True:
+                    if self.__stopped or not self.__pending:
+                        return
+
+                    position = self.__admit()
+                    if position is not None:
+                        break
+
+                    if len(self.__running) >= self.__jobs:
+                        # Waiting with a timeout polls in Python 2, which
+                        # delays the start of the next analysis.
+                        self.__condition.wait()
+                        continue
+
+                    if not waited_for_memory:
+                        waited_for_memory = True
+                        self.__delayed += 1
+                        LOG.debug_analyzer("Waiting for memory, %d analyses "
+                                           "are running." %
+                                           len(self.__running))
+                    self.__condition.wait(self.POLL_INTERVAL)
+
+                index, action, estimate = self.__pending[position]
+                del self.__pending[position]
+
+                self.__account_running()
+                self.__running[index] = estimate
+                self.__reserved += estimate
+                self.__max_running = max(self.__max_running,
+                                         len(self.__running))
+
+            yield index, action
+
+    def release(self, index):
+        """
+        Return the memory reserved by a finished build action.
+        """
+        with self.__condition:
+            estimate = self.__running.get(index)
+            if estimate is None:
+                return
+
+            self.__account_running()
+            del self.__running[index]
+            self.__reserved -= estimate
+            self.__condition.notify()
+
+    def stop(self):
+        """
+        Do not start any more build actions.
+        """
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+
+    @property
+    def running(self):
+        return len(self.__running)
+
+    @property
+    def delayed(self):
+        """
+        The number of times a worker was free but no build action fitted
+        into the memory.
+        """
+        return self.__delayed
+
+    @property
+    def max_running(self):
+        return self.__max_running
+
+    def average_running(self):
+        """
+        The average number of build actions analyzed at the same time.
+        """
+        with self.__condition:
+            now = time.time()
+            running_time = self.__running_time + \
+                len(self.__running) * (now - self.__last_change)
+            duration = now - self.__start_time
+            return running_time / duration if duration > 0 else 0.0
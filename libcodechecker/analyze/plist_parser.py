@@ -33,8 +33,14 @@ With the newer clang releases more information is available in the plist files.
 import plistlib
 import sys
 import traceback
+from xml.parsers import expat
 from xml.parsers.expat import ExpatError
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
 from libcodechecker.logger import LoggerFactory
 
 from libcodechecker.report import Report
@@ -42,6 +48,192 @@ from libcodechecker.report import generate_report_hash
 
 LOG = LoggerFactory.get_new_logger('PLIST_PARSER')
 
+# The top level keys of the plist files which are needed for the reports.
+REPORT_KEYS = frozenset(['files', 'diagnostics'])
+
+# Errors of the plist readers if the file is not a well-formed XML.
+PLIST_FORMAT_ERRORS = (ExpatError,) if lxml_etree is None \
+    else (ExpatError, lxml_etree.XMLSyntaxError)
+
+
+def _plist_string(data):
+    """
+    Strings are returned as byte strings if they are ASCII like plistlib
+    does.
+    """
+    try:
+        return data.encode('ascii')
+    except UnicodeError:
+        return data
+
+
+_PLIST_VALUES = {
+    'string': _plist_string,
+    'integer': int,
+    'real': float,
+    'true': lambda _: True,
+    'false': lambda _: False,
+    # Not generated by the analyzers, converted the same way as plistlib.
+    'date': lambda data: plistlib._dateFromString(_plist_string(data)),
+    'data': lambda data: plistlib.Data.fromBase64(_plist_string(data))}
+
+
+class _ExpatPlistHandler(object):
+    """
+    Build the values of a plist file from the events of an expat parser.
+    The values of the top level dictionary which are not in the given keys
+    are skipped without building them.
+    """
+
+    def __init__(self, keys):
+        self.root = None
+        # The character data of the current element, expat appends to it.
+        self.data = []
+        self.__keys = keys
+        self.__stack = []
+        # The innermost dictionary or array and the key of the next value
+        # in it if it is a dictionary.
+        self.__container = None
+        self.__key = None
+        # The depth of the current element in a skipped value, -1 before a
+        # skipped value.
+        self.__skipped = 0
+
+    def __add(self, value):
+        if self.__key is not None:
+            self.__container[self.__key] = value
+            self.__key = None
+        elif self.__container is not None:
+            self.__container.append(value)
+        else:
+            self.root = value
+
+    def start(self, tag, _):
+        if self.__skipped:
+            # Negative if the next value is skipped.
+            self.__skipped = max(self.__skipped + 1, 1)
+            return
+
+        if tag == 'dict' or tag == 'array':
+            value = {} if tag == 'dict' else []
+            self.__add(value)
+            self.__stack.append(value)
+            self.__container = value
+        else:
+            del self.data[:]
+
+    def end(self, tag):
+        if self.__skipped:
+            self.__skipped -= 1
+        elif tag == 'key':
+            key = ''.join(self.data)
+            try:
+                key = key.encode('ascii')
+            except UnicodeError:
+                pass
+            if self.__keys is not None and len(self.__stack) == 1 and \
+                    key not in self.__keys:
+                self.__skipped = -1
+            else:
+                self.__key = key
+        elif tag == 'dict' or tag == 'array':
+            stack = self.__stack
+            stack.pop()
+            self.__container = stack[-1] if stack else None
+        else:
+            convert = _PLIST_VALUES.get(tag)
+            if convert:
+                self.__add(convert(''.join(self.data)))
+
+
+def read_plist_expat(path, keys=None):
+    """
+    Read the content of a plist file with a streaming expat parser.
+    The values are the same as the ones read by plistlib.readPlist().
+    If keys is given only these values of the top level dictionary are read.
+    """
+    handler = _ExpatPlistHandler(keys)
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.data.append
+
+    with open(path, 'rb') as plist_file:
+        parser.ParseFile(plist_file)
+
+    return handler.root
+
+
+def _lxml_value(element):
+    """
+    Convert the element of a plist parsed by lxml to the same value as
+    plistlib.
+    """
+    tag = element.tag
+    if tag == 'dict':
+        value = {}
+        key = None
+        for child in element:
+            if child.tag == 'key':
+                key = _plist_string(child.text or '')
+            else:
+                value[key] = _lxml_value(child)
+        return value
+    elif tag == 'array':
+        return [_lxml_value(child) for child in element]
+
+    return _PLIST_VALUES[tag](element.text or '')
+
+
+def read_plist_lxml(path, keys=None):
+    """
+    Read the content of a plist file with lxml. The values are the same as
+    the ones read by plistlib.readPlist().
+    If keys is given only these values of the top level dictionary are
+    converted.
+    """
+    parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True,
+                                  remove_comments=True, remove_pis=True)
+    root = lxml_etree.parse(path, parser).getroot()
+
+    elements = list(root)
+    if not elements:
+        raise ExpatError("no element found in the plist: " + path)
+    top = elements[0]
+
+    if keys is None or top.tag != 'dict':
+        return _lxml_value(top)
+
+    value = {}
+    children = iter(top)
+    for child in children:
+        if child.tag != 'key':
+            continue
+        key = _plist_string(child.text or '')
+        element = next(children, None)
+        if element is not None and key in keys:
+            value[key] = _lxml_value(element)
+    return value
+
+
+def read_plist_plistlib(path, keys=None):
+    """
+    Read the content of a plist file with plistlib. All of the values are
+    read, the keys are ignored.
+    """
+    return plistlib.readPlist(path)
+
+
+# The available plist readers by name, the fastest one is used by
+# parse_plist().
+PLIST_READERS = {'plistlib': read_plist_plistlib,
+                 'expat': read_plist_expat}
+if lxml_etree is not None:
+    PLIST_READERS['lxml'] = read_plist_lxml
+
+read_plist = read_plist_lxml if lxml_etree is not None else read_plist_expat
+
 
 def get_checker_name(diagnostic, path=""):
     """
@@ -72,45 +264,65 @@ def get_report_hash(diagnostic, source_file):
     return report_hash
 
 
-def parse_plist(path):
+def _read_reports(path, plist_reader, files, reports):
     """
-    Parse the reports from a plist file.
-    One plist file can contain multiple reports.
+    Read the source files and the reports of a plist file into the given
+    lists.
     """
-    LOG.debug("Parsing plist: " + path)
+    plist = (plist_reader or read_plist)(path, REPORT_KEYS)
 
-    reports = []
-    files = []
-    try:
-        plist = plistlib.readPlist(path)
+    files.extend(plist['files'])
+
+    for diag in plist['diagnostics']:
+
+        available_keys = diag.keys()
+
+        main_section = {}
+        for key in available_keys:
+            # Skip path it is handled separately.
+            if key != 'path':
+                main_section.update({key: diag[key]})
 
-        files = plist['files']
+        # We need to extend information for plist files generated
+        # by older clang version (before 3.7).
+        main_section['check_name'] = get_checker_name(diag, path)
 
-        for diag in plist['diagnostics']:
+        # We need to extend information for plist files generated
+        # by older clang version (before 3.8).
+        main_section['issue_hash_content_of_line_in_context'] = \
+            get_report_hash(diag, files[diag['location']['file']])
 
-            available_keys = diag.keys()
+        bug_path_items = [item for item in diag['path']]
 
-            main_section = {}
-            for key in available_keys:
-                # Skip path it is handled separately.
-                if key != 'path':
-                    main_section.update({key: diag[key]})
+        report = Report(main_section, bug_path_items)
+        reports.append(report)
 
-            # We need to extend information for plist files generated
-            # by older clang version (before 3.7).
-            main_section['check_name'] = get_checker_name(diag, path)
 
-            # We need to extend information for plist files generated
-            # by older clang version (before 3.8).
-            main_section['issue_hash_content_of_line_in_context'] = \
-                get_report_hash(diag, files[diag['location']['file']])
+def read_reports(path, plist_reader=None):
+    """
+    Read the source files and the reports of a plist file like
+    parse_plist(), but raise the errors of processing the file.
+    """
+    files = []
+    reports = []
+    _read_reports(path, plist_reader, files, reports)
+    return files, reports
 
-            bug_path_items = [item for item in diag['path']]
 
-            report = Report(main_section, bug_path_items)
-            reports.append(report)
+def parse_plist(path, plist_reader=None):
+    """
+    Parse the reports from a plist file.
+    One plist file can contain multiple reports.
+    The file is read by the given reader of PLIST_READERS, by default with
+    the fastest one available.
+    """
+    LOG.debug("Parsing plist: " + path)
 
-    except ExpatError as err:
+    reports = []
+    files = []
+    try:
+        _read_reports(path, plist_reader, files, reports)
+    except PLIST_FORMAT_ERRORS as err:
         LOG.error('Failed to process plist file: ' + path +
                   ' wrong file format?')
         LOG.error(err)
@@ -134,128 +346,46 @@ def parse_plist(path):
         return files, reports
 
 
-def fids_in_range(rng):
-    """
-    Get the file ids from a range.
+def skip_reports(plist, skip_handler):
     """
-    fids = []
-    for r in rng:
-        for l in r:
-            fids.append(l['file'])
-    return fids
-
+    Remove the diagnostics from the plist content (as read by read_plist())
+    whose main location is in a file which should be skipped.
+    Return the number of the removed diagnostics.
 
-def fids_in_edge(edges):
-    """
-    Get the file ids from an edge.
-    """
-    fids = []
-    for e in edges:
-        start = e['start']
-        end = e['end']
-        for l in start:
-            fids.append(l['file'])
-        for l in end:
-            fids.append(l['file'])
-    return fids
-
-
-def fids_in_path(report_data, file_ids_to_remove):
-    """
-    Skip diagnostic sections and collect file ids in
-    report paths for the remaining diagnostic sections.
+    The 'files' array is kept as it is, so the file indexes in the remaining
+    diagnostic sections (control, event ...) stay valid.
     """
-    all_fids = []
-
-    kept_diagnostics = []
-
-    for diag in report_data['diagnostics']:
-
-        if diag['location']['file'] in file_ids_to_remove:
-            continue
-
-        kept_diagnostics.append(diag)
+    files = plist.get('files', [])
+    diagnostics = plist.get('diagnostics', [])
 
-        for pe in diag['path']:
-            path_fids = []
-            try:
-                fids = fids_in_range(pe['ranges'])
-                path_fids.extend(fids)
-            except KeyError:
-                pass
+    skipped_files = set(index for index, path in enumerate(files)
+                        if skip_handler.should_skip(path))
+    if not skipped_files:
+        return 0
 
-            try:
-                fid = pe['location']['file']
-                path_fids.append(fid)
-            except KeyError:
-                pass
+    kept = [diag for diag in diagnostics
+            if diag['location']['file'] not in skipped_files]
+    plist['diagnostics'] = kept
 
-            try:
-                fids = fids_in_edge(pe['edges'])
-                path_fids.extend(fids)
-            except KeyError:
-                pass
+    return len(diagnostics) - len(kept)
 
-            all_fids.extend(path_fids)
 
-    return all_fids, kept_diagnostics
-
-
-def remove_report_from_plist(plist_content, skip_handler):
+def skip_report_from_plist(plist_file, skip_handler):
     """
-    Parse the original plist content provided by the analyzer
-    and return a new plist content where reports were removed
-    if they should be skipped.
-
-    WARN !!!!
-    If the 'files' array in the plist is modified all of the
-    diagnostic section (control, event ...) nodes should be
-    re indexed to use the proper file array indexes!!!
+    Remove the reports which should be skipped from the provided plist
+    file. The file is only rewritten if a report was removed.
+    Return the content of the plist file, or None if it can not be modified.
     """
-    new_data = {}
     try:
-        report_data = plistlib.readPlistFromString(plist_content)
-    except ExpatError as ex:
-        LOG.error("Failed to parse plist content, "
+        plist = read_plist(plist_file)
+        if skip_reports(plist, skip_handler):
+            plistlib.writePlist(plist, plist_file)
+        return plist
+    except PLIST_FORMAT_ERRORS as ex:
+        LOG.error("Failed to parse plist file '" + plist_file + "', "
                   "keeping the original version")
-        LOG.error(plist_content)
         LOG.error(ex)
-        return plist_content
-
-    file_ids_to_remove = []
-
-    try:
-        for i, f in enumerate(report_data['files']):
-            if skip_handler.should_skip(f):
-                file_ids_to_remove.append(i)
-
-        fids, kept_diagnostics = fids_in_path(report_data, file_ids_to_remove)
-        report_data['diagnostics'] = kept_diagnostics
-
-        remove_file = True
-        for f in file_ids_to_remove:
-            if f in fids:
-                remove_file = False
-                break
-
-        new_data = report_data
-        res = plistlib.writePlistToString(new_data)
-        return res
-
-    except KeyError:
-        LOG.error("Failed to modify plist content, "
+    except (KeyError, TypeError) as ex:
+        LOG.error("Failed to modify plist file '" + plist_file + "', "
                   "keeping the original version")
-        return plist_content
-
-
-def skip_report_from_plist(plist_file, skip_handler):
-    """
-    Rewrites the provided plist file where reports
-    were removed if they should be skipped.
-    """
-    with open(plist_file, 'r+') as plist:
-        new_plist_content = remove_report_from_plist(plist.read(),
-                                                     skip_handler)
-        plist.seek(0)
-        plist.write(new_plist_content)
-        plist.truncate()
+        LOG.error(ex)
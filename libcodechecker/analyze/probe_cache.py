@@ -0,0 +1,165 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Persistent cache of the information gathered by running the compilers and
+the analyzers, e.g. the built-in include paths of a compiler or the checker
+list of an analyzer.
+
+The output of such a probe only changes if the binary is replaced, so every
+entry records the real path, the size and the modification time of the
+probed binary. An entry is only used if the binary is unchanged.
+"""
+
+from distutils.spawn import find_executable
+import json
+import os
+
+from libcodechecker import util
+from libcodechecker.analyze.result_cache import write_atomically
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('PROBE CACHE')
+
+DEFAULT_CACHE_DIR = os.path.join(util.get_default_workspace(), 'probe_cache')
+
+
+def binary_fingerprint(binary, env=None):
+    """
+    Return the [real path, size, modification time] list of the binary,
+    which is searched in the PATH of the environment (by default of this
+    process) if it is given without a directory.
+    Return None if the binary is not found.
+    """
+    if os.path.dirname(binary):
+        path = binary
+    else:
+        path = find_executable(binary,
+                               env.get('PATH') if env is not None else None)
+    if not path:
+        return None
+
+    try:
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return [path, stat.st_size, stat.st_mtime]
+
+
+class ProbeCache(object):
+    """
+    The probe results of one kind stored in a JSON file of the cache
+    directory. The keys are strings, the values have to be serializable to
+    JSON.
+    """
+
+    def __init__(self, cache_dir, name):
+        """
+        If cache_dir is None the results are not stored.
+        """
+        self.__path = os.path.join(cache_dir, name + '.json') \
+            if cache_dir else None
+        self.__entries = self.__load()
+        self.__added = {}
+
+    def __load(self):
+        if not self.__path or not os.path.isfile(self.__path):
+            return {}
+
+        try:
+            with open(self.__path, 'r') as cache_file:
+                entries = json.load(cache_file)
+            return entries if isinstance(entries, dict) else {}
+        except (IOError, ValueError) as ex:
+            LOG.debug("Failed to load the probe cache '" + self.__path +
+                      "': " + str(ex))
+            return {}
+
+    def get(self, key, fingerprint):
+        """
+        Return the value stored for the key if it was probed from the binary
+        with the given fingerprint, otherwise None.
+        """
+        if fingerprint is None:
+            return None
+
+        entry = self.__entries.get(key)
+        if entry is None or entry.get('binary') != fingerprint:
+            return None
+
+        return entry.get('value')
+
+    def put(self, key, fingerprint, value):
+        if fingerprint is None:
+            return
+
+        entry = {'binary': fingerprint, 'value': value}
+        self.__entries[key] = entry
+        self.__added[key] = entry
+
+    def save(self):
+        """
+        Write the new entries into the cache file. The entries stored by
+        other analyses in the meantime are kept.
+        """
+        if not self.__path or not self.__added:
+            return
+
+        try:
+            if not os.path.isdir(os.path.dirname(self.__path)):
+                os.makedirs(os.path.dirname(self.__path))
+
+            entries = self.__load()
+            entries.update(self.__added)
+            write_atomically(self.__path,
+                             lambda cache_file: json.dump(entries,
+                                                          cache_file))
+            self.__added = {}
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to save the probe cache '" + self.__path +
+                      "': " + str(ex))
+
+
+# The directory of the analyzer probe cache. None disables the cache.
+analyzer_cache_dir = DEFAULT_CACHE_DIR
+
+# The analyzer probe caches loaded by this process, by name.
+analyzer_caches = {}
+
+
+def cached_probe(name, command, probe_func, env=None, files=None):
+    """
+    Return the result of probe_func(), which runs the given command, from
+    the cache if the binary of the command and the given files (e.g. the
+    plugins loaded by the binary) did not change since it was stored.
+
+    Results of failed probes, i.e. if probe_func() returns None or raises
+    an exception, are not cached.
+    """
+    fingerprint = binary_fingerprint(command[0], env)
+    key = json.dumps([command] + [binary_fingerprint(path)
+                                  for path in files or []])
+
+    cache = analyzer_caches.get(name)
+    if cache is None:
+        cache = ProbeCache(analyzer_cache_dir, name)
+        analyzer_caches[name] = cache
+
+    result = cache.get(key, fingerprint)
+    if result is not None:
+        LOG.debug("Using the cached result of '" + ' '.join(command) + "'")
+        # The probes return byte strings, JSON gives back unicode.
+        if isinstance(result, unicode):
+            result = result.encode('utf-8')
+        return result
+
+    result = probe_func()
+    if result is not None:
+        cache.put(key, fingerprint, result)
+        cache.save()
+
+    return result
@@ -0,0 +1,324 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Index of the parsed reports of an analysis output directory.
+
+The analysis writes the source files and the reports of every result plist
+into a JSON lines file next to the plists as soon as the result is
+finished, so the commands processing the results (parse, store, cmd diff)
+do not have to parse the XML of the plists again. The entries are made by
+the analysis workers, the process collecting the results only appends them.
+
+Every line of the index describes one plist. The line starts with a small
+JSON header: the name, size, modification time and content hash of the
+plist. The header is followed by a tab and the file table and the reports
+with their main section (checker name, report hash, location ...) and bug
+path. An entry is only used if the plist is unchanged, otherwise the plist
+itself is parsed.
+
+The index is never read at once: the readers look up the offset of the
+line of a plist and decode only that line. The offsets are saved next to
+the index when it is compacted at the end of the analysis. If the offsets
+are missing or out of date the headers of the lines are scanned.
+"""
+
+import json
+import os
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze.result_cache import hash_file
+from libcodechecker.analyze.result_cache import write_atomically
+from libcodechecker.logger import LoggerFactory
+from libcodechecker.report import Report
+
+LOG = LoggerFactory.get_new_logger('REPORT INDEX')
+
+INDEX_FILE = 'report_index.jsonl'
+OFFSETS_FILE = 'report_index.offsets.json'
+
+
+def _plist_stat(plist_file):
+    """
+    Return the size and the modification time of the plist file or None if
+    it does not exist.
+    """
+    try:
+        stat = os.stat(plist_file)
+        return stat.st_size, stat.st_mtime
+    except OSError:
+        return None
+
+
+def _header(line):
+    """
+    Return the header of an index line as a (plist name, size, mtime, hash)
+    tuple or None if the line is not a complete entry.
+    """
+    if not line.endswith('\n'):
+        # Truncated line of an interrupted analysis.
+        return None
+
+    try:
+        name, size, mtime, content_hash = \
+            json.loads(line.split('\t', 1)[0])
+        return _byte_string(name), size, mtime, content_hash
+    except (ValueError, TypeError):
+        return None
+
+
+def _scan(index_file):
+    """
+    Return the offset, the length and the header of the lines of the index
+    file by plist name. Later lines of a plist replace the earlier ones.
+    Only the headers of the lines are decoded.
+    """
+    lines = {}
+    try:
+        with open(index_file, 'rb') as index:
+            offset = 0
+            for line in index:
+                header = _header(line)
+                if header is not None:
+                    lines[header[0]] = (offset, len(line), header)
+                offset += len(line)
+    except IOError as ex:
+        LOG.debug("Failed to read the report index '" + index_file +
+                  "': " + str(ex))
+
+    return lines
+
+
+def _load_offsets(index_file):
+    """
+    Return the offset and the length of the line of every plist in the
+    index file by plist name.
+    """
+    try:
+        stat = os.stat(index_file)
+    except OSError:
+        return {}
+
+    offsets_file = os.path.join(os.path.dirname(index_file), OFFSETS_FILE)
+    try:
+        with open(offsets_file, 'r') as offsets:
+            table = json.load(offsets)
+        if table['size'] == stat.st_size and table['mtime'] == stat.st_mtime:
+            return dict((_byte_string(name), tuple(location))
+                        for name, location in table['lines'].items())
+    except (IOError, ValueError, KeyError, TypeError):
+        pass
+
+    return dict((name, line[:2])
+                for name, line in _scan(index_file).items())
+
+
+def _byte_string(value):
+    try:
+        return value.encode('ascii')
+    except UnicodeError:
+        return value
+
+
+def _byte_string_pairs(pairs):
+    """
+    Build a dictionary read from the index with byte strings for the ASCII
+    strings, like the plist parser returns them. It is called for the inner
+    dictionaries first, so only the strings and the lists of strings have to
+    be converted.
+    """
+    result = {}
+    for key, value in pairs:
+        value_type = type(value)
+        if value_type is unicode:
+            value = _byte_string(value)
+        elif value_type is list:
+            value = [_byte_string(item) if type(item) is unicode else item
+                     for item in value]
+        result[_byte_string(key)] = value
+    return result
+
+
+def is_fresh(entry, plist_file):
+    """
+    Return True if the index entry describes the current content of the
+    plist file. The content hash is only calculated if the modification
+    time changed, e.g. the result directory was copied.
+    """
+    stat = _plist_stat(plist_file)
+    if stat is None or stat[0] != entry.get('size'):
+        return False
+
+    return stat[1] == entry.get('mtime') or \
+        hash_file(plist_file) == entry.get('hash')
+
+
+def index_entry(plist_file, plist=None):
+    """
+    Return the index line of the plist file or None if it can not be parsed.
+    Plists which can not be parsed are not indexed, they are processed (and
+    the errors are reported) by the commands reading the results.
+
+    It is called by the analysis worker which made the plist. If the content
+    of the plist was already read (as by read_plist()), it is not read again.
+    """
+    stat = _plist_stat(plist_file)
+    if stat is None:
+        return None
+
+    def read_plist(path, keys=None):
+        return plist if plist is not None else \
+            plist_parser.read_plist(path, keys)
+
+    try:
+        files, reports = plist_parser.read_reports(plist_file, read_plist)
+        header = [os.path.basename(plist_file), stat[0], stat[1],
+                  hash_file(plist_file)]
+        body = {'files': files,
+                'reports': [[report.main, report.bug_path]
+                            for report in reports]}
+        return json.dumps(header) + '\t' + json.dumps(body) + '\n'
+    except Exception as ex:
+        LOG.debug("Not indexing '" + plist_file + "': " + str(ex))
+        return None
+
+
+class ReportIndexWriter(object):
+    """
+    Append the index lines of the finished result plists to the index of an
+    output directory. The lines are written by one process, the one
+    collecting the results of the analysis.
+    """
+
+    def __init__(self, output_dir):
+        self.__index_file = os.path.join(output_dir, INDEX_FILE)
+        self.__index = None
+
+    def add(self, line):
+        """
+        Append an index line made by index_entry().
+        """
+        try:
+            if self.__index is None:
+                self.__index = open(self.__index_file, 'ab')
+            self.__index.write(line)
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to write the report index '" +
+                      self.__index_file + "': " + str(ex))
+
+    def flush(self):
+        if self.__index is not None:
+            self.__index.flush()
+
+    def close(self):
+        """
+        Close the index, drop the entries of the earlier analyses which do
+        not describe the current plists any more and save the offsets of the
+        remaining lines.
+        """
+        if self.__index is not None:
+            self.__index.close()
+            self.__index = None
+
+        if not os.path.isfile(self.__index_file):
+            return
+
+        output_dir = os.path.dirname(self.__index_file)
+        fresh = []
+        for name, (offset, length, header) in \
+                sorted(_scan(self.__index_file).items()):
+            entry = {'size': header[1], 'mtime': header[2],
+                     'hash': header[3]}
+            if is_fresh(entry, os.path.join(output_dir, name)):
+                fresh.append((name, offset, length))
+
+        offsets = {}
+
+        def write(index):
+            with open(self.__index_file, 'rb') as old_index:
+                for name, offset, length in fresh:
+                    old_index.seek(offset)
+                    offsets[name] = (index.tell(), length)
+                    index.write(old_index.read(length))
+
+        try:
+            write_atomically(self.__index_file, write)
+            stat = os.stat(self.__index_file)
+            write_atomically(
+                os.path.join(output_dir, OFFSETS_FILE),
+                lambda out: json.dump({'size': stat.st_size,
+                                       'mtime': stat.st_mtime,
+                                       'lines': offsets}, out))
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to compact the report index '" +
+                      self.__index_file + "': " + str(ex))
+
+
+class IndexReader(object):
+    """
+    Read the entries of the plists from the index of an output directory
+    one by one.
+    """
+
+    def __init__(self, output_dir):
+        self.__index_file = os.path.join(output_dir, INDEX_FILE)
+        self.__offsets = _load_offsets(self.__index_file)
+
+    def pop(self, plist_name):
+        """
+        Return the entry of the plist as a dictionary or None if it is not
+        in the index. Every plist is processed once, the entry can not be
+        read again.
+        """
+        location = self.__offsets.pop(plist_name, None)
+        if location is None:
+            return None
+
+        try:
+            with open(self.__index_file, 'rb') as index:
+                index.seek(location[0])
+                line = index.read(location[1])
+
+            header = _header(line)
+            if header is None or header[0] != plist_name:
+                return None
+
+            body = json.loads(line.split('\t', 1)[1],
+                              object_pairs_hook=_byte_string_pairs)
+            return {'size': header[1],
+                    'mtime': header[2],
+                    'hash': header[3],
+                    'files': body['files'],
+                    'reports': body['reports']}
+        except (IOError, ValueError, KeyError, TypeError) as ex:
+            LOG.debug("Failed to read the report index '" +
+                      self.__index_file + "': " + str(ex))
+            return None
+
+
+# The readers of the report directories used by this process, by directory.
+loaded_indexes = {}
+
+
+def parse_plist(plist_file, plist_reader=None):
+    """
+    Return the source files and the reports of a plist file like
+    plist_parser.parse_plist(), from the report index of its directory if
+    the index describes the current content of the plist. Otherwise the plist
+    is read by the given reader.
+    """
+    plist_dir = os.path.dirname(os.path.abspath(plist_file))
+    reader = loaded_indexes.get(plist_dir)
+    if reader is None:
+        reader = IndexReader(plist_dir)
+        loaded_indexes[plist_dir] = reader
+
+    entry = reader.pop(os.path.basename(plist_file))
+    if entry is None or not is_fresh(entry, plist_file):
+        return plist_parser.parse_plist(plist_file, plist_reader)
+
+    LOG.debug("Using the report index for plist: " + plist_file)
+    return entry['files'], [Report(main, bug_path)
+                            for main, bug_path in entry['reports']]
@@ -0,0 +1,208 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Persistent, content-addressed cache of analysis results.
+
+Every cached result is stored under a key which is calculated from the
+analyzer type, the build action and the analyzer configuration. Next to the
+result plist a manifest is written which contains the content hash of every
+file the translation unit depends on. A cached result is only reused if all
+of these files are unchanged, so the dependency list has to be generated only
+when a result is stored, not when it is looked up.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('RESULT CACHE')
+
+
+def hash_file(path):
+    """
+    Return the SHA-1 hash of the given file's content or None if the file
+    can not be read.
+    """
+    hasher = hashlib.sha1()
+    try:
+        with open(path, 'rb') as content:
+            for chunk in iter(lambda: content.read(1 << 16), b''):
+                hasher.update(chunk)
+    except (IOError, OSError):
+        return None
+
+    return hasher.hexdigest()
+
+
+def config_digest(config_handler, analyzer_version, skip_file_hash=None):
+    """
+    Calculate a digest from every part of the analyzer configuration which
+    can influence the analysis results. The reports in the skipped files are
+    removed from the results, so the content hash of the skip file is part
+    of the digest if a skip file is used.
+    """
+    enabled_checkers = [name for name, (enabled, _)
+                        in config_handler.checks().items() if enabled]
+
+    try:
+        plugins = sorted(config_handler.analyzer_plugins)
+    except (OSError, TypeError):
+        # The plugin directory is not set or does not exist.
+        plugins = []
+
+    digest_content = [str(config_handler.analyzer_binary),
+                      str(analyzer_version),
+                      config_handler.analyzer_extra_arguments,
+                      config_handler.compiler_resource_dir,
+                      ','.join(plugins),
+                      ','.join(enabled_checkers)]
+    if skip_file_hash:
+        digest_content.append(skip_file_hash)
+
+    return hashlib.sha1('|'.join(digest_content)).hexdigest()
+
+
+def write_atomically(path, write_func):
+    """
+    Write a file through a temporary file in the same directory, so parallel
+    readers never see a partially written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            write_func(tmp_file)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ResultCache(object):
+    """
+    Store and restore analyzer result files in a cache directory shared
+    between analysis runs.
+
+    The object is passed to the analysis workers so it should stay
+    picklable.
+    """
+
+    def __init__(self, cache_dir, config_digests):
+        """
+        config_digests maps the analyzer types to the digest of their
+        configuration (see config_digest()).
+        """
+        self.__cache_dir = os.path.abspath(cache_dir)
+        self.__config_digests = config_digests
+
+    @property
+    def cache_dir(self):
+        return self.__cache_dir
+
+    def __key(self, action, source):
+        """
+        Cache key of the given source in the build action.
+        """
+        key_content = [str(action.analyzer_type),
+                       action.cmp_key,
+                       str(action.lang),
+                       ' '.join(action.compiler_includes),
+                       source,
+                       self.__config_digests.get(action.analyzer_type, '')]
+
+        return hashlib.sha1('|'.join(key_content)).hexdigest()
+
+    def __entry_path(self, key):
+        """
+        Return the path of the cache entry without extension. Entries are
+        spread into subdirectories to keep the directories small.
+        """
+        return os.path.join(self.__cache_dir, key[:2], key)
+
+    def restore(self, action, source, result_file):
+        """
+        Copy the cached result of the source to result_file if every
+        dependency of the translation unit is unchanged.
+        Return True on a cache hit.
+        """
+        if action.analyzer_type not in self.__config_digests:
+            return False
+
+        entry = self.__entry_path(self.__key(action, source))
+        try:
+            with open(entry + '.json', 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, ValueError):
+            return False
+
+        for dependency, content_hash in manifest['dependencies'].items():
+            if hash_file(dependency) != content_hash:
+                LOG.debug_analyzer("Cached result of '" + source +
+                                   "' is outdated, '" + dependency +
+                                   "' changed.")
+                return False
+
+        try:
+            shutil.copyfile(entry + '.plist', result_file)
+        except (IOError, OSError) as ex:
+            LOG.debug_analyzer("Failed to restore cached result: " + str(ex))
+            return False
+
+        return True
+
+    def store(self, action, source, result_file, dependencies):
+        """
+        Save the result file of the source to the cache along with the
+        content hash of the given dependencies.
+        Return True if the result was stored.
+        """
+        if action.analyzer_type not in self.__config_digests or \
+                not os.path.exists(result_file):
+            return False
+
+        dep_hashes = {}
+        for dependency in dependencies:
+            dependency = os.path.normpath(
+                os.path.join(action.directory, dependency))
+            content_hash = hash_file(dependency)
+            if content_hash is None:
+                # The result would never be reused if a dependency can not be
+                # read back.
+                LOG.debug_analyzer("Not caching the result of '" + source +
+                                   "', '" + dependency + "' is unreadable.")
+                return False
+            dep_hashes[dependency] = content_hash
+
+        entry = self.__entry_path(self.__key(action, source))
+        try:
+            entry_dir = os.path.dirname(entry)
+            if not os.path.isdir(entry_dir):
+                try:
+                    os.makedirs(entry_dir)
+                except OSError:
+                    # Another worker might have created it.
+                    pass
+
+            # Write the plist first, so a manifest always refers to a
+            # complete result file.
+            with open(result_file, 'rb') as result:
+                write_atomically(entry + '.plist',
+                                 lambda out: shutil.copyfileobj(result, out))
+
+            write_atomically(entry + '.json',
+                             lambda out: json.dump({'source': source,
+                                                    'dependencies':
+                                                        dep_hashes}, out))
+        except (IOError, OSError) as ex:
+            LOG.debug_analyzer("Failed to store result in the cache: " +
+                               str(ex))
+            return False
+
+        return True
@@ -0,0 +1,216 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Merge the output directories of multiple analyses, e.g. the shards of an
+analysis, into one output directory which can be stored as a single run.
+"""
+
+import json
+import os
+import shutil
+
+from libcodechecker.analyze import analysis_history
+from libcodechecker.analyze import log_parser
+from libcodechecker.analyze.result_cache import hash_file
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('RESULT MERGER')
+
+METADATA_FILE = 'metadata.json'
+COMPILE_CMD_FILE = 'compile_cmd.json'
+
+# Subdirectories of the output directory whose files are copied.
+RESULT_DIRS = ['failed', 'success']
+
+# JSON files of the output directory containing a dictionary. The merged
+# file contains the entries of every input.
+DICT_FILES = [analysis_history.HISTORY_FILE,
+              analysis_history.MEMORY_HISTORY_FILE,
+              log_parser.compiler_includes_dump_file,
+              log_parser.compiler_target_dump_file]
+
+
+def __copy_unique(src_dir, dst_dir, file_filter, copied):
+    """
+    Copy the files of src_dir accepted by file_filter to dst_dir.
+
+    Files with the same name and content as a file already copied, e.g. the
+    result of a translation unit analyzed in multiple shards, are skipped.
+    The result files of different translation units may have the same
+    content, e.g. if they have no reports, these are all copied.
+    If a different file with the same name was already copied, the first
+    one is kept. copied maps the names of the copied files to their content
+    hash.
+    Return the names of the files in dst_dir which represent the files of
+    src_dir.
+    """
+    kept = set()
+    if not os.path.isdir(src_dir):
+        return kept
+
+    for name in sorted(os.listdir(src_dir)):
+        src = os.path.join(src_dir, name)
+        if not os.path.isfile(src) or not file_filter(name):
+            continue
+
+        digest = hash_file(src)
+        dst = os.path.join(dst_dir, name)
+        if os.path.exists(dst):
+            if copied.get(name) == digest:
+                kept.add(name)
+            else:
+                LOG.warning("'" + src + "' differs from an earlier result "
+                            "with the same name, keeping the earlier one.")
+            continue
+
+        if not os.path.isdir(dst_dir):
+            os.makedirs(dst_dir)
+        shutil.copyfile(src, dst)
+        copied[name] = digest
+        kept.add(name)
+
+    return kept
+
+
+def __load_json(path, default):
+    if not os.path.isfile(path):
+        return default
+
+    try:
+        with open(path, 'r') as json_file:
+            return json.load(json_file)
+    except (IOError, ValueError) as ex:
+        LOG.warning("Failed to load '" + path + "': " + str(ex))
+        return default
+
+
+def __add_counts(merged, counts):
+    for key, count in counts.items():
+        merged[key] = merged.get(key, 0) + count
+
+
+def merge_metadata(metadatas, output_dir, result_names):
+    """
+    Merge the metadata of the analyses.
+
+    result_names is a list containing the set of result file names kept in
+    output_dir from the corresponding analysis. The source files of the
+    other result files are dropped.
+    """
+    merged = dict(metadatas[0])
+    merged['output_path'] = output_dir
+    merged['action_num'] = 0
+    merged['result_source_files'] = {}
+    merged['resource_usage'] = {}
+    merged['checkers'] = {}
+    merged['successful'] = {}
+    merged['failed'] = {}
+    merged['skipped'] = 0
+    merged.pop('result_cache', None)
+    merged.pop('makespan', None)
+    merged.pop('shard', None)
+
+    begin = []
+    end = []
+    cache_stats = {}
+    for metadata, names in zip(metadatas, result_names):
+        merged['action_num'] += metadata.get('action_num', 0)
+        merged['skipped'] += metadata.get('skipped', 0)
+        __add_counts(merged['successful'], metadata.get('successful', {}))
+        __add_counts(merged['failed'], metadata.get('failed', {}))
+        __add_counts(cache_stats, metadata.get('result_cache', {}))
+
+        for result_file, source in sorted(
+                metadata.get('result_source_files', {}).items()):
+            name = os.path.basename(result_file)
+            if name in names:
+                merged['result_source_files'].setdefault(
+                    os.path.join(output_dir, name), source)
+
+        for result_file, usage in sorted(
+                metadata.get('resource_usage', {}).items()):
+            merged['resource_usage'].setdefault(
+                os.path.join(output_dir, os.path.basename(result_file)),
+                usage)
+
+        for analyzer, checkers in metadata.get('checkers', {}).items():
+            merged_checkers = merged['checkers'].setdefault(analyzer, [])
+            merged_checkers.extend(checker for checker in checkers
+                                   if checker not in merged_checkers)
+
+        if 'timestamps' in metadata:
+            begin.append(metadata['timestamps']['begin'])
+            end.append(metadata['timestamps']['end'])
+
+    if cache_stats:
+        merged['result_cache'] = cache_stats
+
+    if begin:
+        merged['timestamps'] = {'begin': min(begin), 'end': max(end)}
+
+    return merged
+
+
+def merge_output_dirs(input_dirs, output_dir):
+    """
+    Merge the analysis output directories into output_dir.
+    """
+    copied = {}
+    sub_copied = dict((sub_dir, {}) for sub_dir in RESULT_DIRS)
+    metadatas = []
+    result_names = []
+    compile_commands = []
+    command_keys = set()
+    dict_contents = dict((file_name, {}) for file_name in DICT_FILES)
+
+    for input_dir in input_dirs:
+        LOG.debug("Merging '" + input_dir + "'")
+
+        names = __copy_unique(input_dir, output_dir,
+                              lambda name: name.endswith('.plist'),
+                              copied)
+
+        for sub_dir in RESULT_DIRS:
+            __copy_unique(os.path.join(input_dir, sub_dir),
+                          os.path.join(output_dir, sub_dir),
+                          lambda _: True,
+                          sub_copied[sub_dir])
+
+        metadata = __load_json(os.path.join(input_dir, METADATA_FILE), None)
+        if metadata is not None:
+            metadatas.append(metadata)
+            result_names.append(names)
+
+        for command in __load_json(os.path.join(input_dir, COMPILE_CMD_FILE),
+                                   []):
+            key = json.dumps(command, sort_keys=True)
+            if key not in command_keys:
+                command_keys.add(key)
+                compile_commands.append(command)
+
+        for file_name, content in dict_contents.items():
+            content.update(__load_json(os.path.join(input_dir, file_name),
+                                       {}))
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    if metadatas:
+        with open(os.path.join(output_dir, METADATA_FILE), 'w') as metafile:
+            json.dump(merge_metadata(metadatas, output_dir, result_names),
+                      metafile)
+
+    if compile_commands:
+        with open(os.path.join(output_dir, COMPILE_CMD_FILE), 'w') as cmds:
+            json.dump(compile_commands, cmds)
+
+    for file_name, content in dict_contents.items():
+        if content:
+            with open(os.path.join(output_dir, file_name), 'w') as out:
+                json.dump(content, out)
+
+    LOG.info("Merged %d output directories, %d result files." %
+             (len(input_dirs), len(copied)))
@@ -14,6 +14,25 @@ from libcodechecker.logger import LoggerFactory
 LOG = LoggerFactory.get_new_logger('SKIPLIST HANDLER')
 
 
+# The patterns of the skip file are combined into regular expressions of at
+# most this many alternatives, the re module supports at most 100 groups.
+PATTERNS_PER_REGEX = 99
+
+# The suffix of the regular expressions created by fnmatch.translate().
+FNMATCH_SUFFIX = '\\Z(?ms)'
+
+
+def _glob_pattern(glob):
+    """
+    Translate a skip file pattern to a regular expression matching the paths
+    starting with the pattern.
+    """
+    pattern = fnmatch.translate(glob + '*')
+    if pattern.endswith(FNMATCH_SUFFIX):
+        pattern = pattern[:-len(FNMATCH_SUFFIX)]
+    return pattern + '\\Z'
+
+
 class SkipListHandler(object):
     """
     Skiplist file format:
@@ -22,13 +41,20 @@ class SkipListHandler(object):
     -/do/not/check/this.file
     +/dir/check.this.file
     -/dir/*
+
+    The first matching pattern decides if a file is skipped. The patterns
+    are combined into a few regular expressions and the decisions are
+    memoized, because the same headers are checked for every report.
     """
 
+    # Number of memoized decisions.
+    CACHE_SIZE = 100000
+
     def __init__(self, skip_file):
         """
         read up the skip file
         """
-        self.__skip = []
+        patterns = []
 
         with open(skip_file, 'r') as skip_file:
             skip_file_content = [line.strip()
@@ -39,17 +65,39 @@ class SkipListHandler(object):
             if len(line) < 2 or line[0] not in ['-', '+']:
                 LOG.warning("Skipping malformed skipfile pattern: " + line)
                 continue
-            rexpr = re.compile(fnmatch.translate(line[1:].strip() + '*'))
-            self.__skip.append((line, rexpr))
+            patterns.append((line[0] == '-', _glob_pattern(line[1:].strip())))
+
+        # (regex, the skip decision of its alternatives) pairs. The
+        # alternatives are tried in the order of the skip file, the i-th
+        # one is captured by the (i + 1)-th group.
+        self.__regexes = []
+        for start in range(0, len(patterns), PATTERNS_PER_REGEX):
+            chunk = patterns[start:start + PATTERNS_PER_REGEX]
+            regex = re.compile('(?ms)' + '|'.join('(%s)' % pattern
+                                                  for _, pattern in chunk))
+            self.__regexes.append((regex, [skip for skip, _ in chunk]))
+
+        self.__decisions = {}
 
     def should_skip(self, source):
         """
         Check if the given source should be skipped.
         Should the analyzer skip the given source file?
         """
+        try:
+            return self.__decisions[source]
+        except KeyError:
+            pass
+
+        skip = False
+        for regex, decisions in self.__regexes:
+            found = regex.match(source)
+            if found:
+                skip = decisions[found.lastindex - 1]
+                break
+
+        if len(self.__decisions) >= self.CACHE_SIZE:
+            self.__decisions.clear()
+        self.__decisions[source] = skip
 
-        for line, rexpr in self.__skip:
-            if rexpr.match(source):
-                sign = line[0]
-                return sign == '-'
-        return False
+        return skip
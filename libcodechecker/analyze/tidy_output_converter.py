@@ -9,6 +9,7 @@ for the plist_parser module.
 """
 
 import copy
+import hashlib
 import json
 import os
 import plistlib
@@ -120,18 +121,26 @@ class OutputParser(object):
             tidy_out: something iterable (e.g.: a file object)
         """
 
+        self.messages.extend(self.iter_messages(tidy_out))
+        return self.messages
+
+    def iter_messages(self, tidy_out):
+        """
+        Parse the given clang-tidy output like parse_messages(), but yield
+        the messages one by one as they are parsed instead of collecting
+        them, so the output is never held in memory as a whole.
+        """
+
         titer = iter(tidy_out)
         try:
             next_line = titer.next()
             while True:
                 message, next_line = self._parse_message(titer, next_line)
                 if message is not None:
-                    self.messages.append(message)
+                    yield message
         except StopIteration:
             pass
 
-        return self.messages
-
     def _parse_message(self, titer, line):
         """
         Parse the given line. Returns a (message, next_line) pair or throws a
@@ -186,6 +195,7 @@ class OutputParser(object):
 
             message_text = line.strip()
             if message_text == '':
+                line = titer.next()
                 continue
 
             message.fixits.append(Note(message.path, message.line,
@@ -223,46 +233,6 @@ class PListConverter(object):
             'diagnostics': []
         }
 
-    def _add_files_from_messages(self, messages):
-        """
-        Adds the new files from the given message array to the plist's "files"
-        key, and returns a path to file index dictionary.
-        """
-
-        fmap = {}
-        for message in messages:
-            try:
-                # This file is already in the plist.
-                idx = self.plist['files'].index(message.path)
-                fmap[message.path] = idx
-            except ValueError:
-                # New file.
-                fmap[message.path] = len(self.plist['files'])
-                self.plist['files'].append(message.path)
-
-            # Collect file paths from the message notes.
-            for nt in message.notes:
-                try:
-                    # This file is already in the plist.
-                    idx = self.plist['files'].index(nt.path)
-                    fmap[nt.path] = idx
-                except ValueError:
-                    # New file.
-                    fmap[nt.path] = len(self.plist['files'])
-                    self.plist['files'].append(nt.path)
-
-        return fmap
-
-    def _add_diagnostics(self, messages, files):
-        """
-        Adds the messages to the plist as diagnostics.
-        """
-
-        fmap = self._add_files_from_messages(messages)
-        for message in messages:
-            diag = PListConverter._create_diag(message, fmap, files)
-            self.plist['diagnostics'].append(diag)
-
     @staticmethod
     def _get_checker_category(checker):
         """
@@ -373,7 +343,8 @@ class PListConverter(object):
         Adds the given clang-tidy messages to the plist.
         """
 
-        self._add_diagnostics(messages, self.plist['files'])
+        self.plist['diagnostics'].extend(
+            iter_diagnostics(messages, self.plist['files']))
 
     def write_to_file(self, path):
         """
@@ -392,3 +363,75 @@ class PListConverter(object):
 
     def __str__(self):
         return str(json.dumps(self.plist, indent=4, separators=(',', ': ')))
+
+
+def _message_digest(message):
+    """
+    Digest of everything in the message which is part of its diagnostic.
+    """
+
+    def note_key(note):
+        return note.path, note.line, note.column, note.message
+
+    key = (note_key(message), message.checker,
+           [note_key(fixit) for fixit in message.fixits],
+           [note_key(note) for note in message.notes])
+    return hashlib.sha1(repr(key)).digest()
+
+
+def iter_diagnostics(messages, files):
+    """
+    Convert the clang-tidy messages to plist diagnostics one by one. The new
+    files referenced by the messages are appended to the files list in the
+    order they are first referenced.
+
+    clang-tidy reports a warning in a header again for every expansion which
+    triggers it, a message which is the same as an earlier one is only
+    converted once. Only a digest of the converted messages is kept.
+    """
+
+    fmap = dict((path, idx) for idx, path in enumerate(files))
+    converted = set()
+    for message in messages:
+        digest = _message_digest(message)
+        if digest in converted:
+            LOG.debug("Dropping repeated message: %s" % message)
+            continue
+        converted.add(digest)
+
+        for path in [message.path] + [note.path for note in message.notes]:
+            if path not in fmap:
+                fmap[path] = len(files)
+                files.append(path)
+
+        yield PListConverter._create_diag(message, fmap, files)
+
+
+def write_plist(diagnostics, files, file):
+    """
+    Write the plist XML of the diagnostics to the given file object while
+    the diagnostics are generated. The output is the same as the one of
+    PListConverter.write(), but only the current diagnostic is kept in
+    memory. The files are written after the diagnostics, so the list can
+    be filled by iter_diagnostics() in the meantime.
+
+    Returns the number of the written diagnostics.
+    """
+
+    writer = plistlib.PlistWriter(file)
+    writer.writeln('<plist version="1.0">')
+    # The keys of a dictionary are written in sorted order by plistlib.
+    writer.beginElement('dict')
+    writer.simpleElement('key', 'diagnostics')
+    writer.beginElement('array')
+    count = 0
+    for diag in diagnostics:
+        writer.writeValue(diag)
+        count += 1
+    writer.endElement('array')
+    writer.simpleElement('key', 'files')
+    writer.writeValue(files)
+    writer.endElement('dict')
+    writer.writeln('</plist>')
+
+    return count
@@ -20,7 +20,7 @@ from codeCheckerDBAccess_v6 import constants, ttypes
 from libcodechecker import generic_package_context
 from libcodechecker import suppress_handler
 from libcodechecker import suppress_file_handler
-from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_index
 from libcodechecker.libclient.client import handle_auth
 from libcodechecker.libclient.client import setup_client
 from libcodechecker.logger import LoggerFactory
@@ -218,7 +218,7 @@ def handle_diff_results(args):
                 file_path = os.path.join(reportdir, filename)
                 LOG.debug("Parsing:" + file_path)
                 try:
-                    files, reports = plist_parser.parse_plist(file_path)
+                    files, reports = report_index.parse_plist(file_path)
                     for report in reports:
                         report.main['location']['file_name'] = \
                             files[int(report.main['location']['file'])]
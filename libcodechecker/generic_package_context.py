@@ -10,8 +10,6 @@ import sys
 
 from libcodechecker import db_version
 from libcodechecker import logger
-# TODO: Refers subpackage library
-from libcodechecker.analyze.analyzers import analyzer_types
 
 LOG = logger.LoggerFactory.get_new_logger('CONTEXT')
 
@@ -121,6 +119,9 @@ class Context(object):
             sys.exit(1)
 
     def __populate_analyzers(self):
+        # The analyzer modules are not needed by every subcommand.
+        from libcodechecker.analyze.analyzers import analyzer_types
+
         compiler_binaries = self.pckg_layout.get('analyzers')
         if not compiler_binaries:
             # Set default analyzers assume they are in the PATH
@@ -11,35 +11,22 @@ argument list, help text, and the invocation.
 This file contains basic methods to handle dynamic subcommand loading.
 """
 
-import imp
+import importlib
 
 
 def load_module(name):
     """
     Load the subcommand module with the given name from the package.
     This method returns the Python module object.
+
+    Only the modules of the used subcommands are imported, so the modules
+    which are needed only by some subcommands should be imported by them.
     """
     # Even though command verbs and nouns are joined by a
     # hyphen, the Python files contain underscores.
     name = name.replace('-', '_')
 
-    # Load the 'libcodechecker' module and acquire its path.
-    cc_file, cc_path, cc_descr = imp.find_module("libcodechecker")
-    libcc_path = imp.load_module("libcodechecker",
-                                 cc_file, cc_path, cc_descr).__path__
-
-    # Load the 'libcodechecker.libhandlers' module and acquire its path.
-    handler_file, handler_path, handler_descr = \
-        imp.find_module("libhandlers", libcc_path)
-    libhandlers_path = imp.load_module("libhandlers",
-                                       handler_file,
-                                       handler_path,
-                                       handler_descr).__path__
-
-    # Load the module named as the argument.
-    command_file, command_path, command_descr = \
-        imp.find_module(name, libhandlers_path)
-    return imp.load_module(name, command_file, command_path, command_descr)
+    return importlib.import_module('libcodechecker.libhandlers.' + name)
 
 
 def add_subcommand(subparsers, subcommand):
@@ -12,10 +12,13 @@ import json
 import os
 import shutil
 import sys
+import time
 
 from libcodechecker import generic_package_context
 from libcodechecker import host_check
+from libcodechecker.analyze import analysis_history
 from libcodechecker.analyze import log_parser
+from libcodechecker.analyze import probe_cache
 from libcodechecker.analyze import analyzer
 from libcodechecker.analyze.analyzers import analyzer_types
 from libcodechecker.logger import add_verbose_arguments
@@ -106,6 +109,20 @@ def add_arguments_to_parser(parser):
                              "threads mean faster analysis at the cost of "
                              "using more memory.")
 
+    parser.add_argument('--memory-budget',
+                        type=int,
+                        dest="memory_budget",
+                        metavar='MB',
+                        required=False,
+                        default=argparse.SUPPRESS,
+                        help="The memory in megabytes the analyzer processes "
+                             "may use together. A new analysis is started "
+                             "only if its expected peak memory usage, "
+                             "recorded in earlier analyses, fits into this "
+                             "budget, even if fewer than '-j' analyses are "
+                             "running. (default: the memory available at "
+                             "the start of the analysis)")
+
     parser.add_argument('-i', '--ignore', '--skip',
                         dest="skipfile",
                         required=False,
@@ -207,6 +224,34 @@ def add_arguments_to_parser(parser):
                                     "into the '<OUTPUT_DIR>/success' "
                                     "directory.")
 
+    analyzer_opts.add_argument('--failure-sources-limit',
+                               type=int,
+                               dest='failure_sources_limit',
+                               metavar='NUM',
+                               default=argparse.SUPPRESS,
+                               required=False,
+                               help="Collect the source files needed to "
+                                    "reproduce a failed analysis into the "
+                                    "failure archive of at most NUM failed "
+                                    "analyses. The sources are collected by "
+                                    "low priority processes after the "
+                                    "analysis. (default: every failed "
+                                    "analysis)")
+
+    analyzer_opts.add_argument('--result-cache',
+                               dest='result_cache_dir',
+                               metavar='CACHE_DIR',
+                               required=False,
+                               default=argparse.SUPPRESS,
+                               help="Reuse the results of earlier analyses "
+                                    "stored in the given folder. A source "
+                                    "file is not analyzed again if neither "
+                                    "the build command, the analyzer "
+                                    "configuration nor any of the included "
+                                    "files changed since its result was "
+                                    "cached. Results of CTU analysis are not "
+                                    "cached.")
+
     analyzer_opts.add_argument('--saargs',
                                dest="clangsa_args_cfg_file",
                                required=False,
@@ -276,6 +321,89 @@ def add_arguments_to_parser(parser):
                                    "in-memory recompilation of the source "
                                    "files.")
 
+        ctu_opts.add_argument('--ctu-ast-store',
+                              type=str,
+                              dest='ctu_ast_store_dir',
+                              metavar='STORE_DIR',
+                              default=argparse.SUPPRESS,
+                              help="Keep the AST dumps created by the "
+                                   "'collect' phase in this directory, "
+                                   "outside the output directory, and reuse "
+                                   "them in later runs for the translation "
+                                   "units whose build command and "
+                                   "dependencies are unchanged.")
+
+        ctu_opts.add_argument('--ctu-ast-store-size',
+                              type=int,
+                              dest='ctu_ast_store_size',
+                              metavar='SIZE_MB',
+                              default=argparse.SUPPRESS,
+                              help="The size limit of the CTU AST store in "
+                                   "megabytes. The least recently used ASTs "
+                                   "are removed from the store above this "
+                                   "size. (default: 10240)")
+
+        ctu_opts.add_argument('--ctu-ast-store-age',
+                              type=int,
+                              dest='ctu_ast_store_age',
+                              metavar='DAYS',
+                              default=argparse.SUPPRESS,
+                              help="Remove the ASTs from the CTU AST store "
+                                   "which were not used for this many days. "
+                                   "(default: 30)")
+
+    distributed_opts = parser.add_argument_group(
+        "distributed analysis arguments",
+        "The analysis can be distributed to 'CodeChecker analyze-worker' "
+        "processes running on other hosts. The coordinator and the workers "
+        "authenticate each other with the shared secret in the "
+        "CC_ANALYZE_AUTH_KEY environment variable. The workers must see the "
+        "source files and the analyzer binaries at the same paths as the "
+        "coordinator.")
+
+    distributed_opts.add_argument('--coordinator',
+                                  type=str,
+                                  dest='coordinator_address',
+                                  metavar='HOST:PORT',
+                                  default=argparse.SUPPRESS,
+                                  help="Do not analyze the build actions "
+                                       "locally, but serve them to the "
+                                       "analysis workers on the given "
+                                       "address, and collect their results "
+                                       "into the output directory. Use "
+                                       "'-j' to give the expected number of "
+                                       "workers.")
+
+    shard_opts = parser.add_argument_group(
+        "sharding arguments",
+        "The build actions can be split into shards analyzed by separate "
+        "'CodeChecker analyze' calls, e.g. on multiple CI machines. Every "
+        "shard gets about the same amount of work. The output directories "
+        "of the shards can be combined with 'CodeChecker merge-results'.")
+
+    shard_opts.add_argument('--shard',
+                            type=str,
+                            dest='shard',
+                            metavar='K/N',
+                            default=argparse.SUPPRESS,
+                            help="Analyze only the K-th from N shards of "
+                                 "the build actions. Shards are numbered "
+                                 "from 1. The shards of the same "
+                                 "compilation database are the same on "
+                                 "every machine, if the source files are "
+                                 "at the same paths.")
+
+    shard_opts.add_argument('--shard-history',
+                            type=str,
+                            dest='shard_history',
+                            metavar='HISTORY_FILE',
+                            default=argparse.SUPPRESS,
+                            help="Balance the shards by the analysis times "
+                                 "in the given analysis_history.json file "
+                                 "of an earlier analysis, instead of the "
+                                 "size of the source files. Every shard "
+                                 "must be given the same file.")
+
     checkers_opts = parser.add_argument_group(
         "checker configuration",
         "See 'codechecker-checkers' for the list of available checkers. "
@@ -334,12 +462,47 @@ class ParseLogOptions:
             self.output_path = None
             self.compiler_includes_file = None
             self.compiler_target_file = None
+            self.probe_cache_dir = None
         else:
             self.output_path = getattr(args, 'output_path', None)
             self.compiler_includes_file =\
                 getattr(args, 'compiler_includes_file', None)
             self.compiler_target_file =\
                 getattr(args, 'compiler_target_file', None)
+            self.probe_cache_dir = probe_cache.DEFAULT_CACHE_DIR
+
+
+def __select_shard(args, actions):
+    """
+    Select the build actions of the shard given in the command line.
+    Return the selected actions and the (K, N) tuple of the shard.
+    """
+    if 'ctu_phases' in args:
+        LOG.error("CTU analysis can not be sharded, every shard would need "
+                  "the ASTs of every translation unit.")
+        sys.exit(1)
+
+    try:
+        index, count = analysis_history.parse_shard(args.shard)
+    except ValueError as ex:
+        LOG.error(str(ex))
+        sys.exit(1)
+
+    history = {}
+    if 'shard_history' in args:
+        if not os.path.isfile(args.shard_history):
+            LOG.error("The shard history file '" + args.shard_history +
+                      "' does not exist.")
+            sys.exit(1)
+        history = analysis_history.load_history(
+            os.path.dirname(os.path.abspath(args.shard_history)),
+            os.path.basename(args.shard_history))
+
+    selected = analysis_history.shard_actions(actions, history, index, count)
+    LOG.info("Analyzing shard %d/%d: %d of %d build actions." %
+             (index, count, len(selected), len(actions)))
+
+    return selected, (index, count)
 
 
 def main(args):
@@ -382,6 +545,7 @@ def main(args):
     LOG.debug("Output will be stored to: '" + args.output_path + "'")
 
     # Parse the JSON CCDBs and retrieve the compile commands.
+    parse_start = time.time()
     actions = []
     for log_file in args.logfile:
         if not os.path.exists(log_file):
@@ -391,11 +555,17 @@ def main(args):
 
         parseLogOptions = ParseLogOptions(args)
         actions += log_parser.parse_log(log_file, parseLogOptions)
+    LOG.debug("Startup phase, parsing the build logs: %.3f sec." %
+              (time.time() - parse_start))
     if len(actions) == 0:
         LOG.info("None of the specified build log files contained "
                  "valid compilation commands. No analysis needed...")
         sys.exit(1)
 
+    shard = None
+    if 'shard' in args:
+        actions, shard = __select_shard(args, actions)
+
     context = generic_package_context.get_context()
     metadata = {'action_num': len(actions),
                 'command': sys.argv,
@@ -410,6 +580,9 @@ def main(args):
     if 'name' in args:
         metadata['name'] = args.name
 
+    if shard:
+        metadata['shard'] = {'index': shard[0], 'count': shard[1]}
+
     # Update metadata dictionary with old values.
     metadata_file = os.path.join(args.output_path, 'metadata.json')
     if os.path.exists(metadata_file):
@@ -0,0 +1,89 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Defines a subcommand for CodeChecker which analyzes the build actions served
+by a 'CodeChecker analyze --coordinator' process.
+"""
+
+import argparse
+import sys
+
+from libcodechecker import generic_package_context
+from libcodechecker.analyze import distributed
+from libcodechecker.logger import add_verbose_arguments
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('ANALYZE WORKER')
+
+
+def get_argparser_ctor_args():
+    """
+    This method returns a dict containing the kwargs for constructing an
+    argparse.ArgumentParser (either directly or as a subparser).
+    """
+
+    return {
+        'prog': 'CodeChecker analyze-worker',
+        'formatter_class': argparse.ArgumentDefaultsHelpFormatter,
+
+        # Description is shown when the command's help is queried directly
+        'description': "Analyze the build actions served by a "
+                       "'CodeChecker analyze --coordinator' process, and "
+                       "send the results back to it. The coordinator and "
+                       "the workers authenticate each other with the shared "
+                       "secret in the CC_ANALYZE_AUTH_KEY environment "
+                       "variable.",
+
+        # Help is shown when the "parent" CodeChecker command lists the
+        # individual subcommands.
+        'help': "Analyze the build actions of a distributed analysis."
+    }
+
+
+def add_arguments_to_parser(parser):
+    """
+    Add the subcommand's arguments to the given argparse.ArgumentParser.
+    """
+
+    parser.add_argument('coordinator_address',
+                        type=str,
+                        metavar='HOST:PORT',
+                        help="The address of the coordinator, as given to "
+                             "'CodeChecker analyze --coordinator'.")
+
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        dest="jobs",
+                        required=False,
+                        default=1,
+                        help="Number of build actions analyzed in parallel "
+                             "on this host.")
+
+    add_verbose_arguments(parser)
+    parser.set_defaults(func=main)
+
+
+def main(args):
+    """
+    Analyze build actions until the coordinator has none left.
+    """
+
+    auth_key = distributed.get_auth_key()
+    if not auth_key:
+        LOG.error("The " + distributed.AUTH_KEY_ENV_VAR + " environment "
+                  "variable must be set to the shared secret of the "
+                  "coordinator.")
+        sys.exit(1)
+
+    try:
+        distributed.parse_address(args.coordinator_address)
+    except ValueError as ex:
+        LOG.error(str(ex))
+        sys.exit(1)
+
+    context = generic_package_context.get_context()
+    distributed.start_workers(args.coordinator_address, auth_key, context,
+                              args.jobs)
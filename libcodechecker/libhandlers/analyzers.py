@@ -9,10 +9,10 @@ analyzers available in CodeChecker.
 """
 
 import argparse
-import subprocess
 
 from libcodechecker import generic_package_context
 from libcodechecker import output_formatters
+from libcodechecker.analyze import host_check
 from libcodechecker.analyze.analyzers import analyzer_types
 from libcodechecker.logger import add_verbose_arguments
 from libcodechecker.logger import LoggerFactory
@@ -100,10 +100,8 @@ def main(args):
             rows.append([analyzer])
         else:
             binary = context.analyzer_binaries.get(analyzer)
-            try:
-                version = subprocess.check_output([binary,
-                                                   '--version'])
-            except (subprocess.CalledProcessError, OSError):
+            version = host_check.get_version(binary)
+            if version is None:
                 version = 'ERROR'
 
             rows.append([analyzer,
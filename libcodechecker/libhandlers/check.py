@@ -172,6 +172,22 @@ def add_arguments_to_parser(parser):
                                     "More threads mean faster analysis at "
                                     "the cost of using more memory.")
 
+    analyzer_opts.add_argument('--memory-budget',
+                               type=int,
+                               dest="memory_budget",
+                               metavar='MB',
+                               required=False,
+                               default=argparse.SUPPRESS,
+                               help="The memory in megabytes the analyzer "
+                                    "processes may use together. A new "
+                                    "analysis is started only if its "
+                                    "expected peak memory usage, recorded in "
+                                    "earlier analyses, fits into this "
+                                    "budget, even if fewer than '-j' "
+                                    "analyses are running. (default: the "
+                                    "memory available at the start of the "
+                                    "analysis)")
+
     analyzer_opts.add_argument('-c', '--clean',
                                dest="clean",
                                required=False,
@@ -226,6 +242,34 @@ def add_arguments_to_parser(parser):
                                     "into the '<OUTPUT_DIR>/success' "
                                     "directory.")
 
+    analyzer_opts.add_argument('--failure-sources-limit',
+                               type=int,
+                               dest='failure_sources_limit',
+                               metavar='NUM',
+                               default=argparse.SUPPRESS,
+                               required=False,
+                               help="Collect the source files needed to "
+                                    "reproduce a failed analysis into the "
+                                    "failure archive of at most NUM failed "
+                                    "analyses. The sources are collected by "
+                                    "low priority processes after the "
+                                    "analysis. (default: every failed "
+                                    "analysis)")
+
+    analyzer_opts.add_argument('--result-cache',
+                               dest='result_cache_dir',
+                               metavar='CACHE_DIR',
+                               required=False,
+                               default=argparse.SUPPRESS,
+                               help="Reuse the results of earlier analyses "
+                                    "stored in the given folder. A source "
+                                    "file is not analyzed again if neither "
+                                    "the build command, the analyzer "
+                                    "configuration nor any of the included "
+                                    "files changed since its result was "
+                                    "cached. Results of CTU analysis are not "
+                                    "cached.")
+
     # TODO: One day, get rid of these. See Issue #36, #427.
     analyzer_opts.add_argument('--saargs',
                                dest="clangsa_args_cfg_file",
@@ -297,6 +341,37 @@ def add_arguments_to_parser(parser):
                                    "in-memory recompilation of the source "
                                    "files.")
 
+        ctu_opts.add_argument('--ctu-ast-store',
+                              type=str,
+                              dest='ctu_ast_store_dir',
+                              metavar='STORE_DIR',
+                              default=argparse.SUPPRESS,
+                              help="Keep the AST dumps created by the "
+                                   "'collect' phase in this directory, "
+                                   "outside the output directory, and reuse "
+                                   "them in later runs for the translation "
+                                   "units whose build command and "
+                                   "dependencies are unchanged.")
+
+        ctu_opts.add_argument('--ctu-ast-store-size',
+                              type=int,
+                              dest='ctu_ast_store_size',
+                              metavar='SIZE_MB',
+                              default=argparse.SUPPRESS,
+                              help="The size limit of the CTU AST store in "
+                                   "megabytes. The least recently used ASTs "
+                                   "are removed from the store above this "
+                                   "size. (default: 10240)")
+
+        ctu_opts.add_argument('--ctu-ast-store-age',
+                              type=int,
+                              dest='ctu_ast_store_age',
+                              metavar='DAYS',
+                              default=argparse.SUPPRESS,
+                              help="Remove the ASTs from the CTU AST store "
+                                   "which were not used for this many days. "
+                                   "(default: 30)")
+
     checkers_opts = parser.add_argument_group(
         "checker configuration",
         "See 'codechecker-checkers' for the list of available checkers. "
@@ -437,8 +512,14 @@ def main(args):
                           'clangsa_args_cfg_file',
                           'tidy_args_cfg_file',
                           'capture_analysis_output',
+                          'failure_sources_limit',
+                          'result_cache_dir',
+                          'memory_budget',
                           'ctu_phases',
                           'ctu_in_memory',
+                          'ctu_ast_store_dir',
+                          'ctu_ast_store_size',
+                          'ctu_ast_store_age',
                           'enable_all',
                           'ordered_checkers'  # --enable and --disable.
                           ]
@@ -457,7 +538,8 @@ def main(args):
         # --- Step 3.: Print to stdout.
         parse_args = argparse.Namespace(
             input=[output_dir],
-            input_format='plist'
+            input_format='plist',
+            jobs=args.jobs
         )
         __update_if_key_exists(args, parse_args, 'print_steps')
         __update_if_key_exists(args, parse_args, 'verbose')
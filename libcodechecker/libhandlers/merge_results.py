@@ -0,0 +1,93 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Defines a subcommand for CodeChecker which merges the output directories of
+multiple analyses, e.g. the shards of 'CodeChecker analyze --shard'.
+"""
+
+import argparse
+import os
+import sys
+
+from libcodechecker.analyze import result_merger
+from libcodechecker.logger import add_verbose_arguments
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('MERGE RESULTS')
+
+
+def get_argparser_ctor_args():
+    """
+    This method returns a dict containing the kwargs for constructing an
+    argparse.ArgumentParser (either directly or as a subparser).
+    """
+
+    return {
+        'prog': 'CodeChecker merge-results',
+        'formatter_class': argparse.ArgumentDefaultsHelpFormatter,
+
+        # Description is shown when the command's help is queried directly
+        'description': "Merge the output directories of multiple "
+                       "'CodeChecker analyze' calls, e.g. the shards of an "
+                       "analysis, into one output directory. Identical "
+                       "result files are stored only once. The merged "
+                       "directory can be stored as a single run with "
+                       "'CodeChecker store'.",
+
+        # Help is shown when the "parent" CodeChecker command lists the
+        # individual subcommands.
+        'help': "Merge the output directories of multiple analyses."
+    }
+
+
+def add_arguments_to_parser(parser):
+    """
+    Add the subcommand's arguments to the given argparse.ArgumentParser.
+    """
+
+    parser.add_argument('input',
+                        type=str,
+                        nargs='+',
+                        metavar='folder',
+                        help="The output directories of the analyses which "
+                             "should be merged.")
+
+    parser.add_argument('-o', '--output',
+                        dest="output_path",
+                        required=True,
+                        default=argparse.SUPPRESS,
+                        help="Store the merged results in the given folder. "
+                             "The folder must not contain analysis results "
+                             "yet.")
+
+    add_verbose_arguments(parser)
+    parser.set_defaults(func=main)
+
+
+def main(args):
+    """
+    Merge the given output directories.
+    """
+
+    output_path = os.path.abspath(args.output_path)
+    input_dirs = [os.path.abspath(input_dir) for input_dir in args.input]
+
+    for input_dir in input_dirs:
+        if not os.path.isdir(input_dir):
+            LOG.error("The input directory '" + input_dir + "' does not "
+                      "exist.")
+            sys.exit(1)
+
+    if os.path.exists(os.path.join(output_path,
+                                   result_merger.METADATA_FILE)):
+        LOG.error("The output directory '" + output_path + "' already "
+                  "contains analysis results.")
+        sys.exit(1)
+
+    result_merger.merge_output_dirs(input_dirs, output_path)
+
+    LOG.info("To store the merged results use the \"CodeChecker store\" "
+             "command.")
@@ -12,12 +12,12 @@ from collections import Counter
 import argparse
 import json
 import os
+import signal
 import sys
 
-from plist_to_html import PlistToHtml
-
 from libcodechecker import generic_package_context
 from libcodechecker import generic_package_suppress_handler
+from libcodechecker import source_cache
 from libcodechecker import util
 from libcodechecker.analyze.analyzers import analyzer_types
 # TODO: This is a cross-subpackage reference...
@@ -25,6 +25,7 @@ from libcodechecker.log import build_action
 from libcodechecker.logger import add_verbose_arguments
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.output_formatters import twodim_to_str
+from libcodechecker.report import ReportDeduplicator
 
 LOG = LoggerFactory.get_new_logger('PARSE')
 
@@ -73,6 +74,15 @@ def add_arguments_to_parser(parser):
                         help="Specify the format the analysis results were "
                              "created as.")
 
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        dest="jobs",
+                        required=False,
+                        default=1,
+                        help="Number of processes to use for parsing the "
+                             "result files. The results are printed in the "
+                             "same order as by a single process.")
+
     output_opts = parser.add_argument_group("export arguments")
     output_opts.add_argument('-e', '--export',
                              dest="export",
@@ -152,20 +162,10 @@ def add_arguments_to_parser(parser):
     parser.set_defaults(func=__handle)
 
 
-def parse(f, context, metadata_dict, suppress_handler, steps):
+def __construct_handler(f, context, metadata_dict, suppress_handler, steps):
     """
-    Prints the results in the given file to the standard output in a human-
-    readable format.
-
-    Returns the report statistics collected by the result handler.
+    Construct the result handler printing the results in the given file.
     """
-
-    if not f.endswith(".plist"):
-        LOG.debug("Skipping input file '" + f + "' as it is not a plist.")
-        return {}
-
-    LOG.debug("Parsing input file '" + f + "'")
-
     buildaction = build_action.BuildAction()
 
     rh = analyzer_types.construct_parse_handler(buildaction,
@@ -186,9 +186,142 @@ def parse(f, context, metadata_dict, suppress_handler, steps):
     else:
         rh.analyzed_source_file = "UNKNOWN"
 
+    return rh
+
+
+def parse(f, context, metadata_dict, suppress_handler, steps,
+          deduplicator=None):
+    """
+    Prints the results in the given file to the standard output in a human-
+    readable format. The reports which are the same as an earlier one are
+    left out if a report deduplicator is given.
+
+    Returns the report statistics collected by the result handler.
+    """
+
+    if not f.endswith(".plist"):
+        LOG.debug("Skipping input file '" + f + "' as it is not a plist.")
+        return {}
+
+    LOG.debug("Parsing input file '" + f + "'")
+
+    rh = __construct_handler(f, context, metadata_dict, suppress_handler,
+                             steps)
+    rh.deduplicator = deduplicator
     return rh.handle_results()
 
 
+class _CollectingSuppressHandler(object):
+    """
+    Suppress handler of the parsing worker processes. The source code
+    suppressions found by a worker are collected and written to the suppress
+    file by the main process, in the order of the parsed files.
+    """
+
+    def __init__(self, suppress_handler):
+        self.__suppress_handler = suppress_handler
+        self.stored = []
+
+    def get_suppressed(self, bug):
+        return self.__suppress_handler.get_suppressed(bug)
+
+    def store_suppress_bug_id(self, bug_id, file_name, comment):
+        self.stored.append((bug_id, file_name, comment))
+        return True
+
+
+# The state shared by the parsing of every file in a worker process. It is
+# given to the worker once when the process is started.
+parse_worker_data = None
+
+
+def init_parse_worker(worker_data):
+    global parse_worker_data
+
+    # Interrupting the parse is handled by the main process.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parse_worker_data = worker_data
+
+
+def parse_in_worker(file_path):
+    """
+    Format the results in the plist file in a worker process. Return the
+    formatted reports and the source code suppressions found.
+    """
+    context, metadata_dict, suppress_handler, steps = parse_worker_data
+    if suppress_handler:
+        suppress_handler = _CollectingSuppressHandler(suppress_handler)
+
+    LOG.debug("Parsing input file '" + file_path + "'")
+
+    rh = __construct_handler(file_path, context, metadata_dict,
+                             suppress_handler, steps)
+    bugs = rh.format_results()
+
+    return bugs, suppress_handler.stored if suppress_handler else []
+
+
+def parse_files(files, context, metadata_dict, suppress_handler, steps,
+                jobs, deduplicator=None):
+    """
+    Print the results in the given files in the order of the files, parsing
+    the files in jobs processes. Yields the report statistics of the files.
+
+    The reports are formatted by the workers, but the duplicates are left
+    out by the main process, so the first one is printed like by a single
+    process.
+    """
+    if jobs <= 1 or len(files) <= 1:
+        for file_path in files:
+            yield parse(file_path, context, metadata_dict, suppress_handler,
+                        steps, deduplicator)
+        return
+
+    import multiprocessing
+
+    plists = [file_path for file_path in files
+              if file_path.endswith(".plist")]
+
+    pool = multiprocessing.Pool(jobs,
+                                initializer=init_parse_worker,
+                                initargs=((context,
+                                           metadata_dict,
+                                           suppress_handler,
+                                           steps),))
+    try:
+        # The results are returned in the order of the files.
+        results = pool.imap(parse_in_worker, plists)
+        for file_path in files:
+            if not file_path.endswith(".plist"):
+                LOG.debug("Skipping input file '" + file_path + "' as it is "
+                          "not a plist.")
+                yield {}
+                continue
+
+            # The main process does not get signal while waiting for a
+            # result without timeout.
+            bugs, suppressions = results.next(float('inf'))
+
+            for suppression in suppressions:
+                suppress_handler.store_suppress_bug_id(*suppression)
+
+            if bugs is None:
+                # The plist is not valid.
+                yield 1
+                continue
+
+            rh = __construct_handler(file_path, context, metadata_dict,
+                                     suppress_handler, steps)
+            rh.deduplicator = deduplicator
+            yield rh.write_results(bugs)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
 def main(args):
     """
     Entry point for parsing some analysis results and printing them to the
@@ -240,11 +373,15 @@ def main(args):
         if export is not None and export == 'html':
             output_path = os.path.abspath(args.output_path)
 
+            # Only needed for the export.
+            from plist_to_html import PlistToHtml
+
             LOG.info("Generating html output files:")
             PlistToHtml.parse(input_path,
                               output_path,
                               context.path_plist_to_html_dist,
-                              'clean' in args)
+                              'clean' in args,
+                              args.jobs)
             continue
 
         severity_stats = Counter({})
@@ -270,18 +407,24 @@ def main(args):
             files = [os.path.join(input_path, file_name) for file_name
                      in file_names]
 
-        for file_path in files:
-            report_stats = parse(file_path,
-                                 context,
-                                 metadata_dict,
-                                 suppress_handler,
-                                 'print_steps' in args)
-
+        deduplicator = ReportDeduplicator()
+        for report_stats in parse_files(files,
+                                        context,
+                                        metadata_dict,
+                                        suppress_handler,
+                                        'print_steps' in args,
+                                        args.jobs,
+                                        deduplicator):
             severity_stats.update(Counter(report_stats.get('severity',
                                           {})))
             file_stats.update(Counter(report_stats.get('files', {})))
             report_count.update(Counter(report_stats.get('reports', {})))
 
+        if deduplicator.duplicates:
+            LOG.info("Left out %d reports which are the same as an earlier "
+                     "one, e.g. in a header included by multiple analyzed "
+                     "files." % deduplicator.duplicates)
+
         print("\n----==== Summary ====----")
 
         if file_stats:
@@ -302,4 +445,5 @@ def main(args):
         print("Total number of reports: {}".format(report_count))
         print("----=================----")
 
+    source_cache.shared_cache.log_statistics()
     os.chdir(original_cwd)
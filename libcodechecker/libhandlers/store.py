@@ -15,6 +15,7 @@ import functools
 from hashlib import sha256
 import json
 import os
+import plistlib
 import shutil
 import sys
 import tempfile
@@ -28,9 +29,12 @@ from libcodechecker import generic_package_context
 from libcodechecker import host_check
 from libcodechecker import util
 from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_index
 from libcodechecker.libclient import client as libclient
 from libcodechecker.logger import add_verbose_arguments
 from libcodechecker.logger import LoggerFactory
+from libcodechecker.report import report_key
+from libcodechecker.report import ReportDeduplicator
 from libcodechecker.util import sizeof_fmt
 from libcodechecker.util import split_product_url
 
@@ -189,13 +193,29 @@ def assemble_zip(inputs, zip_file, client):
     # but different path.
     file_to_hash = {}
 
+    # A bug in a header is reported in the plist of every translation unit
+    # including the header, only the first copy is uploaded.
+    deduplicator = ReportDeduplicator()
+    removed_size = [0]
+
     def collect_file_hashes_from_plist(plist_file):
+        """
+        Return the source files, the reports and the content of the plist if
+        it had to be read, or None if a source file is missing.
+        """
+        plists = []
+
+        def read_plist(path, keys=None):
+            # The whole plist is kept for leaving out the duplicates.
+            plists.append(plist_parser.read_plist(path))
+            return plists[-1]
+
         try:
-            files, _ = plist_parser.parse_plist(plist_file)
+            files, reports = report_index.parse_plist(plist_file, read_plist)
 
             for f in files:
                 if not os.path.isfile(f):
-                    return False
+                    return None
 
                 with open(f) as content:
                     hasher = sha256()
@@ -204,10 +224,34 @@ def assemble_zip(inputs, zip_file, client):
                     hash_to_file[content_hash] = f
                     file_to_hash[f] = content_hash
 
-            return True
+            return files, reports, plists[0] if plists else None
         except Exception as ex:
             LOG.error('Parsing the plist failed: ' + str(ex))
 
+    def write_plist(zipf, plist_file, arcname, files, reports, plist):
+        """
+        Write the plist into the ZIP without the reports which are the same
+        as one in an earlier plist.
+        """
+        duplicates = set(index for index, report in enumerate(reports)
+                         if deduplicator.is_duplicate(report_key(report,
+                                                                 files)))
+        if duplicates:
+            if plist is None:
+                plist = plist_parser.read_plist(plist_file)
+            diagnostics = plist['diagnostics']
+            if len(diagnostics) == len(reports):
+                plist = dict(plist)
+                plist['diagnostics'] = [diag for index, diag
+                                        in enumerate(diagnostics)
+                                        if index not in duplicates]
+                content = plistlib.writePlistToString(plist)
+                zipf.writestr(arcname, content)
+                removed_size[0] += os.path.getsize(plist_file) - len(content)
+                return
+
+        zipf.write(plist_file, arcname)
+
     with zipfile.ZipFile(zip_file, 'a', allowZip64=True) as zipf:
         for input_path in inputs:
             input_path = os.path.abspath(input_path)
@@ -224,11 +268,14 @@ def assemble_zip(inputs, zip_file, client):
             for f in files:
                 plist_file = os.path.join(input_path, f)
                 if f.endswith(".plist"):
-                    if collect_file_hashes_from_plist(plist_file):
+                    plist_reports = collect_file_hashes_from_plist(plist_file)
+                    if plist_reports:
                         LOG.debug(
                             "Copying file '{0}' to ZIP assembly dir..."
                             .format(plist_file))
-                        zipf.write(plist_file, os.path.join('reports', f))
+                        write_plist(zipf, plist_file,
+                                    os.path.join('reports', f),
+                                    *plist_reports)
                     else:
                         LOG.warning("Skipping '{0}' because it contains "
                                     "a missing source file."
@@ -236,6 +283,12 @@ def assemble_zip(inputs, zip_file, client):
                 elif f == 'metadata.json':
                     zipf.write(plist_file, os.path.join('reports', f))
 
+        if deduplicator.duplicates:
+            LOG.info("Removed {0} reports which are the same as an earlier "
+                     "one, the plists are {1} smaller."
+                     .format(deduplicator.duplicates,
+                             sizeof_fmt(removed_size[0])))
+
         if len(hash_to_file) == 0:
             LOG.warning("There is no report to store. After uploading these "
                         "results the previous reports become resolved.")
@@ -335,167 +335,261 @@ class OptionIterator(object):
         return self._item
 
 
+def __combine(patterns):
+    """
+    Compile the patterns into one alternation. The alternatives are tried in
+    the given order, and the i-th one is captured by the group named 'p<i>'.
+    """
+    return re.compile('|'.join('(?P<p%d>%s)' % (index, pattern)
+                               for index, pattern in enumerate(patterns)))
+
+
+# Matchers of the option handlers. A matcher returns None if the argument
+# does not belong to the handler, otherwise the parameter of the handler.
+
+def __match_exact(table):
+    return table.get
+
+
+def __match_regex(table):
+    patterns = list(table)
+    regex = __combine(patterns)
+
+    def match(value):
+        found = regex.match(value)
+        if found is None:
+            return None
+        return table[patterns[int(found.lastgroup[1:])]]
+
+    return match
+
+
+def __match_merged(patterns):
+    """
+    The parameter is the value given in the same argument as the option.
+    """
+    regex = __combine(patterns)
+
+    def match(value):
+        found = regex.match(value)
+        if found is None:
+            return None
+        # The first group of the matching pattern.
+        return found.group(regex.groupindex[found.lastgroup] + 1)
+
+    return match
+
+
+def __match_option(option, regex=False):
+    if regex:
+        option_regex = re.compile(option)
+        return lambda value: True if option_regex.match(value) else None
+
+    return lambda value: True if value == option else None
+
+
+# Actions of the option handlers, called with the option iterator, the
+# parser result and the parameter returned by the matcher.
+
+def __append(attr_name):
+    """ Append the option and the given number of items after it. """
+
+    def append(it, result, size):
+        target_list = getattr(result, attr_name)
+        target_list.append(it.item)
+        for _ in range(size):
+            it.next()
+            target_list.append(it.item)
+
+    return append
+
+
+def __append_merged(attr_name):
+    """ Append the option with its value, given in the same or the next
+    item. """
+
+    def append(it, result, value):
+        tmp = it.item
+        if value == '':
+            it.next()
+            tmp = tmp + it.item
+        getattr(result, attr_name).append(tmp)
+
+    return append
+
+
+def __append_from_file(attr_name):
+    """ Append the lines of the file given in the next item. """
+
+    def append(it, result, _):
+        it.next()
+        with open(it.item) as file:
+            for line in file:
+                getattr(result, attr_name).append(line.strip())
+
+    return append
+
+
+def __append_replacement(attr_name):
+    """ Append the replacement of the option, skipping the next item. """
+
+    def append(it, result, replacement):
+        getattr(result, attr_name).extend(replacement)
+        it.next()
+
+    return append
+
+
+def __set_attr(attr_name, attr_value=None):
+    """ Set an attribute to the given value, or to the next item if no value
+    is given. """
+
+    def set_attr(it, result, _):
+        tmp = attr_value
+        if attr_value is None:
+            it.next()
+            tmp = it.item
+        setattr(result, attr_name, tmp)
+
+    return set_attr
+
+
+def __skip(it, result, size):
+    """ Skip the given number of items after the option. """
+    for _ in range(size):
+        it.next()
+
+
+def __ignore(it, result, _):
+    pass
+
+
+# The option handlers in the order they are tried. The first handler whose
+# matcher accepts the argument handles it.
+OPTION_HANDLERS = [
+    (__match_exact(REPLACE_OPTIONS_MAP),
+     __append_replacement('compile_opts')),
+    (__match_regex(UNKNOWN_OPTIONS_MAP_REGEX), __ignore),
+    (__match_option('-x'), __set_attr('lang')),
+    (__match_option('-o'), __set_attr('output')),
+    (__match_option('-arch'), __set_attr('arch')),
+    (__match_option('-c'), __set_attr('action', ActionType.COMPILE)),
+    (__match_option('^-(E|MM?)$', True),
+     __set_attr('action', ActionType.PREPROCESS)),
+    (__match_option('-print-prog-name'),
+     __set_attr('action', ActionType.INFO)),
+    (__match_exact(COMPILE_OPTION_MAP), __append('compile_opts')),
+    (__match_exact(COMPILER_LINKER_OPTION_MAP), __append('link_opts')),
+    (__match_regex(LINKER_OPTION_MAP_REGEX), __append('link_opts')),
+    (__match_regex(COMPILE_OPTION_MAP_REGEX), __append('compile_opts')),
+    (__match_merged(COMPILE_OPTION_MAP_MERGED),
+     __append_merged('compile_opts')),
+    (__match_merged(LINK_OPTION_MAP_MERGED), __append_merged('link_opts')),
+    (__match_exact(LINKER_OPTION_MAP), __skip),
+    (__match_exact(IGNORED_OPTION_MAP), __skip),
+    (__match_regex(IGNORED_OPTION_MAP_REGEX), __ignore),
+    (__match_option('-filelist'), __append_from_file('files')),
+    (__match_regex({'^[^-].+': 0}), __append('files'))]
+
+# The number of different arguments and compilation commands whose parsing
+# is remembered.
+CACHE_SIZE = 100000
+
+# Argument -> (index of the handler, parameter) or None if the argument is
+# not handled.
+classified_args = {}
+
+
+def classify(value):
+    """
+    Return the index of the option handler of the argument and the parameter
+    of the handler, or None if no handler accepts the argument.
+    """
+    try:
+        return classified_args[value]
+    except KeyError:
+        pass
+
+    classification = None
+    for index, (matcher, _) in enumerate(OPTION_HANDLERS):
+        param = matcher(value)
+        if param is not None:
+            classification = (index, param)
+            break
+
+    if len(classified_args) >= CACHE_SIZE:
+        classified_args.clear()
+    classified_args[value] = classification
+
+    return classification
+
+
 def arg_check(it, result):
-    def regex_match(string, pattern):
-        regexp = re.compile(pattern)
-        match = regexp.match(string)
-        return match is not None
-
-    # Handler functions for options.
-    def append_to_list(table, target_list, regex=False):
-        """ Append n item from iterator to to result[att_name] list."""
-
-        def wrapped(value):
-            def append_n(size):
-                target_list.append(it.item)
-                for _ in range(size):
-                    it.next()
-                    target_list.append(it.item)
-
-            if regex:
-                for pattern in table:
-                    if regex_match(value, pattern):
-                        append_n(table[pattern])
-                        return True
-            elif value in table:
-                append_n(table[value])
-                return True
-            return False
-
-        return wrapped
-
-    def append_merged_to_list(table, target_list):
-        """ Append one or two item to the list.
-              1: if there is no space between two option.
-              2: otherwise.
-        """
-
-        def wrapped(value):
-            for pattern in table:
-                match = re.match(pattern, value)
-                if match is not None:
-                    tmp = it.item
-                    if match.group(1) == '':
-                        it.next()
-                        tmp = tmp + it.item
-                    target_list.append(tmp)
-                    return True
-            return False
-
-        return wrapped
-
-    def append_to_list_from_file(arg, target_list):
-        """ Append items from file to to result[att_name] list."""
-
-        def wrapped(value):
-            if value == arg:
-                it.next()
-                with open(it.item) as file:
-                    for line in file:
-                        target_list.append(line.strip())
-                return True
-            return False
-
-        return wrapped
-
-    def append_replacement_to_list(table, target_list, regex=False):
-        """ Append replacement items from table to to result[att_name] list."""
-
-        def wrapped(value):
-            def append_replacement(items):
-                for item in items:
-                    target_list.append(item)
-                it.next()
-
-            if regex:
-                for pattern in table:
-                    if regex_match(value, pattern):
-                        append_replacement(table[pattern])
-                        return True
-            elif value in table:
-                append_replacement(table[value])
-                return True
-            return False
-
-        return wrapped
-
-    def set_attr(arg, obj, attr_name, attr_value=None, regex=None):
-        """ Set an attr value. If no value given then
-        read next from iterator."""
-        def wrapped(value):
-            if (regex and regex_match(value, arg)) or value == arg:
-                tmp = attr_value
-                if attr_value is None:
-                    it.next()
-                    tmp = it.item
-                setattr(obj, attr_name, tmp)
-                return True
-            return False
-
-        return wrapped
-
-    def skip(table, regex=False):
-        """ Skip n item in iterator."""
-
-        def wrapped(value):
-            def skip_n(size):
-                for _ in range(size):
-                    it.next()
-
-            if regex:
-                for pattern in table:
-                    if regex_match(value, pattern):
-                        return True
-            elif value in table:
-                skip_n(table[value])
-                return True
-            return False
-
-        return wrapped
-
-    # Defines handler functions for tables and single options.
-    arg_collection = [
-        append_replacement_to_list(REPLACE_OPTIONS_MAP, result.compile_opts),
-        skip(UNKNOWN_OPTIONS_MAP_REGEX, True),
-        set_attr('-x', result, 'lang'),
-        set_attr('-o', result, 'output'),
-        set_attr('-arch', result, 'arch'),
-        set_attr('-c', result, 'action', ActionType.COMPILE),
-        set_attr('^-(E|MM?)$', result, 'action', ActionType.PREPROCESS, True),
-        set_attr('-print-prog-name', result, 'action', ActionType.INFO),
-        append_to_list(COMPILE_OPTION_MAP, result.compile_opts),
-        append_to_list(COMPILER_LINKER_OPTION_MAP, result.link_opts),
-        append_to_list(LINKER_OPTION_MAP_REGEX, result.link_opts, True),
-        append_to_list(COMPILE_OPTION_MAP_REGEX, result.compile_opts, True),
-        append_merged_to_list(COMPILE_OPTION_MAP_MERGED, result.compile_opts),
-        append_merged_to_list(LINK_OPTION_MAP_MERGED, result.link_opts),
-        skip(LINKER_OPTION_MAP),
-        skip(IGNORED_OPTION_MAP),
-        skip(IGNORED_OPTION_MAP_REGEX, True),
-        append_to_list_from_file('-filelist', result.files),
-        append_to_list({'^[^-].+': 0}, result.files, True)]
-
-    for coll in arg_collection:
-        res = coll(it.item)
-        if res:
-            return True
-
-    # Unhandled compilation argument found.
-    LOG.debug("Unhandled argument: " + str(it.item))
-    return False
+    classification = classify(it.item)
+    if classification is None:
+        # Unhandled compilation argument found.
+        LOG.debug("Unhandled argument: " + str(it.item))
+        return False
+
+    index, param = classification
+    OPTION_HANDLERS[index][1](it, result, param)
+    return True
+
+
+CPP_COMPILER_REGEX = re.compile('.*\+\+.*')
+
+# Characters which make shlex.split() split a command differently than
+# str.split(): quotes, escapes and whitespace which is not a shlex separator.
+SHLEX_SPECIAL_REGEX = re.compile(r'[\'"\\]|(?![ \t\r\n])\s', re.UNICODE)
+
+# Compilation command -> OptionParserResult of the command.
+parsed_commands = {}
+
+
+def copy_result(result):
+    """
+    Return a copy of the OptionParserResult which does not share its lists.
+    """
+    copy = OptionParserResult()
+    copy.action = result.action
+    copy.compile_opts = list(result.compile_opts)
+    copy.link_opts = list(result.link_opts)
+    copy.files = list(result.files)
+    copy.arch = result.arch
+    copy.target = result.target
+    copy.lang = result.lang
+    copy.output = result.output
+    copy.compiler = result.compiler
+    return copy
 
 
 def parse_options(args):
     """ Requires a full compile command with the compiler,
-    not only arguments."""
+    not only arguments.
+
+    Generated builds often contain the same command many times, the result
+    is remembered for every command string."""
+
+    result_map = parsed_commands.get(args)
+    if result_map is not None:
+        return copy_result(result_map)
+
+    command = args
 
     # Keep " characters.
     args = args.replace(r'"', r'"\"')
 
     result_map = OptionParserResult()
 
+    # Most commands contain no quotes, they are split much faster without
+    # shlex.
+    if SHLEX_SPECIAL_REGEX.search(args) is None:
+        split_args = args.split()
+    else:
+        split_args = shlex.split(args)
+
     # The first element in the list is the compiler skip it from parsing.
-    for it in OptionIterator(shlex.split(args)[1:]):
+    for it in OptionIterator(split_args[1:]):
         arg_check(it, result_map)
 
     for idx, opt in enumerate(result_map.compile_opts):
@@ -506,12 +600,11 @@ def parse_options(args):
             # mess up the result.
             result_map.compile_opts[idx] = opt.replace('"', r'"\"')
 
-    result_map.compiler = shlex.split(args)[0]
+    result_map.compiler = split_args[0]
 
     #  If the compiler is C++ (contains ++ in its name)
     #  we set the language explicitly to c++.
-    cpp_regex = re.compile('.*\+\+.*')
-    if cpp_regex.match(result_map.compiler) is not None:
+    if CPP_COMPILER_REGEX.match(result_map.compiler) is not None:
         result_map.lang = 'c++'
 
     is_source = False
@@ -533,6 +626,12 @@ def parse_options(args):
     if not is_source:
         result_map.action = ActionType.LINK
 
+    # The content of the file lists may change.
+    if '-filelist' not in split_args:
+        if len(parsed_commands) >= CACHE_SIZE:
+            parsed_commands.clear()
+        parsed_commands[command] = copy_result(result_map)
+
     return result_map
 
 
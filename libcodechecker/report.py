@@ -15,8 +15,8 @@ import hashlib
 import json
 import os
 
+from libcodechecker import source_cache
 from libcodechecker.logger import LoggerFactory
-from libcodechecker.util import get_line
 
 LOG = LoggerFactory.get_new_logger('REPORT')
 
@@ -83,11 +83,16 @@ def generate_report_hash(path, source_file, check_name):
         from_col = m_loc.get('col')
         until_col = m_loc.get('col')
 
-        line_content = get_line(source_file, source_line)
+        try:
+            line_content = source_cache.read_line(source_file, source_line)
+        except (IOError, OSError):
+            if os.path.isfile(source_file):
+                # The hash would be wrong without the line of the file.
+                raise
 
-        if line_content == '' and not os.path.isfile(source_file):
             LOG.error("Failed to generate report hash.")
             LOG.error('%s does not exists!' % source_file)
+            line_content = ''
 
         file_name = os.path.basename(source_file)
         msg = main_section.get('message')
@@ -172,3 +177,65 @@ class Report(object):
     def __str__(self):
         msg = json.dumps(self.__main, sort_keys=True, indent=2)
         return msg
+
+
+def _canonical(value, files):
+    """
+    Copy of a bug path item with the file indexes of the locations replaced
+    by the file paths and the dictionaries by their items sorted by the
+    keys, which can be encoded without sorting the keys in the encoder.
+    """
+    if isinstance(value, dict):
+        items = []
+        for key in sorted(value):
+            item = value[key]
+            if key == 'file' and isinstance(item, int) and \
+                    0 <= item < len(files):
+                item = files[item]
+            else:
+                item = _canonical(item, files)
+            items.append((key, item))
+        return items
+    elif isinstance(value, list):
+        return [_canonical(item, files) for item in value]
+    return value
+
+
+def report_key(report, files):
+    """
+    Identify a report by its hash and its bug path, independently of the
+    plist it was read from: the file indexes in the bug path are replaced by
+    the file paths.
+
+    A bug in a header is reported in the plist of every translation unit
+    including the header, these copies have the same key.
+    """
+    bug_path = json.dumps(_canonical(report.bug_path, files),
+                          encoding='latin-1')
+    hasher = hashlib.sha1(
+        report.main['issue_hash_content_of_line_in_context'] or '')
+    hasher.update('|')
+    hasher.update(bug_path)
+    return hasher.digest()
+
+
+class ReportDeduplicator(object):
+    """
+    Find the reports which are the same as an earlier one, see report_key().
+    Only the keys of the reports are kept.
+    """
+
+    def __init__(self):
+        self.__keys = set()
+        self.duplicates = 0
+
+    def is_duplicate(self, key):
+        """
+        Return True if a report with the same key was seen before.
+        """
+        if key in self.__keys:
+            self.duplicates += 1
+            return True
+
+        self.__keys.add(key)
+        return False
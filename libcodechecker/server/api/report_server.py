@@ -1944,6 +1944,29 @@ class ThriftRequestHandler(object):
         for report in all_reports:
             hash_map_reports[report.bug_id].append(report)
 
+        # The source code suppressions are read from the stored file
+        # contents, every content is scanned once.
+        suppress_indexes = suppress_handler.SuppressIndexCache()
+
+        def get_suppress_index(file_name):
+            content_hash = filename2hash.get(file_name)
+            if content_hash is None:
+                return suppress_indexes.get_file_index(file_name)
+
+            def read_content():
+                source_file_name = os.path.realpath(
+                    os.path.join(source_root, file_name.strip("/")))
+                if os.path.isfile(source_file_name):
+                    with open(source_file_name, 'rb') as source_file:
+                        return source_file.read()
+
+                # The content was stored by an earlier run.
+                file_content = session.query(FileContent).get(content_hash)
+                return zlib.decompress(file_content.content) \
+                    if file_content else ''
+
+            return suppress_indexes.get(content_hash, read_content)
+
         # Processing PList files.
         _, _, report_files = next(os.walk(report_dir), ([], [], []))
         for f in report_files:
@@ -1998,11 +2021,13 @@ class ThriftRequestHandler(object):
                     run_history_time)
 
                 last_report_event = report.bug_path[-1]
+                source_file = files[last_report_event['location']['file']]
                 sp_handler = suppress_handler.SourceSuppressHandler(
-                    files[last_report_event['location']['file']],
+                    source_file,
                     last_report_event['location']['line'],
                     report.main['issue_hash_content_of_line_in_context'],
-                    report.main['check_name'])
+                    report.main['check_name'],
+                    get_suppress_index(source_file))
 
                 supp = sp_handler.get_suppressed()
                 if supp:
@@ -0,0 +1,186 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Shared cache of the source file lines read for the reports: for the report
+hashes, the source code suppressions and the printed reports.
+
+The content of a source file is read at once and an index of the line
+offsets is built as far as the lines are requested, so a file is opened only
+once no matter how many reports it has. No file is kept open by the cache.
+The number and the total size of the cached files are limited, the least
+recently used files are dropped first.
+"""
+
+from array import array
+from collections import OrderedDict
+import os
+import threading
+
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('SOURCE CACHE')
+
+# Limits of the cached source files.
+MAX_FILES = 1000
+MAX_CACHED_SIZE = 256 * 1024 * 1024
+
+
+class _SourceFile(object):
+    """
+    The content of a source file with the offsets of its lines.
+    """
+
+    def __init__(self, path, stat):
+        self.mtime = stat.st_mtime
+        with open(path, 'rb') as source:
+            self.__content = source.read()
+        self.size = len(self.__content)
+        # The size when the file was opened, a changed file is read again.
+        self.stat_size = stat.st_size
+
+        # The offset of the first character of every line indexed so far.
+        self.__offsets = array('l', [0])
+        self.__indexed = not self.__content
+
+    def line(self, line_no):
+        """
+        Return the line_no-th line (starting from 1) with the line ending or
+        an empty string if there is no such line.
+        """
+        offsets = self.__offsets
+        while len(offsets) <= line_no and not self.__indexed:
+            end = self.__content.find('\n', offsets[-1])
+            if end == -1:
+                self.__indexed = True
+            else:
+                offsets.append(end + 1)
+
+        if line_no >= len(offsets):
+            if line_no > len(offsets) or offsets[-1] >= self.size:
+                return ''
+            # The last line without a line ending.
+            return self.__content[offsets[-1]:]
+
+        return self.__content[offsets[line_no - 1]:offsets[line_no]]
+
+
+class SourceCache(object):
+    """
+    Return the lines of the source files from the cached file contents. The
+    cache can be used by multiple threads.
+    """
+
+    def __init__(self, max_files=MAX_FILES, max_size=MAX_CACHED_SIZE):
+        self.__max_files = max_files
+        self.__max_size = max_size
+        self.__files = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __remove(self, path):
+        source = self.__files.pop(path)
+        self.__size -= source.size
+
+    def __get_file(self, path):
+        """
+        Return the cached source file, which is read again if it changed
+        since it was read. IOError or OSError is raised if the file can not
+        be read.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if path in self.__files:
+                self.__remove(path)
+            raise
+
+        source = self.__files.get(path)
+        if source is not None:
+            if source.stat_size == stat.st_size and \
+                    source.mtime == stat.st_mtime:
+                self.hits += 1
+                # Move the file to the end of the LRU order.
+                del self.__files[path]
+                self.__files[path] = source
+                return source
+            self.__remove(path)
+
+        self.misses += 1
+        source = _SourceFile(path, stat)
+
+        self.__files[path] = source
+        self.__size += source.size
+        while len(self.__files) > 1 and \
+                (len(self.__files) > self.__max_files or
+                 self.__size > self.__max_size):
+            self.__remove(next(iter(self.__files)))
+            self.evictions += 1
+
+        return source
+
+    def read_line(self, path, line_no):
+        """
+        Return the given line (starting from 1) of the file with the line
+        ending. If the file has less lines an empty string is returned. If
+        the file can not be read IOError or OSError is raised.
+        """
+        if line_no < 1:
+            return ''
+
+        with self.__lock:
+            return self.__get_file(path).line(line_no)
+
+    def get_line(self, path, line_no):
+        """
+        Return the given line (starting from 1) of the file with the line
+        ending. If the file has less lines or it can't be read an empty
+        string is returned.
+        """
+        try:
+            return self.read_line(path, line_no)
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to read source file '" + path + "': " +
+                      str(ex))
+            return ''
+
+    def clear(self):
+        with self.__lock:
+            for path in list(self.__files):
+                self.__remove(path)
+
+    def log_statistics(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+
+        LOG.debug("Source cache: %d lookups, %.1f%% hit rate, %d files "
+                  "read, %d evicted." %
+                  (lookups, 100.0 * self.hits / lookups, self.misses,
+                   self.evictions))
+
+
+# The source cache shared by the report processing in this process.
+shared_cache = SourceCache()
+
+
+def read_line(path, line_no):
+    """
+    Return the given line of the file from the shared source cache, see
+    SourceCache.read_line().
+    """
+    return shared_cache.read_line(path, line_no)
+
+
+def get_line(path, line_no):
+    """
+    Return the given line of the file from the shared source cache, see
+    SourceCache.get_line().
+    """
+    return shared_cache.get_line(path, line_no)
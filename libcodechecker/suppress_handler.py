@@ -8,7 +8,8 @@ Suppress handling.
 """
 
 import abc
-import linecache
+import hashlib
+import itertools
 import os
 import re
 
@@ -59,122 +60,181 @@ class SuppressHandler(object):
         pass
 
 
+# Marker of the source code suppression comments.
+SUPPRESS_MARKER = 'codechecker_suppress'
+
+SUPPRESS_RE = re.compile(r'^\s*codechecker_suppress'
+                         r'\s*\[\s*(?P<checkers>(.*))\s*\]\s*'
+                         r'(?P<comment>.*)$')
+
+
+def _parse_suppression(source_section):
+    """
+    Return the suppressed checkers and the comment of a suppression comment,
+    or None if it doesn't match the required format.
+
+    Accepted source suppress format only above the bug line no
+    empty lines are accepted between the comment and the bug line.
+
+    For suppressing all checker results:
+    // codechecker_suppress [all] some multi line
+    // comment
+
+    For suppressing some specific checker results:
+    // codechecker_suppress [checker.name1, checker.name2] some
+    // multi line comment
+    """
+    nocomment = source_section.replace('//', '')
+    # Remove extra spaces if any.
+    formatted = ' '.join(nocomment.split())
+
+    res = SUPPRESS_RE.match(formatted)
+    if not res:
+        return None
+
+    checkers = res.group('checkers')
+    if checkers == "all":
+        suppressed_checkers = frozenset(['all'])
+    else:
+        suppressed_checkers = frozenset(re.findall(r"[^,\s]+",
+                                                   checkers.strip()))
+
+    comment = res.group('comment')
+    if comment == '':
+        comment = "WARNING! suppress comment is missing"
+
+    return suppressed_checkers, comment
+
+
+def build_suppress_index(lines):
+    """
+    Return the source code suppressions of a source file given by its lines
+    in one pass. The result maps the number (starting from 1) of every
+    suppressed line to the (suppressed checkers, comment) pair of the
+    suppression.
+
+    A line is suppressed by the comment lines right above it, from the
+    nearest line with the suppress marker.
+    """
+    index = {}
+
+    # The comment lines from the last suppress marker, if the previous
+    # lines are such comment lines.
+    section = None
+    # The line after the last one can be suppressed too.
+    for line_no, line in enumerate(itertools.chain(lines, ['']), 1):
+        if section:
+            suppression = _parse_suppression(''.join(section))
+            if suppression:
+                index[line_no] = suppression
+
+        line = line.strip()
+        if not line.startswith('//'):
+            section = None
+        elif SUPPRESS_MARKER in line:
+            section = [line]
+        elif section is not None:
+            section.append(line)
+
+    return index
+
+
+class SuppressIndexCache(object):
+    """
+    Cache of the source code suppression indexes of the source files. The
+    indexes are cached by the content hash of the files, so every file
+    content is scanned once however many reports it has.
+    """
+
+    def __init__(self):
+        self.__indexes = {}
+        # The content hash of the files by path, with the size and the
+        # modification time of the file when it was hashed.
+        self.__file_hashes = {}
+
+    def get(self, content_hash, read_content):
+        """
+        Return the suppression index of the content with the given hash.
+        The content is read by read_content() if it was not indexed yet.
+        """
+        index = self.__indexes.get(content_hash)
+        if index is None:
+            index = build_suppress_index(read_content().split('\n'))
+            self.__indexes[content_hash] = index
+        return index
+
+    def get_file_index(self, source_file):
+        """
+        Return the suppression index of the source file, an empty index if
+        the file can not be read.
+        """
+        try:
+            stat = os.stat(source_file)
+            cached = self.__file_hashes.get(source_file)
+            if cached and cached[:2] == (stat.st_size, stat.st_mtime):
+                return self.__indexes[cached[2]]
+
+            with open(source_file, 'rb') as source:
+                content = source.read()
+        except (IOError, OSError) as ex:
+            LOG.debug("Failed to read source file '" + source_file + "': " +
+                      str(ex))
+            return {}
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        self.__file_hashes[source_file] = \
+            (stat.st_size, stat.st_mtime, content_hash)
+        return self.get(content_hash, lambda: content)
+
+
+# The suppression indexes of the source files shared by the report
+# processing in this process.
+shared_index_cache = SuppressIndexCache()
+
+
 class SourceSuppressHandler(object):
     """
     Handle report suppression in the source.
     """
 
-    suppress_marker = 'codechecker_suppress'
+    suppress_marker = SUPPRESS_MARKER
 
-    def __init__(self, source_file, report_line, report_hash, checker_name):
+    def __init__(self, source_file, report_line, report_hash, checker_name,
+                 suppress_index=None):
         """
         Source line number indexing starts at 1.
+
+        The suppress_index of the source file is taken from the shared
+        index cache if it is not given, see build_suppress_index().
         """
 
         self.__source_file = source_file
         self.__bug_line = report_line
         self.__hash_value = report_hash
         self.__checker_name = checker_name
+        self.__suppress_index = suppress_index
         self.__suppressed_checkers = set()
         self.__suppress_comment = None
 
-    def __check_if_comment(self, line):
-        """
-        Check if the line is a comment.
-        Accepted comment format is only if line starts with '//'.
-        """
-        return line.strip().startswith('//')
-
-    def __process_suppress_info(self, source_section):
-        """
-        Return true if suppress comment found and matches the required format.
-
-        Accepted source suppress format only above the bug line no
-        empty lines are accepted between the comment and the bug line.
-
-        For suppressing all checker results:
-        // codechecker_suppress [all] some multi line
-        // comment
-
-        For suppressing some specific checker results:
-        // codechecker_suppress [checker.name1, checker.name2] some
-        // multi line comment
-        """
-        nocomment = source_section.replace('//', '')
-        # Remove extra spaces if any.
-        formatted = ' '.join(nocomment.split())
-
-        # Check for codechecker suppress comment.
-        pattern = r'^\s*codechecker_suppress' \
-            r'\s*\[\s*(?P<checkers>(.*))\s*\]\s*(?P<comment>.*)$'
-
-        ptn = re.compile(pattern)
-
-        res = re.match(ptn, formatted)
-
-        if res:
-            checkers = res.group('checkers')
-            if checkers == "all":
-                self.__suppressed_checkers.add('all')
-            else:
-                suppress_checker_list = re.findall(r"[^,\s]+",
-                                                   checkers.strip())
-                self.__suppressed_checkers.update(suppress_checker_list)
-            comment = res.group('comment')
-            if comment == '':
-                self.__suppress_comment = \
-                    "WARNING! suppress comment is missing"
-            else:
-                self.__suppress_comment = res.group('comment')
-            return True
-        else:
-            return False
-
     def check_source_suppress(self):
         """
         Return true if there is a suppress comment or false if not.
         """
-
-        source_file = self.__source_file
         LOG.debug('Checking for suppress comment in the source file: ' +
                   self.__source_file)
-        previous_line_num = self.__bug_line - 1
-        suppression_result = False
-        if previous_line_num > 0:
-
-            marker_found = False
-            comment_line = True
-
-            collected_lines = []
-
-            while not marker_found and comment_line:
-                source_line = linecache.getline(source_file, previous_line_num)
-                if self.__check_if_comment(source_line):
-                    # It is a comment.
-                    if self.suppress_marker in source_line:
-                        # Found the marker.
-                        collected_lines.append(source_line.strip())
-                        marker_found = True
-                        break
-                    else:
-                        collected_lines.append(source_line.strip())
-                        comment_line = True
-                else:
-                    # This is not a comment.
-                    break
-
-                if previous_line_num > 0:
-                    previous_line_num -= 1
-                else:
-                    break
-
-            # Collected comment lines upward from bug line.
-            rev = list(reversed(collected_lines))
-            if marker_found:
-                suppression_result = self.__process_suppress_info(''.join(rev))
-
-        LOG.debug('Suppress comment found: ' + str(suppression_result))
-        return suppression_result
+
+        suppress_index = self.__suppress_index
+        if suppress_index is None:
+            suppress_index = \
+                shared_index_cache.get_file_index(self.__source_file)
+
+        suppression = suppress_index.get(self.__bug_line)
+        if suppression:
+            checkers, self.__suppress_comment = suppression
+            self.__suppressed_checkers = set(checkers)
+
+        LOG.debug('Suppress comment found: ' + str(suppression is not None))
+        return suppression is not None
 
     def suppressed_checkers(self):
         """
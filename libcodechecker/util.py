@@ -14,8 +14,6 @@ import re
 import socket
 import subprocess
 
-import psutil
-
 from libcodechecker.logger import LoggerFactory
 
 # WARNING! LOG should be only used in this module.
@@ -151,6 +149,8 @@ def call_command(command, env=None, cwd=None):
 
 
 def kill_process_tree(parent_pid):
+    import psutil
+
     proc = psutil.Process(parent_pid)
     children = proc.children()
 
@@ -355,21 +355,3 @@ def escape_like(string, escape_char='*'):
     return string.replace(escape_char, escape_char * 2) \
                  .replace('%', escape_char + '%') \
                  .replace('_', escape_char + '_')
-
-
-def get_line(file_name, line_no):
-    """
-    Return the given line from the file. If line_no is larger than the number
-    of lines in the file then empty string returns.
-    If the file can't be opened for read, the function also returns empty
-    string.
-    """
-    try:
-        with open(file_name) as f:
-            for line in f:
-                line_no -= 1
-                if line_no == 0:
-                    return line
-            return ''
-    except IOError:
-        return ''
@@ -0,0 +1,104 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the orchestration overhead of the analysis per build action.
+
+The analysis is executed with a no-op analyzer binary ('true'), so the
+measured time is spent in CodeChecker: distributing the build actions to the
+workers, building the analyzer commands and collecting the results.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.analyze.analyzers import analyzer_types
+from libcodechecker.analyze.analyzers.config_handler_clangsa import \
+    ClangSAConfigHandler
+from libcodechecker.log.build_action import BuildAction
+
+
+class NoopContext(object):
+    """ The part of the analysis context used by the analysis workers. """
+    path_env_extra = []
+    ld_lib_path_extra = []
+    severity_map = {}
+
+
+def create_actions(source_dir, action_num):
+    actions = []
+    for i in range(action_num):
+        source = os.path.join(source_dir, 'source_%d.c' % i)
+        with open(source, 'w') as src:
+            src.write('int f%d() { return %d; }\n' % (i, i))
+
+        action = BuildAction(i)
+        action.analyzer_type = analyzer_types.CLANG_SA
+        action.original_command = 'gcc -c ' + source
+        action.directory = source_dir
+        action.lang = 'c'
+        action.analyzer_options = ['-DNUM=%d' % i]
+        action.sources = source
+        actions.append(action)
+
+    return actions
+
+
+def create_config(plugin_dir, checker_num):
+    config = ClangSAConfigHandler()
+    config.analyzer_binary = 'true'
+    config.analyzer_plugins_dir = plugin_dir
+    for i in range(checker_num):
+        config.add_checker('checker.group%d.Checker%d' % (i % 10, i),
+                           i % 2 == 0, 'Dummy checker.')
+
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the orchestration overhead of the analysis "
+                    "with a no-op analyzer.")
+    parser.add_argument('-n', '--actions', type=int, default=2000,
+                        help="Number of build actions.")
+    parser.add_argument('-c', '--checkers', type=int, default=300,
+                        help="Number of configured checkers.")
+    parser.add_argument('-j', '--jobs', type=int, default=4,
+                        help="Number of analysis workers.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        source_dir = os.path.join(workdir, 'sources')
+        output_dir = os.path.join(workdir, 'reports')
+        os.makedirs(source_dir)
+        plugin_dir = os.path.join(workdir, 'plugins')
+        os.makedirs(output_dir)
+        os.makedirs(plugin_dir)
+
+        actions = create_actions(source_dir, args.actions)
+        config_map = {analyzer_types.CLANG_SA: create_config(plugin_dir,
+                                                             args.checkers)}
+        metadata = {'result_source_files': {}}
+
+        start = time.time()
+        analysis_manager.start_workers(actions, NoopContext(), config_map,
+                                       args.jobs, output_dir, None,
+                                       metadata, True, False)
+        duration = time.time() - start
+
+        print("%d actions, %d jobs: %.3f sec, %.3f ms/action" %
+              (args.actions, args.jobs, duration,
+               duration * 1000 / args.actions))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the time and the memory usage of merging the CTU function maps.
+
+Synthetic sorted function maps are generated like the collect phase of the
+CTU analysis does, then they are merged into the global function map.
+"""
+
+import argparse
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+
+from libcodechecker.analyze import ctu_manager
+
+FNMAP_FOLDER = 'tmpExternalFnMaps'
+FNMAP_FILE = 'externalFnMap.txt'
+
+
+def generate_maps(fnmap_dir, entries, files, conflict_ratio):
+    """
+    Generate function map files with the given number of entries in total.
+    A conflict_ratio part of the functions are defined in two files.
+    """
+    os.makedirs(fnmap_dir)
+    per_file = entries // files
+    for file_idx in range(files):
+        lines = []
+        for i in range(per_file):
+            function = file_idx * per_file + i
+            if random.random() < conflict_ratio:
+                # Same name as a function of another file.
+                function = random.randrange(entries)
+            lines.append('_Z%dfunction%dv ast/src/file%d.cpp.ast' %
+                         (len(str(function)) + 8, function, file_idx))
+
+        with open(os.path.join(fnmap_dir, str(file_idx)), 'w') as fnmap:
+            fnmap.write('\n'.join(sorted(lines)) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure merging the CTU function maps.")
+    parser.add_argument('-n', '--entries', type=int, default=10000000,
+                        help="Number of function map entries in total.")
+    parser.add_argument('-f', '--files', type=int, default=5000,
+                        help="Number of function map files (translation "
+                             "units).")
+    parser.add_argument('-c', '--conflicts', type=float, default=0.01,
+                        help="Ratio of the conflicting function names.")
+    args = parser.parse_args()
+
+    ctu_dir = tempfile.mkdtemp()
+    try:
+        fnmap_dir = os.path.join(ctu_dir, 'x86_64', FNMAP_FOLDER)
+
+        start = time.time()
+        generate_maps(fnmap_dir, args.entries, args.files, args.conflicts)
+        print("Generated %d entries in %d files: %.2f sec" %
+              (args.entries, args.files, time.time() - start))
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.time()
+        ctu_manager.merge_ctu_func_maps(ctu_dir, FNMAP_FILE, FNMAP_FOLDER)
+        duration = time.time() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        with open(os.path.join(ctu_dir, 'x86_64', FNMAP_FILE)) as fnmap:
+            kept = sum(1 for _ in fnmap)
+
+        print("Merged: %.2f sec, %d entries kept, peak RSS %d KiB "
+              "(%d KiB before the merge)" %
+              (duration, kept, rss_after, rss_before))
+    finally:
+        shutil.rmtree(ctu_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the parsing of the compiler options of the compilation commands.
+
+The commands of the unit test build logs and of a synthetic build log are
+parsed. The synthetic commands are generated from a set of typical options,
+some of them are repeated like in generated builds.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import time
+
+from libcodechecker.log import option_parser
+
+OPTIONS = ['-O2', '-Os', '-g', '-ggdb3', '-fPIC', '-fno-strict-aliasing',
+           '-Wall', '-Wextra', '-Wno-unused-parameter', '-std=c++11',
+           '-m64', '-pthread', '-MD', '-MF deps.d', '-MT target.o',
+           '-isystem /usr/include/qt', '-include config.h', '-Iinclude',
+           '-I /opt/include', '-DNDEBUG', '-DVERSION=\\"1.0\\"',
+           '-fcall-saved-r9', '-mthumb-interwork', '--param ssp-buffer-size=4',
+           '-Xlinker --as-needed', '-L/usr/lib', '-lpthread']
+
+
+def unit_test_commands():
+    log_dir = os.path.join(os.path.dirname(__file__), os.pardir, 'unit',
+                           'logparser_test_files')
+    commands = []
+    for log_file in sorted(glob.glob(os.path.join(log_dir, '*.json'))):
+        with open(log_file) as log:
+            for entry in json.load(log):
+                if 'command' in entry:
+                    commands.append(entry['command'])
+                else:
+                    commands.append(' '.join(entry['arguments']))
+
+    return commands
+
+
+def synthetic_commands(command_num, duplicates):
+    rand = random.Random(0)
+    commands = []
+    for i in range(command_num):
+        if commands and rand.random() < duplicates:
+            commands.append(rand.choice(commands))
+            continue
+
+        options = rand.sample(OPTIONS, 12)
+        options.append('-DFILE_ID=%d' % i)
+        commands.append('g++ ' + ' '.join(options) +
+                        ' -c src/file_%d.cpp -o obj/file_%d.o' % (i, i))
+
+    return commands
+
+
+def measure(name, commands):
+    option_parser.classified_args.clear()
+    option_parser.parsed_commands.clear()
+
+    start = time.time()
+    for command in commands:
+        option_parser.parse_options(command)
+    duration = time.time() - start
+
+    print("%s: %d commands, %.3f sec, %.3f us/command" %
+          (name, len(commands), duration,
+           duration * 1000000 / max(len(commands), 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the parsing of the compiler options.")
+    parser.add_argument('-n', '--commands', type=int, default=500000,
+                        help="Number of synthetic compilation commands.")
+    parser.add_argument('-d', '--duplicates', type=float, default=0.2,
+                        help="Ratio of the repeated synthetic commands.")
+    parser.add_argument('-r', '--repeat', type=int, default=1000,
+                        help="Number of times the unit test logs are "
+                             "parsed.")
+    args = parser.parse_args()
+
+    measure('unit test logs', unit_test_commands() * args.repeat)
+    measure('synthetic log', synthetic_commands(args.commands,
+                                                args.duplicates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the parsing of the plist files with the available plist readers.
+
+The plist files of the unit tests are scaled up by repeating their
+diagnostics, then every file is parsed into reports with every reader.
+The reports are checked to be the same for all readers.
+"""
+
+import argparse
+import os
+import plistlib
+import shutil
+import tempfile
+import time
+
+from libcodechecker.analyze import plist_parser
+
+
+def scaled_plists(output_dir, scale):
+    plist_dir = os.path.join(os.path.dirname(__file__), os.pardir, 'unit',
+                             'plist_test_files')
+    plists = []
+    for name in sorted(os.listdir(plist_dir)):
+        if not name.endswith('.plist'):
+            continue
+
+        plist = plistlib.readPlist(os.path.join(plist_dir, name))
+        plist['diagnostics'] = plist['diagnostics'] * scale
+
+        path = os.path.join(output_dir, name)
+        plistlib.writePlist(plist, path)
+        plists.append(path)
+
+    return plists
+
+
+def measure(name, reader, plists, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        results = [plist_parser.parse_plist(plist, reader)
+                   for plist in plists]
+    duration = time.time() - start
+
+    size = sum(os.path.getsize(plist) for plist in plists) * repeat
+    print("%s: %.3f sec, %.1f MB/sec" %
+          (name, duration, size / duration / 1024 / 1024))
+
+    return [(files, [(report.main, report.bug_path) for report in reports])
+            for files, reports in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the parsing of the plist files.")
+    parser.add_argument('-s', '--scale', type=int, default=1000,
+                        help="Number of times the diagnostics of the test "
+                             "plist files are repeated.")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help="Number of times the plist files are parsed.")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        plists = scaled_plists(output_dir, args.scale)
+
+        expected = None
+        for name in sorted(plist_parser.PLIST_READERS):
+            reports = measure(name, plist_parser.PLIST_READERS[name],
+                              plists, args.repeat)
+            if expected is None:
+                expected = reports
+            elif reports != expected:
+                print("%s: the reports are different!" % name)
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the deduplication of the reports in the headers before storing them.
+
+A result directory is generated in which every translation unit has its own
+reports and the same reports in a header included by all of them, then the
+ZIP of the results is assembled with and without leaving out the duplicates.
+
+The store command imports the generated Thrift API, run it with the package
+built by 'make package'.
+"""
+
+import argparse
+import copy
+import os
+import plistlib
+import shutil
+import tempfile
+import time
+
+from libcodechecker.libhandlers import store
+from libcodechecker.report import ReportDeduplicator
+
+
+class NoDeduplicator(ReportDeduplicator):
+    def is_duplicate(self, key):
+        return False
+
+
+class Client(object):
+    def getMissingContentHashes(self, hashes):
+        return hashes
+
+
+def header_diagnostic(diagnostic, line):
+    """
+    Copy of the diagnostic with its bug path moved to the header.
+    """
+    diagnostic = copy.deepcopy(diagnostic)
+
+    def move(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                move(item)
+            if isinstance(value.get('file'), int):
+                value['file'] = 1
+                value['line'] = line
+        elif isinstance(value, list):
+            for item in value:
+                move(item)
+
+    move(diagnostic)
+    diagnostic['issue_hash_content_of_line_in_context'] = 'header%d' % line
+    return diagnostic
+
+
+def generate_results(output_dir, tus, header_reports):
+    test_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, 'unit', 'plist_test_files')
+    plist = plistlib.readPlist(os.path.join(test_dir, 'clang-4.0.plist'))
+    diagnostics = plist['diagnostics']
+
+    header = os.path.join(output_dir, 'test.h')
+    with open(header, 'w') as source:
+        source.write('int f();\n' * header_reports)
+
+    headers = [header_diagnostic(diagnostics[1], line)
+               for line in range(1, header_reports + 1)]
+
+    result_dir = os.path.join(output_dir, 'reports')
+    os.mkdir(result_dir)
+    for i in range(tus):
+        source_file = os.path.join(output_dir, 'tu%d.cpp' % i)
+        with open(source_file, 'w') as source:
+            source.write('#include "test.h"\n// %d\n' % i)
+
+        plist['files'] = [source_file, header]
+        plist['diagnostics'] = diagnostics + headers
+        plistlib.writePlist(plist, os.path.join(result_dir,
+                                                'tu%d.plist' % i))
+
+    return result_dir
+
+
+def measure(name, result_dir, zip_file, deduplicator):
+    store.ReportDeduplicator = deduplicator
+    if os.path.exists(zip_file):
+        os.remove(zip_file)
+
+    start = time.time()
+    store.assemble_zip([result_dir], zip_file, Client())
+    duration = time.time() - start
+
+    print("%s: %.3f sec, %d KB ZIP" %
+          (name, duration, os.path.getsize(zip_file) / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the deduplication of the header reports.")
+    parser.add_argument('-t', '--tus', type=int, default=1000,
+                        help="Number of translation units.")
+    parser.add_argument('-r', '--header-reports', type=int, default=10,
+                        help="Number of reports in the common header.")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        result_dir = generate_results(output_dir, args.tus,
+                                      args.header_reports)
+        zip_file = os.path.join(output_dir, 'reports.zip')
+
+        measure('all reports', result_dir, zip_file, NoDeduplicator)
+        measure('deduplicated', result_dir, zip_file, ReportDeduplicator)
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
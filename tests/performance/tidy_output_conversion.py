@@ -0,0 +1,100 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Measure the conversion of the clang-tidy output to plist.
+
+The clang-tidy outputs of the unit tests are scaled up by repeating them for
+copies of their source files, then the output file is converted by writing
+the diagnostics while the output is read, and by parsing the whole output
+before writing the plist. The plists are checked to be the same.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from libcodechecker.analyze import tidy_output_converter
+from libcodechecker.analyze.analyzers.result_handler_clang_tidy import \
+    generate_plist_from_tidy_result
+
+
+def scaled_tidy_output(output_dir, scale):
+    test_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, 'unit', 'tidy_output_test_files')
+    outputs = []
+    for name in ['tidy1.out', 'tidy2.out', 'tidy3.out']:
+        with open(os.path.join(test_dir, name)) as tidy_out:
+            outputs.append(tidy_out.read())
+
+    path = os.path.join(output_dir, 'tidy.out')
+    with open(path, 'w') as tidy_out:
+        for i in range(scale):
+            source_dir = os.path.join(output_dir, 'dir%d' % i)
+            shutil.copytree(os.path.join(test_dir, 'files'), source_dir)
+            for output in outputs:
+                tidy_out.write(output.replace('files/', source_dir + '/'))
+
+    return path
+
+
+def convert_streaming(tidy_out, plist):
+    with open(tidy_out) as lines:
+        generate_plist_from_tidy_result(plist, lines)
+
+
+def convert_whole(tidy_out, plist):
+    with open(tidy_out) as lines:
+        messages = tidy_output_converter.OutputParser().parse_messages(
+            lines.read().splitlines())
+    converter = tidy_output_converter.PListConverter()
+    converter.add_messages(messages)
+    converter.write_to_file(plist)
+
+
+def measure(name, convert, tidy_out, plist):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    convert(tidy_out, plist)
+    duration = time.time() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    size = os.path.getsize(tidy_out)
+    print("%s: %.3f sec, %.1f MB/sec, peak RSS grew by %d KB" %
+          (name, duration, size / duration / 1024 / 1024,
+           rss_after - rss_before))
+
+    with open(plist) as result:
+        return result.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the conversion of the clang-tidy output.")
+    parser.add_argument('-s', '--scale', type=int, default=2000,
+                        help="Number of times the test clang-tidy outputs "
+                             "are repeated.")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        tidy_out = scaled_tidy_output(output_dir, args.scale)
+        plist = os.path.join(output_dir, 'tidy.plist')
+
+        # The peak memory usage only grows, the streaming conversion is
+        # measured first.
+        streamed = measure('streaming', convert_streaming, tidy_out, plist)
+        whole = measure('whole output', convert_whole, tidy_out, plist)
+        if streamed != whole:
+            print("The plists are different!")
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the longest first scheduling of the build actions. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import analysis_history
+from libcodechecker.log.build_action import BuildAction
+
+
+class AnalysisHistoryTest(unittest.TestCase):
+    """
+    Test ordering the build actions by their estimated analysis time.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __action(self, name, size):
+        source = os.path.join(self.__workdir, name)
+        with open(source, 'w') as src:
+            src.write('x' * size)
+
+        action = BuildAction()
+        action.analyzer_type = 'clangsa'
+        action.sources = source
+        return action
+
+    def __names(self, actions):
+        return [os.path.basename(next(action.sources))
+                for action in actions]
+
+    def test_size_fallback(self):
+        """ Without history the largest sources are started first. """
+        actions = [self.__action('small.c', 10),
+                   self.__action('large.c', 1000),
+                   self.__action('medium.c', 100)]
+
+        ordered, predicted = analysis_history.schedule(actions, {}, 2)
+        self.assertEqual(self.__names(ordered),
+                         ['large.c', 'medium.c', 'small.c'])
+        self.assertIsNone(predicted)
+
+    def test_history_order(self):
+        """ Recorded durations take precedence over the source size. """
+        actions = [self.__action('a.c', 1000),
+                   self.__action('b.c', 1000),
+                   self.__action('c.c', 10)]
+
+        history = {}
+        for name, duration in [('a.c', 1.0), ('b.c', 3.0), ('c.c', 8.0)]:
+            history[analysis_history.history_key(
+                os.path.join(self.__workdir, name), 'clangsa')] = duration
+
+        ordered, predicted = analysis_history.schedule(actions, history, 2)
+        self.assertEqual(self.__names(ordered), ['c.c', 'b.c', 'a.c'])
+        self.assertEqual(predicted, 8.0)
+
+    def test_estimate_unknown(self):
+        """ Unknown sources are estimated from the measured speed. """
+        actions = [self.__action('known.c', 100),
+                   self.__action('new.c', 300)]
+        history = {analysis_history.history_key(
+            os.path.join(self.__workdir, 'known.c'), 'clangsa'): 2.0}
+
+        costs, is_duration = analysis_history.estimate_costs(actions,
+                                                             history)
+        self.assertTrue(is_duration)
+        self.assertAlmostEqual(costs[0], 2.0)
+        self.assertAlmostEqual(costs[1], 6.0)
+
+    def test_predict_makespan(self):
+        """ Jobs are started on the worker which finishes first. """
+        self.assertEqual(
+            analysis_history.predict_makespan([5, 4, 3, 3, 1], 2), 8)
+        self.assertEqual(
+            analysis_history.predict_makespan([5, 4, 3], 1), 12)
+
+    def test_shards_partition(self):
+        """ The shards are disjoint and cover every build action. """
+        actions = [self.__action('s%d.c' % i, (i * 37) % 11 + 1)
+                   for i in range(20)]
+
+        shards = [analysis_history.shard_actions(actions, {}, k, 3)
+                  for k in range(1, 4)]
+        names = sum([self.__names(shard) for shard in shards], [])
+        self.assertEqual(sorted(names), sorted(self.__names(actions)))
+
+        # The order of the compilation database does not matter.
+        reversed_shard = analysis_history.shard_actions(
+            list(reversed(actions)), {}, 2, 3)
+        self.assertEqual(sorted(self.__names(reversed_shard)),
+                         sorted(self.__names(shards[1])))
+
+    def test_shards_balanced(self):
+        """ Shards are balanced by the durations of every analyzer. """
+        actions = [self.__action('a.c', 10),
+                   self.__action('b.c', 10),
+                   self.__action('c.c', 10),
+                   self.__action('d.c', 10)]
+
+        history = {}
+        for name, duration in [('a.c', 6.0), ('b.c', 4.0), ('c.c', 3.0),
+                               ('d.c', 2.0)]:
+            source = os.path.join(self.__workdir, name)
+            history[analysis_history.history_key(source, 'clangsa')] = \
+                duration / 2
+            history[analysis_history.history_key(source, 'clang-tidy')] = \
+                duration / 2
+
+        first = analysis_history.shard_actions(actions, history, 1, 2)
+        second = analysis_history.shard_actions(actions, history, 2, 2)
+        self.assertEqual(sorted(self.__names(first)), ['a.c', 'd.c'])
+        self.assertEqual(sorted(self.__names(second)), ['b.c', 'c.c'])
+
+    def test_parse_shard(self):
+        """ Shards are given as K/N, numbered from 1. """
+        self.assertEqual(analysis_history.parse_shard('2/4'), (2, 4))
+        for shard in ['0/4', '5/4', '1', 'a/b', '1/0']:
+            self.assertRaises(ValueError, analysis_history.parse_shard, shard)
+
+    def test_estimate_memory(self):
+        """ Unknown sources are estimated by the average recorded peak. """
+        actions = [self.__action('known.c', 10),
+                   self.__action('other.c', 10),
+                   self.__action('new.c', 10)]
+        memory_history = {}
+        for name, peak in [('known.c', 100), ('other.c', 300)]:
+            memory_history[analysis_history.history_key(
+                os.path.join(self.__workdir, name), 'clangsa')] = peak
+
+        self.assertEqual(analysis_history.estimate_memory(actions,
+                                                          memory_history),
+                         [100, 300, 200])
+        self.assertEqual(analysis_history.estimate_memory(actions[:1], {}),
+                         [analysis_history.DEFAULT_MEMORY_ESTIMATE])
@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the persistent store of the CTU AST dumps. """
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from libcodechecker.analyze.ctu_ast_store import CTUASTStore
+
+
+class CTUASTStoreTest(unittest.TestCase):
+    """
+    Test storing, reusing and evicting AST dumps.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__store = CTUASTStore(os.path.join(self.__workdir, 'store'),
+                                   'clang version 6.0', 'clang-func-mapping')
+
+        self.__source = os.path.join(self.__workdir, 'main.cpp')
+        with open(self.__source, 'w') as source:
+            source.write('int f() { return 0; }\n')
+
+        self.__ast = os.path.join(self.__workdir, 'main.cpp.ast')
+        with open(self.__ast, 'w') as ast:
+            ast.write('AST')
+
+        self.__key = self.__store.key(['clang', '-c', self.__source],
+                                      self.__workdir, 'x86_64')
+        self.__func_map = ['_Z1fv ast/main.cpp.ast']
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __store_ast(self, key=None):
+        return self.__store.store(key or self.__key, self.__ast,
+                                  self.__func_map, self.__workdir,
+                                  ['main.cpp'])
+
+    def test_reuse(self):
+        """ The AST of an unchanged translation unit is reused. """
+        self.assertTrue(self.__store_ast())
+
+        target = os.path.join(self.__workdir, 'ctu-dir', 'ast', 'main.ast')
+        self.assertEqual(self.__store.restore(self.__key, target),
+                         self.__func_map)
+        with open(target) as ast:
+            self.assertEqual(ast.read(), 'AST')
+
+    def test_changed_dependency(self):
+        """ The AST is not reused if a dependency changed. """
+        self.assertTrue(self.__store_ast())
+
+        with open(self.__source, 'a') as source:
+            source.write('int g() { return 1; }\n')
+
+        target = os.path.join(self.__workdir, 'main.ast')
+        self.assertIsNone(self.__store.restore(self.__key, target))
+        self.assertFalse(os.path.exists(target))
+
+    def test_key(self):
+        """ The key depends on the compile command and the triple. """
+        other_command = self.__store.key(['clang', '-c', '-DX',
+                                          self.__source],
+                                         self.__workdir, 'x86_64')
+        other_triple = self.__store.key(['clang', '-c', self.__source],
+                                        self.__workdir, 'i386')
+        self.assertNotEqual(self.__key, other_command)
+        self.assertNotEqual(self.__key, other_triple)
+
+    def test_evict_by_age(self):
+        """ Entries not used for a long time are evicted. """
+        self.assertTrue(self.__store_ast())
+        new_key = self.__store.key(['clang', '-c', 'new.cpp'],
+                                   self.__workdir, 'x86_64')
+        self.assertTrue(self.__store_ast(new_key))
+
+        manifest = os.path.join(self.__store.store_dir, self.__key[:2],
+                                self.__key + '.json')
+        old = time.time() - 40 * 24 * 60 * 60
+        os.utime(manifest, (old, old))
+
+        self.__store.evict(1024, 30)
+
+        target = os.path.join(self.__workdir, 'main.ast')
+        self.assertIsNone(self.__store.restore(self.__key, target))
+        self.assertIsNotNone(self.__store.restore(new_key, target))
+
+    def test_evict_by_size(self):
+        """ Every entry is evicted if the store can not hold any. """
+        self.assertTrue(self.__store_ast())
+        self.__store.evict(0, 30)
+
+        target = os.path.join(self.__workdir, 'main.ast')
+        self.assertIsNone(self.__store.restore(self.__key, target))
@@ -0,0 +1,89 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test merging the CTU function maps of the translation units. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import ctu_manager
+
+
+class CTUFunctionMapTest(unittest.TestCase):
+    """
+    Test the merge of the sorted function maps into the global map.
+    """
+
+    def setUp(self):
+        self.__ctu_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__ctu_dir)
+
+    def __write_map(self, arch, name, lines):
+        fnmap_dir = os.path.join(self.__ctu_dir, arch, 'tmpFnMaps')
+        if not os.path.isdir(fnmap_dir):
+            os.makedirs(fnmap_dir)
+
+        with open(os.path.join(fnmap_dir, name), 'w') as fnmap:
+            fnmap.write('\n'.join(sorted(lines)) + '\n')
+
+    def __read_map(self, arch):
+        with open(os.path.join(self.__ctu_dir, arch, 'fnMap.txt')) as fnmap:
+            return fnmap.read().splitlines()
+
+    def test_conflicting_names(self):
+        """ Conflicting names are left out, duplicates are merged. """
+        self.__write_map('x86_64', 'a', ['_Z1fv ast/a.cpp.ast',
+                                         '_Z1gv ast/a.cpp.ast',
+                                         '_Z4inlv ast/h.cpp.ast'])
+        self.__write_map('x86_64', 'b', ['_Z1gv ast/b.cpp.ast',
+                                         '_Z1fv2 ast/b.cpp.ast',
+                                         '_Z4inlv ast/h.cpp.ast'])
+        self.__write_map('x86_64', 'c', ['_Z1hv ast/c.cpp.ast'])
+
+        ctu_manager.merge_ctu_func_maps(self.__ctu_dir, 'fnMap.txt',
+                                        'tmpFnMaps')
+
+        self.assertEqual(self.__read_map('x86_64'),
+                         ['_Z1fv ast/a.cpp.ast',
+                          '_Z1fv2 ast/b.cpp.ast',
+                          '_Z1hv ast/c.cpp.ast',
+                          '_Z4inlv ast/h.cpp.ast'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.__ctu_dir, 'x86_64', 'tmpFnMaps')))
+
+    def test_multi_pass_merge(self):
+        """ More files than the fan-in are merged in multiple passes. """
+        fnmap_dir = os.path.join(self.__ctu_dir, 'i386', 'tmpFnMaps')
+        for i in range(10):
+            self.__write_map('i386', str(i),
+                             ['_Z1f%dv ast/%d.cpp.ast' % (i, i),
+                              '_Z6commonv ast/%d.cpp.ast' % (i % 2)])
+
+        files = ctu_manager.merge_sorted_func_maps(fnmap_dir, 3)
+        self.assertLessEqual(len(files), 3)
+
+        lines = list(ctu_manager.generate_func_map_lines(files))
+        self.assertEqual(lines, sorted(lines))
+        self.assertEqual(len(lines), 20)
+
+        pairs = list(ctu_manager.create_global_ctu_function_map(lines))
+        self.assertEqual(len(pairs), 10)
+        self.assertNotIn('_Z6commonv', [name for name, _ in pairs])
+
+    def test_parallel_arches(self):
+        """ The maps of the triple arches are merged separately. """
+        self.__write_map('x86_64', 'a', ['_Z1fv ast/a.cpp.ast'])
+        self.__write_map('i386', 'a', ['_Z1fv ast/b.cpp.ast'])
+
+        ctu_manager.merge_ctu_func_maps(self.__ctu_dir, 'fnMap.txt',
+                                        'tmpFnMaps', 2)
+
+        self.assertEqual(self.__read_map('x86_64'), ['_Z1fv ast/a.cpp.ast'])
+        self.assertEqual(self.__read_map('i386'), ['_Z1fv ast/b.cpp.ast'])
@@ -0,0 +1,79 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the caching of the target triple arch of the build actions. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze.analyzers import ctu_triple_arch
+from libcodechecker.analyze.analyzers.config_handler_clangsa import \
+    ClangSAConfigHandler
+from libcodechecker.log.build_action import BuildAction
+
+
+def build_action(options):
+    action = BuildAction()
+    action.analyzer_options = options
+    action.lang = 'c++'
+    return action
+
+
+class TripleArchCacheTest(unittest.TestCase):
+    """
+    Test that the triple arch is probed once per target configuration.
+    """
+
+    def setUp(self):
+        self.__ctu_dir = tempfile.mkdtemp()
+        self.__config = ClangSAConfigHandler()
+        self.__config.analyzer_binary = 'clang'
+        self.__config.ctu_dir = self.__ctu_dir
+        ctu_triple_arch.triple_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.__ctu_dir)
+        ctu_triple_arch.triple_cache.clear()
+
+    def test_target_options(self):
+        """ Only the options selecting the target are kept. """
+        options = ['-DNDEBUG', '-m32', '-I', 'include', '-target', 'arm',
+                   '--target=x86_64', '-arch', 'i386', '-O2', '-mthumb']
+        self.assertEqual(ctu_triple_arch.get_target_options(options),
+                         ['-m32', '-target', 'arm', '--target=x86_64',
+                          '-arch', 'i386', '-mthumb'])
+
+    def test_key(self):
+        """ Non target options do not change the cache key. """
+        key = ctu_triple_arch.triple_cache_key(
+            build_action(['-DA=1', '-Iinc']), self.__config)
+        same_target = ctu_triple_arch.triple_cache_key(
+            build_action(['-DB=2', '-O3']), self.__config)
+        other_target = ctu_triple_arch.triple_cache_key(
+            build_action(['-DA=1', '-m32']), self.__config)
+
+        self.assertEqual(key, same_target)
+        self.assertNotEqual(key, other_target)
+
+    def test_shared_cache(self):
+        """ A triple arch probed by another worker is not probed again. """
+        action = build_action(['-m32'])
+        key = ctu_triple_arch.triple_cache_key(action, self.__config)
+
+        cache_dir = os.path.join(self.__ctu_dir,
+                                 ctu_triple_arch.TRIPLE_CACHE_DIR)
+        os.makedirs(cache_dir)
+        with open(os.path.join(cache_dir, key), 'w') as cache_file:
+            cache_file.write('i386\n')
+
+        probes = ctu_triple_arch.probe_count
+        self.assertEqual(ctu_triple_arch.get_triple_arch(
+            action, 'main.cpp', self.__config, {}), 'i386')
+        self.assertEqual(ctu_triple_arch.get_triple_arch(
+            action, 'other.cpp', self.__config, {}), 'i386')
+        self.assertEqual(ctu_triple_arch.probe_count, probes)
@@ -0,0 +1,209 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the distribution of the analysis to workers. """
+
+import json
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+from multiprocessing import Process
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.analyze import distributed
+from libcodechecker.analyze.analyzers import analyzer_types
+from libcodechecker.analyze.analyzers.config_handler_clangsa import \
+    ClangSAConfigHandler
+from libcodechecker.log.build_action import BuildAction
+
+# Writes the analyzed source file name into the output of the analyzer.
+FAKE_ANALYZER = """#!/bin/sh
+out=""
+while [ $# -gt 0 ]; do
+  if [ "$1" = "-o" ]; then shift; out="$1"; fi
+  src="$1"
+  shift
+done
+echo "<plist>$src</plist>" > "$out"
+"""
+
+
+class FakeContext(object):
+    """ The part of the analysis context used by the analysis workers. """
+    path_env_extra = []
+    ld_lib_path_extra = []
+    severity_map = {}
+
+
+def build_action(source):
+    action = BuildAction()
+    action.analyzer_type = analyzer_types.CLANG_SA
+    action.sources = source
+    return action
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class AnalysisQueueTest(unittest.TestCase):
+    """
+    Test leasing the build actions to the workers.
+    """
+
+    def test_requeue_lost_action(self):
+        """ The action of a lost worker is given to another one. """
+        actions = [build_action('a.c'), build_action('b.c')]
+        queue = distributed.AnalysisQueue(actions, None, lease_timeout=0)
+
+        lost_id, lost = queue.lease()
+        self.assertIs(lost, actions[0])
+
+        # The first lease expired, the lost action is leased again first.
+        new_id, new = queue.lease()
+        self.assertIs(new, actions[0])
+
+        # The first result is used, even from the lost worker.
+        self.assertTrue(queue.complete(lost_id, 'result a', {}))
+        self.assertFalse(queue.complete(new_id, 'late result', {}))
+        self.assertFalse(queue.finished())
+
+        last_id, last = queue.lease()
+        self.assertIs(last, actions[1])
+        self.assertTrue(queue.complete(last_id, 'result b', {}))
+
+        self.assertTrue(queue.finished())
+        self.assertIsNone(queue.lease())
+        self.assertEqual(queue.next_result(0), ('result a', {}))
+        self.assertEqual(queue.next_result(0), ('result b', {}))
+
+    def test_skip_analyzed_lost_action(self):
+        """
+        A lost action which is analyzed by its worker after all is not
+        leased again.
+        """
+        actions = [build_action('a.c'), build_action('b.c')]
+        queue = distributed.AnalysisQueue(actions, None, lease_timeout=0)
+
+        lost_id, _ = queue.lease()
+        queue.requeue_expired()
+        self.assertTrue(queue.complete(lost_id, 'result a', {}))
+        self.assertFalse(queue.complete(lost_id, 'result a', {}))
+
+        last_id, last = queue.lease()
+        self.assertIs(last, actions[1])
+        self.assertTrue(queue.complete(last_id, 'result b', {}))
+
+        self.assertTrue(queue.finished())
+        self.assertIsNone(queue.lease())
+
+    def test_wait_for_leased(self):
+        """ Workers wait while every action is leased to someone else. """
+        queue = distributed.AnalysisQueue([build_action('a.c')], None)
+
+        lease_id, _ = queue.lease()
+        self.assertEqual(queue.lease(), distributed.WAIT)
+        self.assertTrue(queue.heartbeat(lease_id))
+
+        queue.complete(lease_id, 'result', {})
+        self.assertIsNone(queue.lease())
+
+
+class DistributedAnalysisTest(unittest.TestCase):
+    """
+    Test that a distributed analysis creates the same output as a local one.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+
+        analyzer = os.path.join(self.__workdir, 'fake_analyzer')
+        with open(analyzer, 'w') as script:
+            script.write(FAKE_ANALYZER)
+        os.chmod(analyzer, stat.S_IRWXU)
+
+        plugin_dir = os.path.join(self.__workdir, 'plugins')
+        os.makedirs(plugin_dir)
+
+        config = ClangSAConfigHandler()
+        config.analyzer_binary = analyzer
+        config.analyzer_plugins_dir = plugin_dir
+        self.__config_map = {analyzer_types.CLANG_SA: config}
+
+        self.__actions = []
+        for i in range(6):
+            source = os.path.join(self.__workdir, 'source_%d.c' % i)
+            with open(source, 'w') as src:
+                src.write('int f() { return %d; }\n' % i)
+
+            action = BuildAction(i)
+            action.analyzer_type = analyzer_types.CLANG_SA
+            action.original_command = 'gcc -c ' + source
+            action.directory = self.__workdir
+            action.lang = 'c'
+            action.sources = source
+            self.__actions.append(action)
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __output(self, output_dir, metadata):
+        files = {}
+        for root, _, names in os.walk(output_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name in ('metadata.json',
+                            'analysis_history.json',
+                            'analysis_memory.json'):
+                    continue
+                with open(path) as out_file:
+                    files[os.path.relpath(path, output_dir)] = out_file.read()
+
+        sources = dict((os.path.relpath(path, output_dir), source)
+                       for path, source
+                       in metadata['result_source_files'].items())
+        usage_files = sorted(os.path.relpath(path, output_dir)
+                             for path in metadata['resource_usage'])
+        return files, sources, dict(metadata['successful']), usage_files
+
+    def test_same_output_as_local(self):
+        """ Two workers on localhost create the same output. """
+        local_dir = os.path.join(self.__workdir, 'local')
+        os.makedirs(local_dir)
+        local_metadata = {'result_source_files': {}}
+        analysis_manager.start_workers(self.__actions, FakeContext(),
+                                       self.__config_map, 2, local_dir,
+                                       None, local_metadata, True, False)
+
+        address = 'localhost:%d' % free_port()
+        auth_key = 'test secret'
+
+        workers = Process(target=distributed.start_workers,
+                          args=(address, auth_key, FakeContext(), 2))
+        workers.start()
+
+        distributed_dir = os.path.join(self.__workdir, 'distributed')
+        os.makedirs(distributed_dir)
+        distributed_metadata = {'result_source_files': {}}
+        distributed.start_coordinator(self.__actions, self.__config_map, 2,
+                                      distributed_dir, None,
+                                      distributed_metadata, True, False,
+                                      None, address, auth_key)
+        workers.join(60)
+        self.assertFalse(workers.is_alive())
+
+        local = self.__output(local_dir, local_metadata)
+        remote = self.__output(distributed_dir, distributed_metadata)
+        self.assertEqual(len(local[0]), 6)
+        self.assertEqual(local, remote)
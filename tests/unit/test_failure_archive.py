@@ -0,0 +1,96 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test collecting the sources of failed analyses into failure archives. """
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.log.build_action import BuildAction
+
+
+class FailureArchiveTest(unittest.TestCase):
+    """
+    Test filling the failure archives created by check() with the source
+    files of the failed analyses.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+
+        self.__header = os.path.join(self.__workdir, 'main.h')
+        with open(self.__header, 'w') as header:
+            header.write('int f();\n' * 100)
+
+        self.__action = BuildAction()
+        self.__action.directory = self.__workdir
+        # Not a known compiler, the dependencies can not be generated.
+        self.__action.original_command = 'unknown-cc -c main.cpp'
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __archive(self, name):
+        zip_path = os.path.join(self.__workdir, name)
+        with zipfile.ZipFile(zip_path, 'w') as archive:
+            archive.writestr('build-action', self.__action.original_command)
+        return zip_path
+
+    def __header_entry(self):
+        return os.path.join('sources-root', self.__header.lstrip('/'))
+
+    def test_collect_sources(self):
+        """ The mentioned files are written into the archive. """
+        zip_path = self.__archive('main.cpp.zip')
+        missing = os.path.join(self.__workdir, 'missing.h')
+
+        analysis_manager.collect_failure_sources(
+            (zip_path, self.__action, [self.__header, missing]))
+
+        with zipfile.ZipFile(zip_path) as archive:
+            self.assertIsNone(archive.testzip())
+            names = archive.namelist()
+            self.assertIn('build-action', names)
+            self.assertIn('no-sources', names)
+            self.assertIn(os.path.join('failed-sources-root',
+                                       missing.lstrip('/')), names)
+            with open(self.__header) as header:
+                self.assertEqual(archive.read(self.__header_entry()),
+                                 header.read())
+
+    def test_same_header_in_archives(self):
+        """ A header is stored completely in every archive. """
+        zip_paths = [self.__archive('a.cpp.zip'), self.__archive('b.cpp.zip')]
+        for zip_path in zip_paths:
+            analysis_manager.collect_failure_sources(
+                (zip_path, self.__action, [self.__header]))
+
+        for zip_path in zip_paths:
+            with zipfile.ZipFile(zip_path) as archive:
+                self.assertIsNone(archive.testzip())
+                self.assertEqual(
+                    archive.getinfo(self.__header_entry()).file_size,
+                    os.path.getsize(self.__header))
+
+    def test_limit(self):
+        """ Archives beyond the limit only get a note. """
+        zip_paths = [self.__archive('a.cpp.zip'), self.__archive('b.cpp.zip')]
+
+        archiver = analysis_manager.FailureArchiver(1, 1)
+        for zip_path in zip_paths:
+            archiver.add((zip_path, self.__action, [self.__header]))
+        archiver.finish()
+
+        with zipfile.ZipFile(zip_paths[0]) as archive:
+            self.assertIn(self.__header_entry(), archive.namelist())
+
+        with zipfile.ZipFile(zip_paths[1]) as archive:
+            self.assertNotIn(self.__header_entry(), archive.namelist())
+            self.assertIn('already filled', archive.read('no-sources'))
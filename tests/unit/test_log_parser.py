@@ -6,8 +6,10 @@
 
 """ Test the log parser which builds build actions from JSON CCDBs. """
 
+import json
 import os
 import unittest
+from StringIO import StringIO
 
 from libcodechecker.analyze import log_parser
 from libcodechecker.log import option_parser
@@ -141,3 +143,40 @@ class LogParserTest(unittest.TestCase):
 
         self.assertEqual(list(build_action.sources)[0], r'/tmp/a b.cpp')
         self.assertEqual(build_action.lang, 'c++')
+
+    def test_json_array_reader(self):
+        """
+        The JSON array is read in chunks, elements may span the chunks.
+        """
+        data = [{'directory': '/tmp', 'file': 'a.cpp', 'arguments': []},
+                12345, "a, b]", [], {}, {'nested': [1, [2, {}]]}]
+        text = ' \n' + json.dumps(data, indent=2) + '\n'
+
+        for read_size in (1, 3, 7, len(text)):
+            self.assertEqual(
+                list(log_parser.iter_json_array(StringIO(text), read_size)),
+                data)
+
+        self.assertEqual(list(log_parser.iter_json_array(StringIO(' [ ] '))),
+                         [])
+
+        for invalid in ('', '{}', '[1, 2', '[1 2]', '[{"a": 1}, {"b"}]'):
+            with self.assertRaises(ValueError):
+                list(log_parser.iter_json_array(StringIO(invalid), 2))
+
+    def test_duplicate_commands(self):
+        """
+        A compilation command is analyzed once even if it was logged
+        multiple times.
+        """
+        entry = {'directory': '/tmp',
+                 'command': 'g++ -DVARIABLE=1 -c /tmp/a.cpp',
+                 'file': '/tmp/a.cpp'}
+        other = dict(entry, command='g++ -DVARIABLE=2 -c /tmp/a.cpp')
+
+        logfile = StringIO(json.dumps([entry, other, entry, other, entry]))
+        actions = log_parser.parse_compile_commands_json(logfile,
+                                                         ParseLogOptions())
+
+        self.assertEqual([action.original_command for action in actions],
+                         [entry['command'], other['command']])
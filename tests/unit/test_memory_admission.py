@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the memory-aware admission of the build actions. """
+
+import threading
+import unittest
+
+from libcodechecker.analyze.memory_admission import MemoryAdmission
+
+
+class MemoryAdmissionTest(unittest.TestCase):
+    """
+    Test starting the build actions only if their memory usage fits.
+    """
+
+    def __admission(self, estimates, jobs, budget, available=10 ** 9):
+        actions = ['action %d' % i for i in range(len(estimates))]
+        admission = MemoryAdmission(actions, estimates, jobs, budget,
+                                    lambda: available)
+        admission.POLL_INTERVAL = 0.01
+        return admission
+
+    def __next_in_thread(self, tasks):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(next(tasks)))
+        thread.daemon = True
+        thread.start()
+        return thread, result
+
+    def test_budget(self):
+        """ Smaller build actions are started while a big one waits. """
+        admission = self.__admission([60, 60, 30], 3, 100)
+        tasks = admission.tasks()
+
+        self.assertEqual(next(tasks), (0, 'action 0'))
+        self.assertEqual(next(tasks), (2, 'action 2'))
+
+        thread, result = self.__next_in_thread(tasks)
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(admission.running, 2)
+
+        admission.release(0)
+        thread.join(5)
+        self.assertEqual(result, [(1, 'action 1')])
+        self.assertEqual(admission.delayed, 1)
+        self.assertEqual(admission.max_running, 2)
+
+    def test_jobs(self):
+        """ At most one build action is started for every job. """
+        admission = self.__admission([1, 1, 1], 2, 100)
+        tasks = admission.tasks()
+        next(tasks)
+        next(tasks)
+
+        thread, result = self.__next_in_thread(tasks)
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(admission.delayed, 0)
+
+        admission.release(1)
+        thread.join(5)
+        self.assertEqual(result, [(2, 'action 2')])
+
+    def test_available_memory(self):
+        """ The build actions wait if the machine runs out of memory. """
+        admission = self.__admission([50, 50], 2, 1000, available=10)
+        tasks = admission.tasks()
+
+        # Something is always analyzed, even if it does not fit.
+        self.assertEqual(next(tasks), (0, 'action 0'))
+
+        thread, result = self.__next_in_thread(tasks)
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+
+        admission.release(0)
+        thread.join(5)
+        self.assertEqual(result, [(1, 'action 1')])
+        self.assertEqual(list(tasks), [])
+
+    def test_stop(self):
+        """ Stopping the admission ends the waiting task generator. """
+        admission = self.__admission([50, 50], 1, 1000)
+        tasks = admission.tasks()
+        next(tasks)
+
+        result = []
+        thread = threading.Thread(target=lambda: result.extend(tasks))
+        thread.start()
+        admission.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(result, [])
@@ -174,3 +174,32 @@ class OptionParserTest(unittest.TestCase):
         self.assertTrue(set(compiler_options) == set(res.compile_opts))
         self.assertTrue(set(linker_options) == set(res.link_opts))
         self.assertEqual(ActionType.LINK, res.action)
+
+    def test_repeated_command(self):
+        """
+        A repeated command gives the same result, which does not share its
+        lists with the earlier results.
+        """
+        build_cmd = "g++ -DVAR=1 -I /inc -L/lib -c main.cpp -o main.o"
+
+        first = option_parser.parse_options(build_cmd)
+        first.compile_opts.append('-DOTHER')
+        second = option_parser.parse_options(build_cmd)
+
+        self.assertEqual(['-DVAR=1', '-I/inc'], second.compile_opts)
+        self.assertEqual(['-L/lib'], second.link_opts)
+        self.assertEqual(['main.cpp'], second.files)
+        self.assertEqual('main.o', second.output)
+        self.assertEqual('c++', second.lang)
+        self.assertEqual(ActionType.COMPILE, second.action)
+
+    def test_quoted_arguments(self):
+        """
+        Quoted arguments are kept together.
+        """
+        res = option_parser.parse_options(
+            "gcc '-DNAME=a b' -I 'my dir' -c 'my file.c'")
+
+        self.assertEqual(['-DNAME=a b', '-Imy dir'], res.compile_opts)
+        self.assertEqual(['my file.c'], res.files)
+        self.assertEqual('c', res.lang)
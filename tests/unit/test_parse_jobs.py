@@ -0,0 +1,117 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test parsing the result files in multiple processes. """
+
+import os
+import plistlib
+import re
+import sys
+import tempfile
+import unittest
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import BytesIO as StringIO
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.libhandlers import parse
+from libcodechecker.report import report_key
+from libcodechecker.report import ReportDeduplicator
+
+
+def swap_file_indexes(value, file_count):
+    """ Reverse the file indexes of the locations in a plist item. """
+    if isinstance(value, dict):
+        for item in value.values():
+            swap_file_indexes(item, file_count)
+        if isinstance(value.get('file'), int):
+            value['file'] = file_count - 1 - value['file']
+    elif isinstance(value, list):
+        for item in value:
+            swap_file_indexes(item, file_count)
+
+
+class Context(object):
+    severity_map = {'core.DivideZero': 'HIGH'}
+
+
+class ParseJobsTest(unittest.TestCase):
+    """
+    Test that the results printed by the parsing processes are the same as
+    the ones printed by a single process.
+    """
+
+    def setUp(self):
+        plist_dir = os.path.join(os.path.dirname(__file__),
+                                 'plist_test_files')
+        self.files = [os.path.join(plist_dir, name)
+                      for name in sorted(os.listdir(plist_dir))]
+
+    def __parse(self, files, jobs, deduplicator=None):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            stats = list(parse.parse_files(files, Context(), {}, None, True,
+                                           jobs, deduplicator))
+            return sys.stdout.getvalue(), stats
+        finally:
+            sys.stdout = stdout
+
+    def test_same_output(self):
+        """ The results are printed in the order of the files. """
+        files = self.files * 3
+
+        output, stats = self.__parse(files, 1)
+        self.assertIn('Found 3 defect(s)', output)
+
+        self.assertEqual(self.__parse(files, 4), (output, stats))
+
+    def test_duplicates(self):
+        """ The reports printed for an earlier file are left out. """
+        output, _ = self.__parse(self.files * 3, 1)
+        report_hashes = re.findall('Report hash: (.*)', output)
+
+        deduplicator = ReportDeduplicator()
+        dedup_output, stats = self.__parse(self.files * 3, 1, deduplicator)
+        dedup_hashes = re.findall('Report hash: (.*)', dedup_output)
+
+        self.assertEqual(sorted(dedup_hashes), sorted(set(report_hashes)))
+        self.assertEqual(deduplicator.duplicates,
+                         len(report_hashes) - len(dedup_hashes))
+
+        deduplicator = ReportDeduplicator()
+        self.assertEqual(self.__parse(self.files * 3, 4, deduplicator),
+                         (dedup_output, stats))
+
+
+class ReportKeyTest(unittest.TestCase):
+    """
+    Test the keys identifying the same report in different plists.
+    """
+
+    def test_file_order(self):
+        """ The key does not depend on the order of the files in a plist. """
+        plist_file = os.path.join(os.path.dirname(__file__),
+                                  'plist_test_files', 'clang-4.0.plist')
+        files, reports = plist_parser.parse_plist(plist_file)
+        keys = [report_key(report, files) for report in reports]
+        self.assertEqual(len(set(keys)), len(reports))
+
+        # Swap the file indexes in the bug paths.
+        plist = plist_parser.read_plist(plist_file)
+        plist['files'].reverse()
+        for diag in plist['diagnostics']:
+            swap_file_indexes(diag, len(files))
+
+        other = tempfile.NamedTemporaryFile(suffix='.plist')
+        plistlib.writePlist(plist, other.name)
+        other_files, other_reports = plist_parser.parse_plist(other.name)
+        other.close()
+
+        self.assertEqual([report_key(report, other_files)
+                          for report in other_reports], keys)
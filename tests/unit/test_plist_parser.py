@@ -24,6 +24,9 @@ With the newer clang releases more information is available in the plist files.
 """
 
 import os
+import plistlib
+import shutil
+import tempfile
 import unittest
 
 from libcodechecker.analyze import plist_parser
@@ -345,3 +348,132 @@ class PlistParserTestCaseNose(unittest.TestCase):
             if checker_name == 'core.StackAddressEscape':
                 self.assertEqual(report.main,
                                  stack_addr_skel_name_hash_after_v40)
+
+
+def typed(value):
+    """
+    Return the value with the type of every nested value, to compare the
+    values read by different plist readers.
+    """
+    if isinstance(value, dict):
+        return dict((typed(k), typed(v)) for k, v in value.items())
+    elif isinstance(value, list):
+        return [typed(v) for v in value]
+    return type(value), value
+
+
+class PlistReaderTest(unittest.TestCase):
+    """
+    Test that the plist readers give the same values as plistlib.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__plist_test_files = os.path.join(os.path.dirname(__file__),
+                                               'plist_test_files')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __assert_same_values(self, path):
+        expected = plistlib.readPlist(path)
+        for name, reader in plist_parser.PLIST_READERS.items():
+            self.assertEqual(typed(reader(path)), typed(expected), name)
+
+            values = reader(path, plist_parser.REPORT_KEYS)
+            for key in plist_parser.REPORT_KEYS:
+                self.assertEqual(typed(values[key]), typed(expected[key]),
+                                 name)
+
+    def test_clang_plists(self):
+        """ The plist files of the analyzers are read the same way. """
+        for plist in os.listdir(self.__plist_test_files):
+            if plist.endswith('.plist'):
+                self.__assert_same_values(
+                    os.path.join(self.__plist_test_files, plist))
+
+    def test_value_types(self):
+        """ Every plist value type and non-ASCII strings. """
+        path = os.path.join(self.__workdir, 'values.plist')
+        plistlib.writePlist({'files': [u'\u00e1rv\u00edz.cpp', 'a.cpp', ''],
+                             'diagnostics': [{'int': 1, 'real': 0.5,
+                                              'true': True, 'false': False,
+                                              'data': plistlib.Data('\0'),
+                                              'nested': [[], {}]}],
+                             'clang_version': 'clang version 5.0.0'},
+                            path)
+
+        self.__assert_same_values(path)
+
+    def test_report_keys(self):
+        """ Only the values needed for the reports are read. """
+        path = os.path.join(self.__plist_test_files, 'clang-5.0-trunk.plist')
+        for name, reader in plist_parser.PLIST_READERS.items():
+            if name == 'plistlib':
+                continue
+            self.assertEqual(set(reader(path, plist_parser.REPORT_KEYS)),
+                             plist_parser.REPORT_KEYS)
+
+    def test_wrong_format(self):
+        """ The plist readers fail with the same errors. """
+        path = os.path.join(self.__workdir, 'wrong.plist')
+        with open(path, 'w') as plist:
+            plist.write('<plist><dict><key>files</key>')
+
+        for reader in plist_parser.PLIST_READERS.values():
+            with self.assertRaises(plist_parser.PLIST_FORMAT_ERRORS):
+                reader(path)
+
+
+class SkipHandler(object):
+    """ Skip the files with the given names. """
+
+    def __init__(self, names):
+        self.__names = names
+
+    def should_skip(self, path):
+        return os.path.basename(path) in self.__names
+
+
+class SkipReportTest(unittest.TestCase):
+    """
+    Test removing the reports in the skipped files from the plists.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__plist = os.path.join(self.__workdir, 'result.plist')
+        shutil.copy(os.path.join(os.path.dirname(__file__),
+                                 'plist_test_files', 'clang-5.0-trunk.plist'),
+                    self.__plist)
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def test_skip_header_reports(self):
+        """ The reports in the skipped header are removed. """
+        original = plistlib.readPlist(self.__plist)
+
+        plist_parser.skip_report_from_plist(self.__plist,
+                                            SkipHandler(['test.h']))
+
+        plist = plistlib.readPlist(self.__plist)
+        self.assertEqual(plist['files'], original['files'])
+        self.assertEqual(plist['diagnostics'],
+                         [diag for diag in original['diagnostics']
+                          if diag['location']['file'] == 0])
+        self.assertLess(len(plist['diagnostics']),
+                        len(original['diagnostics']))
+
+    def test_nothing_skipped(self):
+        """ The plist is not rewritten if no report is removed. """
+        with open(self.__plist) as plist:
+            original = plist.read()
+        os.utime(self.__plist, (0, 0))
+
+        plist_parser.skip_report_from_plist(self.__plist,
+                                            SkipHandler(['other.h']))
+
+        self.assertEqual(os.path.getmtime(self.__plist), 0)
+        with open(self.__plist) as plist:
+            self.assertEqual(plist.read(), original)
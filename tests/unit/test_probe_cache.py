@@ -0,0 +1,253 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test caching the information of the compilers across analyses. """
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from libcodechecker.analyze import host_check
+from libcodechecker.analyze import log_parser
+from libcodechecker.analyze import probe_cache
+from libcodechecker.libhandlers.analyze import ParseLogOptions
+
+FAKE_COMPILER = """#!/bin/sh
+echo "$@" >> {0}
+echo '#include <...> search starts here:' >&2
+echo ' /fake/include' >&2
+echo 'End of search list.' >&2
+echo 'Target: fake-target' >&2
+"""
+
+# A compiler whose output depends on the name it is invoked by.
+NAMED_COMPILER = """#!/bin/sh
+name=`basename $0`
+echo '#include <...> search starts here:' >&2
+echo " /inc/$name" >&2
+echo 'End of search list.' >&2
+echo "Target: target-$name" >&2
+"""
+
+
+class ProbeCacheTest(unittest.TestCase):
+    """
+    Test that the compilers are invoked only for new compiler binaries and
+    options.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__invocations = os.path.join(self.__workdir, 'invocations')
+        self.__compiler = os.path.join(self.__workdir, 'fakecc')
+        self.__write_compiler('')
+
+        self.__options = ParseLogOptions()
+        self.__options.probe_cache_dir = os.path.join(self.__workdir,
+                                                      'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __write_compiler(self, extra):
+        with open(self.__compiler, 'w') as compiler:
+            compiler.write(FAKE_COMPILER.format(self.__invocations) + extra)
+        os.chmod(self.__compiler, stat.S_IRWXU)
+
+    def __parse(self, commands=None):
+        """
+        Parse a compilation database and return the build actions and the
+        compiler invocations.
+        """
+        if commands is None:
+            commands = [self.__compiler + ' -std=c99 -c a.c',
+                        self.__compiler + ' -std=c99 -c b.c',
+                        self.__compiler + ' -std=c11 -c c.c']
+        logfile = StringIO(json.dumps([
+            {'directory': self.__workdir, 'command': command,
+             'file': command.split(' ')[-1]} for command in commands]))
+
+        if os.path.exists(self.__invocations):
+            os.remove(self.__invocations)
+
+        actions = log_parser.parse_compile_commands_json(logfile,
+                                                         self.__options)
+
+        invocations = []
+        if os.path.exists(self.__invocations):
+            with open(self.__invocations) as invocation_file:
+                invocations = invocation_file.read().splitlines()
+
+        return actions, invocations
+
+    def test_cached_probes(self):
+        """
+        The compiler is invoked once for every distinct option set, and not
+        at all in the next analysis.
+        """
+        actions, invocations = self.__parse()
+
+        self.assertEqual(len(actions), 3)
+        for action in actions:
+            self.assertEqual(action.compiler_includes,
+                             ['-isystem /fake/include'])
+            self.assertEqual(action.target, 'fake-target')
+
+        self.assertEqual(sorted(invocations),
+                         ['-std=c11 -E -x c - -v', '-std=c99 -E -x c - -v',
+                          '-v'])
+
+        cached_actions, invocations = self.__parse()
+        self.assertEqual(invocations, [])
+        self.assertEqual([action.compiler_includes
+                          for action in cached_actions],
+                         [action.compiler_includes for action in actions])
+        self.assertEqual([action.target for action in cached_actions],
+                         [action.target for action in actions])
+
+    def test_changed_compiler(self):
+        """ Replacing the compiler binary invalidates its cached output. """
+        self.__parse()
+
+        self.__write_compiler('# A new version.\n')
+        _, invocations = self.__parse()
+        self.assertEqual(len(invocations), 3)
+
+    def test_no_cache_dir(self):
+        """ Without a cache directory the compiler is always invoked. """
+        self.__options.probe_cache_dir = None
+
+        self.__parse()
+        _, invocations = self.__parse()
+        self.assertEqual(len(invocations), 3)
+
+    def test_symlinked_compilers(self):
+        """
+        Compilers which are symlinks to the same binary are probed
+        separately, and all of them are dumped.
+        """
+        binary = os.path.join(self.__workdir, 'namedcc')
+        with open(binary, 'w') as compiler:
+            compiler.write(NAMED_COMPILER)
+        os.chmod(binary, stat.S_IRWXU)
+
+        compilers = []
+        for name in ['ccA', 'ccB']:
+            compilers.append(os.path.join(self.__workdir, name))
+            os.symlink(binary, compilers[-1])
+
+        self.__options.output_path = os.path.join(self.__workdir, 'output')
+        os.mkdir(self.__options.output_path)
+        commands = [compiler + ' -c a.c' for compiler in compilers]
+
+        for _ in range(2):
+            # The second analysis gets the outputs from the cache.
+            actions, _ = self.__parse(commands)
+            self.assertEqual([action.compiler_includes for action in actions],
+                             [['-isystem /inc/ccA'], ['-isystem /inc/ccB']])
+            self.assertEqual([action.target for action in actions],
+                             ['target-ccA', 'target-ccB'])
+
+            for dump_file in [log_parser.compiler_includes_dump_file,
+                              log_parser.compiler_target_dump_file]:
+                with open(os.path.join(self.__options.output_path,
+                                       dump_file)) as dump:
+                    self.assertEqual(sorted(json.load(dump)), compilers)
+
+
+class AnalyzerProbeCacheTest(unittest.TestCase):
+    """
+    Test caching the results of running the analyzer binaries.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__invocations = os.path.join(self.__workdir, 'invocations')
+        self.__analyzer = os.path.join(self.__workdir, 'fake-clang')
+        self.__write_analyzer(0)
+
+        self.__plugin = os.path.join(self.__workdir, 'plugin.so')
+        with open(self.__plugin, 'w') as plugin:
+            plugin.write('plugin')
+
+        self.__cache_dir = probe_cache.analyzer_cache_dir
+        probe_cache.analyzer_cache_dir = os.path.join(self.__workdir, 'cache')
+        probe_cache.analyzer_caches.clear()
+
+    def tearDown(self):
+        probe_cache.analyzer_cache_dir = self.__cache_dir
+        probe_cache.analyzer_caches.clear()
+        shutil.rmtree(self.__workdir)
+
+    def __write_analyzer(self, return_code):
+        with open(self.__analyzer, 'w') as analyzer:
+            analyzer.write('#!/bin/sh\n'
+                           'echo "$@" >> ' + self.__invocations + '\n'
+                           'echo "fake version"\n'
+                           'exit %d\n' % return_code)
+        os.chmod(self.__analyzer, stat.S_IRWXU)
+
+    def __invocation_count(self):
+        if not os.path.exists(self.__invocations):
+            return 0
+        with open(self.__invocations) as invocations:
+            return len(invocations.read().splitlines())
+
+    def __new_process(self):
+        """ Forget the caches loaded in memory, like a new analysis. """
+        probe_cache.analyzer_caches.clear()
+
+    def test_cached_version(self):
+        """ The version is probed once until the binary changes. """
+        self.assertEqual(host_check.get_version(self.__analyzer),
+                         'fake version\n')
+        self.__new_process()
+        self.assertEqual(host_check.get_version(self.__analyzer),
+                         'fake version\n')
+        self.assertEqual(self.__invocation_count(), 1)
+
+        with open(self.__analyzer, 'a') as analyzer:
+            analyzer.write('# A new version.\n')
+        self.__new_process()
+        host_check.get_version(self.__analyzer)
+        self.assertEqual(self.__invocation_count(), 2)
+
+    def test_failure_not_cached(self):
+        """ A failing binary is checked again in the next analysis. """
+        self.__write_analyzer(1)
+        self.assertFalse(host_check.check_clang(self.__analyzer, None))
+        self.assertFalse(host_check.check_clang(self.__analyzer, None))
+        self.assertEqual(self.__invocation_count(), 2)
+
+        self.__write_analyzer(0)
+        self.assertTrue(host_check.check_clang(self.__analyzer, None))
+        self.__new_process()
+        self.assertTrue(host_check.check_clang(self.__analyzer, None))
+        self.assertEqual(self.__invocation_count(), 3)
+
+    def test_changed_plugin(self):
+        """ Changing a loaded file invalidates the cached result. """
+        def probe():
+            return probe_cache.cached_probe(
+                'checkers', [self.__analyzer, '-load', self.__plugin],
+                lambda: 'checkers %d' % self.__invocation_count(),
+                files=[self.__plugin])
+
+        self.assertEqual(probe(), 'checkers 0')
+
+        with open(self.__invocations, 'w') as invocations:
+            invocations.write('one\n')
+        self.__new_process()
+        self.assertEqual(probe(), 'checkers 0')
+
+        with open(self.__plugin, 'a') as plugin:
+            plugin.write('new version')
+        self.__new_process()
+        self.assertEqual(probe(), 'checkers 1')
@@ -0,0 +1,165 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test reading the reports from the report index of the output directory. """
+
+import os
+import plistlib
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_index
+
+
+class ReportIndexTest(unittest.TestCase):
+    """
+    Test that the indexed reports are the same as the parsed ones and that
+    changed plists are parsed again.
+    """
+
+    def setUp(self):
+        self.__output = tempfile.mkdtemp()
+        plist_dir = os.path.join(os.path.dirname(__file__),
+                                 'plist_test_files')
+        self.__plists = []
+        for name in ['clang-3.8-trunk.plist', 'clang-5.0-trunk.plist']:
+            plist = os.path.join(self.__output, name)
+            shutil.copy(os.path.join(plist_dir, name), plist)
+            self.__plists.append(plist)
+
+        self.__parsed = []
+        self.__parse_plist = plist_parser.parse_plist
+        plist_parser.parse_plist = self.__counting_parse_plist
+        report_index.loaded_indexes.clear()
+
+    def tearDown(self):
+        plist_parser.parse_plist = self.__parse_plist
+        report_index.loaded_indexes.clear()
+        shutil.rmtree(self.__output)
+
+    def __counting_parse_plist(self, path, plist_reader=None):
+        self.__parsed.append(os.path.basename(path))
+        return self.__parse_plist(path, plist_reader)
+
+    def __write_index(self):
+        writer = report_index.ReportIndexWriter(self.__output)
+        for plist in self.__plists:
+            entry = report_index.index_entry(plist)
+            if entry:
+                writer.add(entry)
+        writer.close()
+        report_index.loaded_indexes.clear()
+
+    def __assert_same_reports(self, plist):
+        files, reports = report_index.parse_plist(plist)
+        expected_files, expected_reports = self.__parse_plist(plist)
+
+        self.assertEqual(files, expected_files)
+        self.assertEqual([type(f) for f in files],
+                         [type(f) for f in expected_files])
+        self.assertEqual([(r.main, r.bug_path) for r in reports],
+                         [(r.main, r.bug_path) for r in expected_reports])
+        for report, expected in zip(reports, expected_reports):
+            self.assertEqual(type(report.main['description']),
+                             type(expected.main['description']))
+
+    def test_indexed_reports(self):
+        """ The reports are read from the index, not from the plists. """
+        self.__write_index()
+
+        for plist in self.__plists:
+            self.__assert_same_reports(plist)
+        self.assertEqual(self.__parsed, [])
+
+    def test_changed_plist(self):
+        """ A changed plist is parsed instead of using the index. """
+        self.__write_index()
+
+        shutil.copy(self.__plists[0], self.__plists[1])
+        for plist in self.__plists:
+            self.__assert_same_reports(plist)
+        self.assertEqual(self.__parsed, ['clang-5.0-trunk.plist'])
+
+    def test_touched_plist(self):
+        """ Only the content hash is checked if the plist was touched. """
+        self.__write_index()
+
+        for plist in self.__plists:
+            os.utime(plist, (0, 0))
+            self.__assert_same_reports(plist)
+        self.assertEqual(self.__parsed, [])
+
+    def test_non_ascii(self):
+        """ Only the non-ASCII strings are unicode, like in the plists. """
+        plistlib.writePlist(
+            {'files': [u'\u00e1rv\u00edz.cpp', 'main.cpp'],
+             'diagnostics': [{'check_name': 'core.DivideZero',
+                              'description': u'\u00e1rv\u00edz',
+                              'issue_hash_content_of_line_in_context': '1',
+                              'location': {'line': 1, 'col': 1, 'file': 0},
+                              'path': [{'kind': 'event',
+                                        'message': u'\u00e1rv\u00edz'}]}]},
+            self.__plists[0])
+        self.__write_index()
+
+        self.__assert_same_reports(self.__plists[0])
+        self.assertEqual(self.__parsed, [])
+
+    def test_no_index(self):
+        """ Without an index the plists are parsed. """
+        self.__assert_same_reports(self.__plists[0])
+        self.assertEqual(self.__parsed, ['clang-3.8-trunk.plist'])
+
+    def test_compaction(self):
+        """ The entries of the removed and reanalyzed plists are dropped. """
+        self.__write_index()
+        os.remove(self.__plists[0])
+        self.__write_index()
+
+        index_file = os.path.join(self.__output, report_index.INDEX_FILE)
+        with open(index_file) as index:
+            self.assertEqual(len(index.readlines()), 1)
+
+    def test_one_entry_decoded(self):
+        """ Only the entry of the parsed plist is decoded. """
+        self.__write_index()
+
+        # Break the reports of the second plist, the header stays valid.
+        index_file = os.path.join(self.__output, report_index.INDEX_FILE)
+        with open(index_file) as index:
+            lines = index.readlines()
+        with open(index_file, 'w') as index:
+            index.write(lines[0])
+            index.write(lines[1].split('\t')[0] + '\t{"broken\n')
+
+        self.__assert_same_reports(self.__plists[0])
+        self.assertEqual(self.__parsed, [])
+
+        self.__assert_same_reports(self.__plists[1])
+        self.assertEqual(self.__parsed, ['clang-5.0-trunk.plist'])
+
+    def test_offsets(self):
+        """ The offsets are saved and scanned again if out of date. """
+        self.__write_index()
+        offsets_file = os.path.join(self.__output, report_index.OFFSETS_FILE)
+        self.assertTrue(os.path.isfile(offsets_file))
+
+        # An entry appended after the compaction replaces the saved one.
+        writer = report_index.ReportIndexWriter(self.__output)
+        writer.add(report_index.index_entry(self.__plists[1]))
+        writer.flush()
+
+        for plist in self.__plists:
+            self.__assert_same_reports(plist)
+        self.assertEqual(self.__parsed, [])
+
+        report_index.loaded_indexes.clear()
+        os.remove(offsets_file)
+        for plist in self.__plists:
+            self.__assert_same_reports(plist)
+        self.assertEqual(self.__parsed, [])
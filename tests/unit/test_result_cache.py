@@ -0,0 +1,101 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the persistent analysis result cache. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze.result_cache import ResultCache
+from libcodechecker.log.build_action import BuildAction
+
+
+class ResultCacheTest(unittest.TestCase):
+    """
+    Test storing and restoring analysis results keyed by the build action
+    and the content of the dependencies.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__cache_dir = os.path.join(self.__workdir, 'cache')
+
+        self.__source = os.path.join(self.__workdir, 'main.cpp')
+        self.__header = os.path.join(self.__workdir, 'main.h')
+        with open(self.__source, 'w') as source:
+            source.write('#include "main.h"\nint main() { return 0; }\n')
+        with open(self.__header, 'w') as header:
+            header.write('int f();\n')
+
+        self.__action = BuildAction()
+        self.__action.analyzer_type = 'clangsa'
+        self.__action.directory = self.__workdir
+        self.__action.analyzer_options = ['-DVAR=1']
+        self.__action.original_command = 'g++ -DVAR=1 -c ' + self.__source
+        self.__action.sources = self.__source
+
+        self.__result = os.path.join(self.__workdir, 'main.cpp_1.plist')
+        with open(self.__result, 'w') as result:
+            result.write('<plist>result</plist>')
+
+        self.__restored = os.path.join(self.__workdir, 'restored.plist')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __store(self, cache):
+        return cache.store(self.__action, self.__source, self.__result,
+                           ['main.cpp', 'main.h'])
+
+    def test_restore_unchanged(self):
+        """ A stored result is restored if nothing changed. """
+        cache = ResultCache(self.__cache_dir, {'clangsa': 'cfg'})
+        self.assertTrue(self.__store(cache))
+
+        self.assertTrue(cache.restore(self.__action, self.__source,
+                                      self.__restored))
+        with open(self.__restored) as restored:
+            self.assertEqual(restored.read(), '<plist>result</plist>')
+
+    def test_miss_on_changed_header(self):
+        """ Changing an included header invalidates the result. """
+        cache = ResultCache(self.__cache_dir, {'clangsa': 'cfg'})
+        self.assertTrue(self.__store(cache))
+
+        with open(self.__header, 'a') as header:
+            header.write('int g();\n')
+
+        self.assertFalse(cache.restore(self.__action, self.__source,
+                                       self.__restored))
+        self.assertFalse(os.path.exists(self.__restored))
+
+    def test_miss_on_changed_config(self):
+        """ Results are not shared between analyzer configurations. """
+        self.assertTrue(self.__store(
+            ResultCache(self.__cache_dir, {'clangsa': 'cfg'})))
+
+        other_config = ResultCache(self.__cache_dir, {'clangsa': 'other'})
+        self.assertFalse(other_config.restore(self.__action, self.__source,
+                                              self.__restored))
+
+    def test_miss_on_changed_command(self):
+        """ Results are not shared between different build commands. """
+        cache = ResultCache(self.__cache_dir, {'clangsa': 'cfg'})
+        self.assertTrue(self.__store(cache))
+
+        self.__action.analyzer_options = ['-DVAR=2']
+        self.assertFalse(cache.restore(self.__action, self.__source,
+                                       self.__restored))
+
+    def test_unreadable_dependency(self):
+        """ Results depending on missing files are not cached. """
+        cache = ResultCache(self.__cache_dir, {'clangsa': 'cfg'})
+        self.assertFalse(cache.store(self.__action, self.__source,
+                                     self.__result, ['missing.h']))
+        self.assertFalse(cache.restore(self.__action, self.__source,
+                                       self.__restored))
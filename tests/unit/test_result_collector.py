@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the incremental collection of the analysis results. """
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze.analysis_history import history_key
+from libcodechecker.analyze.analysis_history import MEMORY_HISTORY_FILE
+from libcodechecker.analyze.analysis_history import load_history
+from libcodechecker.analyze.analysis_manager import ResultCollector
+from libcodechecker.analyze.report_index import INDEX_FILE
+
+
+class ResultCollectorTest(unittest.TestCase):
+    """
+    Test merging the results of the analysis workers into the metadata.
+    """
+
+    def setUp(self):
+        self.__output = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__output)
+
+    def test_merge_results(self):
+        """ Results are merged into the metadata one by one. """
+        metadata = {'result_source_files': {'old.plist': 'old.cpp',
+                                            'b.plist': 'b.cpp'}}
+        collector = ResultCollector(metadata, self.__output, 4)
+
+        collector.add((0, False, False, 'clangsa',
+                       {'a.plist': 'a.cpp'}, None, {'a.cpp': 2.0}, {}, [], {}))
+        collector.add((1, False, True, 'clangsa', {'b.plist': None}, None,
+                       {}, {}, [], {}))
+        collector.add((0, False, False, 'clang-tidy',
+                       {'c.plist': 'c.cpp'}, True, {}, {}, [], {}))
+        collector.add((0, True, False, 'clangsa', {}, None, {}, {}, [], {}))
+        collector.finish()
+
+        self.assertEqual(metadata['result_source_files'],
+                         {'old.plist': 'old.cpp',
+                          'a.plist': 'a.cpp',
+                          'c.plist': 'c.cpp'})
+        self.assertEqual(metadata['successful'],
+                         {'clangsa': 1, 'clang-tidy': 1})
+        self.assertEqual(metadata['failed'], {'clangsa': 1})
+        self.assertEqual(metadata['skipped'], 1)
+        self.assertEqual(metadata['result_cache'], {'hits': 1, 'misses': 0})
+
+    def test_checkpoint(self):
+        """ A checkpoint writes the results collected so far. """
+        metadata = {'result_source_files': {}}
+        collector = ResultCollector(metadata, self.__output, 2)
+        collector.add((0, False, False, 'clangsa',
+                       {'a.plist': 'a.cpp'}, None, {'a.cpp': 2.0}, {}, [], {}))
+        collector.checkpoint()
+
+        with open(os.path.join(self.__output, 'metadata.json')) as meta:
+            checkpoint = json.load(meta)
+
+        self.assertEqual(checkpoint['result_source_files'],
+                         {'a.plist': 'a.cpp'})
+        self.assertEqual(checkpoint['successful'], {'clangsa': 1})
+
+        history = load_history(self.__output)
+        self.assertEqual(history, {history_key('a.cpp', 'clangsa'): 2.0})
+
+    def test_resource_usage(self):
+        """ The resource usage of the analyses is stored per result. """
+        metadata = {'result_source_files': {}}
+        collector = ResultCollector(metadata, self.__output, 2)
+
+        usage = {'source': 'a.cpp', 'analyzer': 'clangsa', 'wall': 3.0,
+                 'user': 2.5, 'sys': 0.25, 'max_rss': 204800}
+        collector.add((0, False, False, 'clangsa', {'a.plist': 'a.cpp'},
+                       None, {'a.cpp': 3.0}, {'a.plist': usage}, [], {}))
+        collector.add((0, False, False, 'clangsa', {'b.plist': 'b.cpp'},
+                       True, {}, {}, [], {}))
+        collector.finish()
+
+        self.assertEqual(metadata['resource_usage'], {'a.plist': usage})
+
+        memory_history = load_history(self.__output, MEMORY_HISTORY_FILE)
+        self.assertEqual(memory_history,
+                         {history_key('a.cpp', 'clangsa'): 204800})
+
+    def test_report_index(self):
+        """ The index lines made by the workers are written as they are. """
+        metadata = {'result_source_files': {}}
+        collector = ResultCollector(metadata, self.__output, 2)
+
+        line = '["a.plist", 1, 1.0, "hash"]\t{"files": [], "reports": []}\n'
+        collector.add((0, False, False, 'clangsa', {'a.plist': 'a.cpp'},
+                       None, {}, {}, [], {'a.plist': line}))
+        collector.add((0, False, False, 'clangsa', {'b.plist': 'b.cpp'},
+                       None, {}, {}, [], {'b.plist': None}))
+        collector.checkpoint()
+
+        with open(os.path.join(self.__output, INDEX_FILE)) as index:
+            self.assertEqual(index.read(), line)
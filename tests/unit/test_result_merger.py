@@ -0,0 +1,140 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test merging the output directories of analysis shards. """
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import result_merger
+
+
+class ResultMergerTest(unittest.TestCase):
+    """
+    Test merging the result files and the metadata of output directories.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__output = os.path.join(self.__workdir, 'merged')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __shard(self, name, results, metadata, commands):
+        shard_dir = os.path.join(self.__workdir, name)
+        os.makedirs(os.path.join(shard_dir, 'failed'))
+
+        metadata['result_source_files'] = {}
+        for result_name, (source, content) in results.items():
+            with open(os.path.join(shard_dir, result_name), 'w') as result:
+                result.write(content)
+            metadata['result_source_files'][
+                os.path.join(shard_dir, result_name)] = source
+
+        with open(os.path.join(shard_dir, 'metadata.json'), 'w') as meta:
+            json.dump(metadata, meta)
+        with open(os.path.join(shard_dir, 'compile_cmd.json'), 'w') as cmds:
+            json.dump(commands, cmds)
+        with open(os.path.join(shard_dir, 'failed', name + '.zip'),
+                  'w') as failed:
+            failed.write(name)
+
+        return shard_dir
+
+    def test_merge(self):
+        """ Results are merged, identical results are stored once. """
+        cmd_a = {'directory': '/', 'command': 'gcc a.c', 'file': 'a.c'}
+        cmd_b = {'directory': '/', 'command': 'gcc b.c', 'file': 'b.c'}
+
+        first = self.__shard(
+            'first',
+            {'a.c_1.plist': ('/a.c', 'A'), 'h.c_1.plist': ('/h.c', 'H')},
+            {'action_num': 2, 'command': ['CodeChecker', 'analyze'],
+             'checkers': {'clangsa': ['core.DivideZero']},
+             'successful': {'clangsa': 2}, 'failed': {}, 'skipped': 1,
+             'timestamps': {'begin': 10.0, 'end': 20.0},
+             'shard': {'index': 1, 'count': 2}},
+            [cmd_a, cmd_b])
+        second = self.__shard(
+            'second',
+            {'b.c_1.plist': ('/b.c', 'B'), 'h.c_1.plist': ('/h.c', 'H')},
+            {'action_num': 1, 'command': ['CodeChecker', 'analyze'],
+             'checkers': {'clangsa': ['core.DivideZero',
+                                      'core.NullDereference']},
+             'successful': {}, 'failed': {'clangsa': 1}, 'skipped': 0,
+             'timestamps': {'begin': 5.0, 'end': 15.0},
+             'shard': {'index': 2, 'count': 2}},
+            [cmd_a, cmd_b])
+
+        result_merger.merge_output_dirs([first, second], self.__output)
+
+        self.assertEqual(sorted(os.listdir(self.__output)),
+                         ['a.c_1.plist', 'b.c_1.plist', 'compile_cmd.json',
+                          'failed', 'h.c_1.plist', 'metadata.json'])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.__output, 'failed'))),
+            ['first.zip', 'second.zip'])
+
+        with open(os.path.join(self.__output, 'metadata.json')) as meta:
+            metadata = json.load(meta)
+
+        self.assertEqual(metadata['result_source_files'],
+                         {os.path.join(self.__output, 'a.c_1.plist'): '/a.c',
+                          os.path.join(self.__output, 'b.c_1.plist'): '/b.c',
+                          os.path.join(self.__output, 'h.c_1.plist'): '/h.c'})
+        self.assertEqual(metadata['checkers'],
+                         {'clangsa': ['core.DivideZero',
+                                      'core.NullDereference']})
+        self.assertEqual(metadata['timestamps'], {'begin': 5.0, 'end': 20.0})
+        self.assertEqual(metadata['action_num'], 3)
+        self.assertEqual(metadata['successful'], {'clangsa': 2})
+        self.assertEqual(metadata['failed'], {'clangsa': 1})
+        self.assertEqual(metadata['skipped'], 1)
+        self.assertNotIn('shard', metadata)
+
+        with open(os.path.join(self.__output, 'compile_cmd.json')) as cmds:
+            self.assertEqual(json.load(cmds), [cmd_a, cmd_b])
+
+    def test_conflicting_results(self):
+        """ The first of different results with the same name is kept. """
+        first = self.__shard('first', {'a.c_1.plist': ('/a.c', 'old')},
+                             {'action_num': 1}, [])
+        second = self.__shard('second', {'a.c_1.plist': ('/a.c', 'new')},
+                              {'action_num': 1}, [])
+
+        result_merger.merge_output_dirs([first, second], self.__output)
+
+        with open(os.path.join(self.__output, 'a.c_1.plist')) as result:
+            self.assertEqual(result.read(), 'old')
+
+    def test_clean_results(self):
+        """
+        The identical results of different translation units without
+        reports are all kept.
+        """
+        clean = '<plist><dict><key>diagnostics</key><array/></dict></plist>'
+        first = self.__shard('first', {'a.c_1.plist': ('/a.c', clean),
+                                       'b.c_1.plist': ('/b.c', clean)},
+                             {'action_num': 2}, [])
+        second = self.__shard('second', {'c.c_1.plist': ('/c.c', clean)},
+                              {'action_num': 1}, [])
+
+        result_merger.merge_output_dirs([first, second], self.__output)
+
+        with open(os.path.join(self.__output, 'metadata.json')) as meta:
+            metadata = json.load(meta)
+
+        self.assertEqual(metadata['result_source_files'],
+                         {os.path.join(self.__output, 'a.c_1.plist'): '/a.c',
+                          os.path.join(self.__output, 'b.c_1.plist'): '/b.c',
+                          os.path.join(self.__output, 'c.c_1.plist'): '/c.c'})
+        for name in ['a.c_1.plist', 'b.c_1.plist', 'c.c_1.plist']:
+            with open(os.path.join(self.__output, name)) as result:
+                self.assertEqual(result.read(), clean)
@@ -0,0 +1,57 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test running the analyzer processes. """
+
+import tempfile
+import unittest
+
+from libcodechecker.analyze.analyzers.analyzer_base import SourceAnalyzer
+
+
+class RunProcTest(unittest.TestCase):
+    """
+    Test the outputs and the resource usage of the analyzer processes.
+    """
+
+    def test_outputs_and_usage(self):
+        """ The outputs and the resources used are returned. """
+        ret_code, stdout, stderr, usage = SourceAnalyzer.run_proc_with_usage(
+            "sh -c 'echo out; echo err >&2; exit 3'")
+
+        self.assertEqual(ret_code, 3)
+        self.assertEqual(stdout, 'out\n')
+        self.assertEqual(stderr, 'err\n')
+        self.assertEqual(sorted(usage.keys()),
+                         ['max_rss', 'sys', 'user', 'wall'])
+        self.assertGreater(usage['max_rss'], 0)
+        self.assertGreaterEqual(usage['wall'], 0)
+
+    def test_stdout_file(self):
+        """ The stdout is written to the given file instead of returned. """
+        with tempfile.TemporaryFile() as stdout_file:
+            ret_code, stdout, stderr, _ = \
+                SourceAnalyzer.run_proc_with_usage(
+                    "sh -c 'echo out; echo err >&2'", stdout_file=stdout_file)
+
+            stdout_file.seek(0)
+            self.assertEqual(stdout_file.read(), 'out\n')
+
+        self.assertEqual(ret_code, 0)
+        self.assertIsNone(stdout)
+        self.assertEqual(stderr, 'err\n')
+
+    def test_cpu_time(self):
+        """ The CPU time used by the process is measured. """
+        _, _, _, usage = SourceAnalyzer.run_proc_with_usage(
+            "sh -c 'i=0; while [ $i -lt 200000 ]; do i=$((i+1)); done'")
+
+        self.assertGreater(usage['user'] + usage['sys'], 0)
+
+    def test_killed_process(self):
+        """ A process killed by a signal has a negative return code. """
+        ret_code, _, _ = SourceAnalyzer.run_proc("sh -c 'kill -9 $$'")
+        self.assertEqual(ret_code, -9)
@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the skip list handler. """
+
+import fnmatch
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import skiplist_handler
+
+
+def reference_should_skip(patterns, source):
+    """ Check the patterns one by one, the first matching one decides. """
+    for sign, regex in patterns:
+        if regex.match(source):
+            return sign == '-'
+    return False
+
+
+class SkipListHandlerTest(unittest.TestCase):
+    """
+    Test that the combined patterns of the skip file give the same decisions
+    as checking the patterns in order.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__skip_file = os.path.join(self.__workdir, 'skipfile')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __handler(self, lines):
+        with open(self.__skip_file, 'w') as skip_file:
+            skip_file.write('\n'.join(lines))
+        return skiplist_handler.SkipListHandler(self.__skip_file)
+
+    def test_first_match(self):
+        """ The first matching pattern decides. """
+        handler = self.__handler(['-/skip/all/files/in/directory/*',
+                                  '-/do/not/check/this.file',
+                                  '+/dir/do.check.this.file',
+                                  '-/dir/*',
+                                  'malformed'])
+
+        self.assertTrue(handler.should_skip('/skip/all/files/in/directory/a'))
+        self.assertTrue(handler.should_skip('/do/not/check/this.file'))
+        self.assertFalse(handler.should_skip('/dir/do.check.this.file'))
+        self.assertTrue(handler.should_skip('/dir/other.file'))
+        self.assertFalse(handler.should_skip('/other/dir/a.cpp'))
+        # Memoized decisions.
+        self.assertTrue(handler.should_skip('/dir/other.file'))
+        self.assertFalse(handler.should_skip('/other/dir/a.cpp'))
+
+    def test_many_patterns(self):
+        """ More patterns than the groups of one regular expression. """
+        rand = random.Random(0)
+        lines = []
+        for i in range(500):
+            sign = rand.choice('+-')
+            lines.append(sign + rand.choice(['/src/dir%d/*' % i,
+                                             '/src/*/file%d.[ch]' % i,
+                                             '/src/dir?/file%d.h' % i,
+                                             '/src/dir%d/(x).cpp' % i]))
+        handler = self.__handler(lines)
+        patterns = [(line[0], re.compile(fnmatch.translate(line[1:] + '*')))
+                    for line in lines]
+
+        for _ in range(2000):
+            name = rand.choice(['file%d.h', 'file%d.c', '(x).cpp', 'a.cpp'])
+            if '%d' in name:
+                name = name % rand.randrange(600)
+            source = '/src/dir%d/%s' % (rand.randrange(600), name)
+            self.assertEqual(handler.should_skip(source),
+                             reference_should_skip(patterns, source), source)
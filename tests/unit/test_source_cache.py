@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the shared cache of the source file lines. """
+
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker import report
+from libcodechecker import source_cache
+from libcodechecker.source_cache import SourceCache
+
+
+def read_line(file_name, line_no):
+    """ Read the line of the file without the cache. """
+    try:
+        with open(file_name) as source:
+            for line in source:
+                line_no -= 1
+                if line_no == 0:
+                    return line
+            return ''
+    except IOError:
+        return ''
+
+
+class SourceCacheTest(unittest.TestCase):
+    """
+    Test reading the lines of the source files through the cache.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __write(self, name, content):
+        path = os.path.join(self.__workdir, name)
+        with open(path, 'wb') as source:
+            source.write(content)
+        return path
+
+    def test_same_lines(self):
+        """ The lines are the same as the ones read from the files. """
+        cache = SourceCache()
+        sources = [self.__write('a.cpp', 'int a;\n\nint b;\n'),
+                   self.__write('b.cpp', 'int a;\r\n// no newline'),
+                   self.__write('c.cpp', ''),
+                   self.__write('d.cpp', '\n\n'),
+                   os.path.join(self.__workdir, 'missing.cpp')]
+
+        for source in sources:
+            for line_no in [5, 1, 2, 3, 4, 0, -1]:
+                self.assertEqual(cache.get_line(source, line_no),
+                                 read_line(source, line_no),
+                                 (source, line_no))
+
+    def test_changed_file(self):
+        """ A changed file is mapped again. """
+        cache = SourceCache()
+        source = self.__write('a.cpp', 'int a;\n')
+        self.assertEqual(cache.get_line(source, 1), 'int a;\n')
+
+        self.__write('a.cpp', 'int bb;\nint c;\n')
+        self.assertEqual(cache.get_line(source, 1), 'int bb;\n')
+        self.assertEqual(cache.get_line(source, 2), 'int c;\n')
+
+        os.remove(source)
+        self.assertEqual(cache.get_line(source, 1), '')
+
+    def test_eviction(self):
+        """ The least recently used files are unmapped. """
+        cache = SourceCache(max_files=2)
+        sources = [self.__write(name, 'int a;\n')
+                   for name in ['a.cpp', 'b.cpp', 'c.cpp']]
+
+        for source in sources + sources[1:]:
+            self.assertEqual(cache.get_line(source, 1), 'int a;\n')
+
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.evictions, 1)
+
+        # The first file was the least recently used one.
+        cache.get_line(sources[0], 1)
+        self.assertEqual(cache.misses, 4)
+
+    def test_no_open_files(self):
+        """ No file is kept open by the cached files. """
+        if not os.path.isdir('/proc/self/fd'):
+            self.skipTest("The open files can not be listed.")
+
+        cache = SourceCache()
+        sources = [self.__write('%d.cpp' % i, 'int a;\n') for i in range(300)]
+
+        open_files = len(os.listdir('/proc/self/fd'))
+        for source in sources:
+            self.assertEqual(cache.get_line(source, 1), 'int a;\n')
+        self.assertEqual(len(os.listdir('/proc/self/fd')), open_files)
+
+    def test_read_error(self):
+        """ The files which can not be read are not empty. """
+        cache = SourceCache()
+        self.assertRaises(IOError, cache.read_line, self.__workdir, 1)
+        self.assertRaises(OSError, cache.read_line,
+                          os.path.join(self.__workdir, 'missing.cpp'), 1)
+        self.assertEqual(cache.get_line(self.__workdir, 1), '')
+
+    def test_report_hash_read_error(self):
+        """ No report hash is generated without the line of the file. """
+        source = self.__write('a.cpp', 'int a;\n')
+        path = [{'kind': 'event',
+                 'location': {'line': 1, 'col': 5, 'file': 0},
+                 'message': 'message'}]
+
+        self.assertNotEqual(
+            report.generate_report_hash(path, source, 'checker'), '')
+
+        def read_line(path, line_no):
+            raise IOError(errno.EMFILE, "Too many open files")
+
+        shared_cache = source_cache.shared_cache
+        source_cache.shared_cache = SourceCache()
+        source_cache.shared_cache.read_line = read_line
+        try:
+            self.assertEqual(
+                report.generate_report_hash(path, source, 'checker'), '')
+        finally:
+            source_cache.shared_cache = shared_cache
@@ -8,9 +8,13 @@
 
 """Tests for suppressing by comment in source file."""
 
+import hashlib
 import os
+import shutil
+import tempfile
 import unittest
 
+from libcodechecker import suppress_handler
 from libcodechecker.suppress_handler import SourceSuppressHandler
 
 
@@ -167,3 +171,68 @@ class SourceSuppressTestCase(unittest.TestCase):
         self.assertFalse(res)
         self.assertEqual(sp_handler.suppressed_checkers(), set())
         self.assertIsNone(sp_handler.suppress_comment())
+
+
+class SuppressIndexCacheTestCase(unittest.TestCase):
+    """Tests for the cache of the suppression indexes of the source files."""
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+        self.__scanned = []
+        self.__build_suppress_index = suppress_handler.build_suppress_index
+        suppress_handler.build_suppress_index = self.__counting_build
+
+    def tearDown(self):
+        suppress_handler.build_suppress_index = self.__build_suppress_index
+        shutil.rmtree(self.__workdir)
+
+    def __counting_build(self, lines):
+        self.__scanned.append(lines)
+        return self.__build_suppress_index(lines)
+
+    def __write(self, name, content):
+        path = os.path.join(self.__workdir, name)
+        with open(path, 'w') as source:
+            source.write(content)
+        return path
+
+    def test_same_content(self):
+        """Every file content is scanned once."""
+        cache = suppress_handler.SuppressIndexCache()
+        content = '// codechecker_suppress [all] comment\nint a;\n'
+        sources = [self.__write(name, content) for name in ['a.c', 'b.c']]
+
+        for source in sources * 2:
+            self.assertEqual(cache.get_file_index(source),
+                             {2: (frozenset(['all']), 'comment')})
+        self.assertEqual(len(self.__scanned), 1)
+
+        self.assertEqual(cache.get(hashlib.sha256(content).hexdigest(),
+                                   lambda: ''),
+                         {2: (frozenset(['all']), 'comment')})
+        self.assertEqual(len(self.__scanned), 1)
+
+    def test_changed_file(self):
+        """A changed file is scanned again."""
+        cache = suppress_handler.SuppressIndexCache()
+        source = self.__write('a.c', 'int a;\n')
+        self.assertEqual(cache.get_file_index(source), {})
+
+        self.__write('a.c', '// codechecker_suppress [x, y]\nint a;\n')
+        os.utime(source, (0, 0))
+        self.assertEqual(
+            cache.get_file_index(source),
+            {2: (frozenset(['x', 'y']),
+                 'WARNING! suppress comment is missing')})
+        self.assertEqual(len(self.__scanned), 2)
+
+        os.remove(source)
+        self.assertEqual(cache.get_file_index(source), {})
+
+    def test_last_line(self):
+        """The line after the last comment line can be suppressed."""
+        self.assertEqual(
+            suppress_handler.build_suppress_index(
+                ['int a;', '// codechecker_suppress [all] a', '// b']),
+            {3: (frozenset(['all']), 'a'),
+             4: (frozenset(['all']), 'a b')})
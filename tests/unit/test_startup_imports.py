@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Test the modules imported when a subcommand is started. """
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         os.pardir, os.pardir)
+
+SUBCOMMANDS = ['analyze', 'analyze-worker', 'analyzers', 'check', 'checkers',
+               'cmd', 'log', 'merge-results', 'parse', 'server', 'store',
+               'version']
+
+# Print the help of the given subcommand through the main script and the
+# modules imported by then.
+STARTUP = """
+import json
+import os
+import sys
+
+sys.path.insert(0, 'bin')
+import CodeChecker
+
+subcommands = json.loads(sys.argv[2])
+sys.argv = ['CodeChecker', sys.argv[1], '--help']
+stdout = sys.stdout
+sys.stdout = open(os.devnull, 'w')
+try:
+    CodeChecker.main(subcommands)
+except SystemExit:
+    pass
+sys.stdout = stdout
+
+print(json.dumps([name for name, module in sys.modules.items()
+                  if module is not None]))
+"""
+
+# The modules of the server and of the client communicating with it.
+SERVER_MODULES = ['Authentication_v6', 'codeCheckerDBAccess_v6',
+                  'ProductManagement_v6', 'portalocker', 'shared',
+                  'sqlalchemy', 'thrift', 'libcodechecker.libclient',
+                  'libcodechecker.server']
+
+# The number of CodeChecker modules a subcommand may import on startup.
+BUDGETS = {'version': 10,
+           'log': 14,
+           'check': 35,
+           'parse': 40}
+
+
+def startup_modules(subcommand):
+    """ Return the modules imported when the subcommand is started. """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_ROOT
+    output = subprocess.check_output([sys.executable, '-c', STARTUP,
+                                      subcommand, json.dumps(SUBCOMMANDS)],
+                                     cwd=REPO_ROOT, env=env)
+    return set(json.loads(output))
+
+
+def imported(modules, package):
+    return [name for name in modules
+            if name == package or name.startswith(package + '.')]
+
+
+class StartupImportsTest(unittest.TestCase):
+    """
+    Test that only the modules needed by the started subcommand are
+    imported, so that calling CodeChecker does not get slower.
+    """
+
+    def test_budget(self):
+        """ The subcommands import only the modules they need. """
+        for subcommand, budget in BUDGETS.items():
+            modules = startup_modules(subcommand)
+
+            handler = 'libcodechecker.libhandlers.' + \
+                subcommand.replace('-', '_')
+            self.assertEqual(
+                sorted(imported(modules, 'libcodechecker.libhandlers')),
+                ['libcodechecker.libhandlers', handler])
+
+            for package in SERVER_MODULES + ['multiprocessing', 'psutil']:
+                self.assertEqual(imported(modules, package), [],
+                                 (subcommand, package))
+
+            own_modules = imported(modules, 'libcodechecker')
+            self.assertLessEqual(len(own_modules), budget,
+                                 (subcommand, sorted(own_modules)))
+
+    def test_version(self):
+        """ Printing the version does not need the analyzers. """
+        modules = startup_modules('version')
+        self.assertEqual(imported(modules, 'libcodechecker.analyze'), [])
@@ -11,6 +11,8 @@ used in sequence transform a Clang Tidy output file to a plist file.
 
 import copy
 import os
+import shutil
+import tempfile
 import unittest
 
 try:
@@ -276,3 +278,77 @@ class TidyPListConverterTestCase(unittest.TestCase):
             self.assertEqual(exp, output.getvalue())
 
         output.close()
+
+
+def scaled_tidy_output(scale, output_dir):
+    """
+    Return the lines of the test clang-tidy outputs repeated scale times,
+    every repetition referring to a copy of the source files in the output
+    directory.
+    """
+    lines = []
+    for i in range(scale):
+        shutil.copytree('files', os.path.join(output_dir, 'dir%d' % i))
+
+    for name in ['tidy1.out', 'tidy2.out', 'tidy3.out']:
+        with open(name) as tidy_out:
+            output = tidy_out.read()
+        for i in range(scale):
+            source_dir = os.path.join(output_dir, 'dir%d' % i)
+            lines.extend(output.replace('files/', source_dir + '/')
+                         .splitlines())
+    return lines
+
+
+class TidyStreamingConverterTestCase(unittest.TestCase):
+    """
+    Test the plist written while the clang-tidy messages are parsed against
+    the output of the PListConverter.
+    """
+
+    def setUp(self):
+        self.__workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__workdir)
+
+    def __convert(self, lines):
+        files = []
+        output = StringIO()
+        diagnostics = tidy_out_conv.iter_diagnostics(
+            tidy_out_conv.OutputParser().iter_messages(lines), files)
+        count = tidy_out_conv.write_plist(diagnostics, files, output)
+        return output.getvalue(), count
+
+    def __expected(self, lines):
+        plist_conv = tidy_out_conv.PListConverter()
+        plist_conv.add_messages(
+            tidy_out_conv.OutputParser().parse_messages(lines))
+        output = StringIO()
+        plist_conv.write(output)
+        return output.getvalue()
+
+    def test_same_plist(self):
+        """The streamed plist is the same as the one written at once."""
+        for name in ['empty1.out', 'empty2.out', 'tidy1.out', 'tidy2.out',
+                     'tidy3.out', 'tidy4.out']:
+            with open(name) as tidy_out:
+                lines = tidy_out.read().splitlines()
+            self.assertEqual(self.__convert(lines)[0],
+                             self.__expected(lines), name)
+
+    def test_scaled_output(self):
+        """The plist of a large output is the same in both ways."""
+        lines = scaled_tidy_output(200, self.__workdir)
+        plist, count = self.__convert(lines)
+        self.assertEqual(plist, self.__expected(lines))
+        self.assertEqual(count, 200 * 7)
+
+    def test_repeated_messages(self):
+        """A message repeated in the output is converted only once."""
+        with open('tidy3.out') as tidy_out:
+            lines = tidy_out.read().splitlines()
+
+        plist, count = self.__convert(lines * 3)
+        self.assertEqual(count, 2)
+        self.assertEqual(plist, self.__expected(lines))